@@ -3,30 +3,49 @@ FinBuddy - Simple All-in-One Server
 Clean, straightforward FastAPI application for prototype
 Port: 8000
 """
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal, Set, Tuple
+import asyncio
 import sys
+import time
 import os
 import logging
+import numpy as np
 
 # Setup path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from shared.config import settings
 from shared.utils.logger import setup_logger
-from shared.utils.database import init_db, get_session
+from shared.utils.database import init_db, get_session, get_session_maker
 from shared.utils.auth import hash_password, verify_password, create_access_token
 from shared.models import User, Investment, RiskAlert, FraudAlert, LearningProgress, NewsArticle, RecommendationOutcome
-from legacy_modules.price_service import get_live_price
-from legacy_modules.news_fetcher import get_news_fetcher
+from legacy_modules.price_service import PriceSnapshot, price_flight, crypto_index
+from legacy_modules.price_providers import (
+    get_live_prices_async, fetch_price_snapshot, close_http_client, provider_stats
+)
+from legacy_modules.quote_cache import quote_cache
+from legacy_modules.ohlcv_store import ohlcv_store
+from legacy_modules.portfolio_analytics import analyze_portfolio_volatility, covariance_cache
+from legacy_modules.var_engine import compute_portfolio_var, shutdown_var_pool
+from legacy_modules.projection_engine import project_holdings
+from legacy_modules.portfolio_state import PortfolioState, GROWTH_SECTORS, RISKY_SECTORS
+from legacy_modules.portfolio_optimizer import optimize_portfolio, OPTIMIZATION_MODES
+from legacy_modules.risk_report_snapshots import risk_report_refresher, report_fingerprint, load_snapshot, snapshot_payload
+from legacy_modules.news_fetcher import get_news_fetcher, news_source_stats, shutdown_parse_pool
+from legacy_modules.news_matcher import analyze_news_for_holdings
+from legacy_modules import news_dedup, news_index
+from legacy_modules.news_search import ensure_search_index, search_news
+from legacy_modules.news_pipeline import ingest_news, news_pipeline_stats
+from legacy_modules.news_scheduler import news_scheduler
 from legacy_modules.gemini_service import gemini_companion
-from legacy_modules.risk_engine import risk_engine
+from legacy_modules.risk_engine import risk_engine, encode_asset_types
 from legacy_modules.fraud_detection import fraud_detector
 
 logger = setup_logger('finbuddy_server')
@@ -70,12 +89,34 @@ async def lifespan(app: FastAPI):
     try:
         await init_db()
         logger.info("✅ Database ready")
+        await asyncio.to_thread(crypto_index.load)
+        logger.info("✅ Crypto symbol index ready")
+        async with get_session_maker()() as session:
+            await news_index.build_index_if_empty(session)
+            try:
+                await news_dedup.sync_story_index(session)
+                await session.commit()
+            except Exception:
+                news_dedup.story_index.rollback()
+                raise
+            news_dedup.story_index.commit()
+            await ensure_search_index(session)
+        logger.info("✅ News symbol, story and search indexes ready")
+        if settings.RISK_REPORT_WORKER_ENABLED:
+            risk_report_refresher.start()
+        if settings.NEWS_SCHEDULER_ENABLED:
+            news_scheduler.start()
         logger.info("✅ Gemini AI ready")
         logger.info("✅ All systems operational")
     except Exception as e:
         logger.error(f"❌ Startup error: {e}")
         raise
     yield
+    await risk_report_refresher.stop()
+    await news_scheduler.stop()
+    await close_http_client()
+    shutdown_var_pool()
+    shutdown_parse_pool()
     logger.info("🛑 Server shutdown")
 
 app = FastAPI(
@@ -107,6 +148,24 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Runtime counters for caches and upstream price/news providers"""
+    return {
+        "quote_cache": quote_cache.stats(),
+        "price_providers": provider_stats(),
+        "price_single_flight": price_flight.stats(),
+        "crypto_symbols": crypto_index.stats(),
+        "ohlcv_store": ohlcv_store.stats(),
+        "covariance_cache": covariance_cache.stats(),
+        "risk_report_refresher": risk_report_refresher.stats(),
+        "news_sources": news_source_stats(),
+        "news_pipeline": news_pipeline_stats(),
+        "news_scheduler": news_scheduler.stats(),
+        "news_story_index": news_dedup.story_index.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 # ============================================================================
 # USER SERVICE - Authentication & User Management
 # ============================================================================
@@ -252,6 +311,14 @@ async def add_investment(user_id: int, investment: InvestmentCreate, db: AsyncSe
         db.add(new_investment)
         await db.commit()
         await db.refresh(new_investment)
+        risk_report_refresher.mark_dirty(user_id)
+        
+        # First holder of a symbol - index the recent news that mentions it
+        holders = await db.execute(
+            select(func.count(Investment.id)).where(func.upper(Investment.symbol) == investment.symbol.upper())
+        )
+        if holders.scalar() == 1:
+            news_index.schedule_backfill([investment.symbol])
         return {"id": new_investment.id, "message": "Investment added! 📈"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -280,11 +347,21 @@ async def get_portfolio(user_id: int, db: AsyncSession = Depends(get_session)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/prices/crypto/search")
+async def search_crypto_symbols(q: str, limit: int = 10):
+    """Autocomplete crypto tickers from the local CoinGecko index"""
+    try:
+        matches = await asyncio.to_thread(crypto_index.search_prefix, q, min(limit, 50))
+        return {"query": q, "results": matches}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/prices/{symbol}")
 async def get_price(symbol: str, asset_type: str = "stock"):
     """Get live price"""
     try:
-        price_data = get_live_price(symbol, asset_type)
+        quotes = await get_live_prices_async([symbol], asset_type)
+        price_data = quotes.get(symbol)
         if not price_data:
             raise HTTPException(status_code=404, detail=f"Price not found for {symbol}")
         return price_data
@@ -293,15 +370,42 @@ async def get_price(symbol: str, asset_type: str = "stock"):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/history/{symbol}")
+async def get_price_history(symbol: str, asset_type: str = "stock", days: int = 365, interval: str = "1d"):
+    """Get stored OHLCV bars, backfilling anything newer than the last stored bar"""
+    try:
+        await asyncio.to_thread(ohlcv_store.backfill, symbol, asset_type, interval)
+        start = datetime.now().timestamp() - days * 86400
+        bars = ohlcv_store.bars(symbol, interval, start=start)
+        return {
+            "symbol": symbol.upper(),
+            "interval": interval,
+            "count": int(bars.shape[1]),
+            "timestamp": bars[0].tolist(),
+            "open": bars[1].tolist(),
+            "high": bars[2].tolist(),
+            "low": bars[3].tolist(),
+            "close": bars[4].tolist(),
+            "volume": bars[5].tolist()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.put("/api/portfolio/update-prices/{user_id}")
 async def update_prices(user_id: int, db: AsyncSession = Depends(get_session)):
     """Update all prices"""
     try:
         result = await db.execute(select(Investment).where(Investment.user_id == user_id))
         investments = result.scalars().all()
+        quotes = await get_live_prices_async(
+            [inv.symbol for inv in investments],
+            [inv.asset_type for inv in investments]
+        )
         updated_count = 0
         for inv in investments:
-            price_data = get_live_price(inv.symbol, inv.asset_type)
+            price_data = quotes.get(inv.symbol)
             if price_data:
                 inv.current_price = price_data['price']
                 updated_count += 1
@@ -320,6 +424,11 @@ class PortfolioItem(BaseModel):
     avg_buy_price: float
     sector: Optional[str] = None
 
+class ProjectionConfig(BaseModel):
+    method: Literal["gbm", "bootstrap"] = "gbm"
+    paths: int = Field(10000, ge=100, le=settings.PROJECTION_MAX_PATHS)
+    seed: Optional[int] = None
+
 class SimulationRequest(BaseModel):
     user_id: int
     current_portfolio: List[PortfolioItem]
@@ -327,6 +436,33 @@ class SimulationRequest(BaseModel):
     risk_appetite: str  # "low", "medium", "high"
     investment_goal: str  # long-term, short-term, retirement, etc.
     horizon_years: int
+    projection: Optional[ProjectionConfig] = None  # set to add a Monte Carlo projection
+
+class PortfolioEdit(BaseModel):
+    symbol: str
+    action: str = "set"  # "add", "remove" or "set"
+    quantity: Optional[float] = None
+    avg_buy_price: Optional[float] = None
+    sector: Optional[str] = None
+
+class CandidateModification(BaseModel):
+    name: Optional[str] = None
+    edits: List[PortfolioEdit]
+
+class WeightSweep(BaseModel):
+    symbol: str
+    weights: List[float]  # target value weights (0-1); other holdings are scaled to fit
+    sector: Optional[str] = None
+
+class BatchSimulationRequest(BaseModel):
+    user_id: int
+    base_portfolio: List[PortfolioItem]
+    candidates: List[CandidateModification] = []
+    weight_sweeps: List[WeightSweep] = []
+    risk_appetite: str
+    investment_goal: str
+    horizon_years: int
+    top_k: int = 3  # candidates that get an AI review
 
 class PortfolioMetrics(BaseModel):
     total_value: float
@@ -338,285 +474,329 @@ class PortfolioMetrics(BaseModel):
     sector_distribution: Dict[str, float]
     top_holding_pct: float
 
-def calculate_portfolio_value(portfolio: List[PortfolioItem]) -> float:
-    """Calculate total portfolio value using live prices"""
-    total = 0.0
+def calculate_holding_values(portfolio: List[PortfolioItem], prices: PriceSnapshot) -> List[float]:
+    """Value of each holding using snapshot prices (falls back to avg buy price)"""
+    return [item.quantity * prices.price(item.symbol, item.avg_buy_price) for item in portfolio]
+
+def position_keys(portfolio: List[PortfolioItem]) -> List[tuple]:
+    """(symbol, occurrence) keys so repeated symbols stay distinct positions"""
+    seen = {}
+    keys = []
     for item in portfolio:
-        price_data = get_live_price(item.symbol)
-        if price_data and 'price' in price_data:
-            current_price = price_data['price']
-        else:
-            current_price = item.avg_buy_price  # Fallback to avg buy price
-        total += item.quantity * current_price
-    return total
+        symbol = item.symbol.upper()
+        keys.append((symbol, seen.get(symbol, 0)))
+        seen[symbol] = seen.get(symbol, 0) + 1
+    return keys
+
+def build_portfolio_state(portfolio: List[PortfolioItem], prices: PriceSnapshot) -> PortfolioState:
+    """Incremental metric state for a portfolio (see PortfolioState.metrics for the definitions)"""
+    return PortfolioState.from_positions(
+        (key, item.quantity, prices.price(item.symbol, item.avg_buy_price), item.sector)
+        for key, item in zip(position_keys(portfolio), portfolio)
+    )
 
-def calculate_risk_score(portfolio: List[PortfolioItem]) -> float:
+def apply_portfolio_diff(
+    state: PortfolioState,
+    current: List[PortfolioItem],
+    modified: List[PortfolioItem],
+    prices: PriceSnapshot
+) -> int:
     """
-    Calculate portfolio risk score (0-100, higher = riskier)
-    Based on concentration, volatility proxy, and sector exposure
-    """
-    if not portfolio:
-        return 0.0
-    
-    # Get current values
-    holdings_values = []
-    total_value = 0.0
+    Move a state built from `current` to `modified`, touching only changed positions
     
-    for item in portfolio:
-        price_data = get_live_price(item.symbol)
-        if price_data and 'price' in price_data:
-            current_price = price_data['price']
+    Returns:
+        Number of positions added, removed or resized
+    """
+    current_keys = set(position_keys(current))
+    changed = 0
+    
+    for key, item in zip(position_keys(modified), modified):
+        position = (item.quantity, prices.price(item.symbol, item.avg_buy_price), item.sector)
+        if key not in current_keys:
+            state.add(key, *position)
+            changed += 1
         else:
-            current_price = item.avg_buy_price
-        
-        value = item.quantity * current_price
-        holdings_values.append(value)
-        total_value += value
+            current_keys.discard(key)
+            if state.position(key) != position:
+                state.resize(key, *position)
+                changed += 1
     
-    if total_value == 0:
-        return 0.0
-    
-    # Concentration risk (max holding percentage)
-    max_holding_pct = max(holdings_values) / total_value * 100 if holdings_values else 0
-    concentration_score = min(100, max_holding_pct * 1.5)  # Scale up
-    
-    # Diversification penalty (fewer holdings = higher risk)
-    num_holdings = len(portfolio)
-    if num_holdings == 1:
-        diversification_penalty = 40
-    elif num_holdings == 2:
-        diversification_penalty = 25
-    elif num_holdings <= 5:
-        diversification_penalty = 10
-    else:
-        diversification_penalty = 0
-    
-    # Sector concentration (if sector data available)
-    sector_risk = 0
-    if any(item.sector for item in portfolio):
-        sector_counts = {}
-        for item in portfolio:
-            sector = item.sector or "Unknown"
-            sector_counts[sector] = sector_counts.get(sector, 0) + 1
-        
-        max_sector_count = max(sector_counts.values())
-        sector_concentration_pct = (max_sector_count / len(portfolio)) * 100
-        sector_risk = min(30, sector_concentration_pct * 0.5)
+    for key in current_keys:
+        state.remove(key)
+        changed += 1
     
-    # Combined risk score
-    risk_score = (concentration_score * 0.5) + (diversification_penalty * 0.3) + (sector_risk * 0.2)
-    return min(100, max(0, risk_score))
+    return changed
 
-def calculate_diversification_score(portfolio: List[PortfolioItem]) -> float:
+def calculate_portfolio_metrics_batch(portfolios: List[List[PortfolioItem]], prices: PriceSnapshot) -> Dict[str, Any]:
     """
-    Calculate diversification score (0-100, higher = better diversified)
-    """
-    if not portfolio or len(portfolio) == 0:
-        return 0.0
-    
-    num_holdings = len(portfolio)
-    
-    # Base score from number of holdings
-    if num_holdings >= 10:
-        base_score = 100
-    elif num_holdings >= 7:
-        base_score = 85
-    elif num_holdings >= 5:
-        base_score = 70
-    elif num_holdings >= 3:
-        base_score = 50
-    elif num_holdings == 2:
-        base_score = 30
-    else:
-        base_score = 10
-    
-    # Calculate concentration penalty (Herfindahl index)
-    holdings_values = []
-    total_value = 0.0
-    
-    for item in portfolio:
-        price_data = get_live_price(item.symbol)
-        if price_data and 'price' in price_data:
-            current_price = price_data['price']
-        else:
-            current_price = item.avg_buy_price
-        
-        value = item.quantity * current_price
-        holdings_values.append(value)
-        total_value += value
-    
-    if total_value == 0:
-        return base_score
+    Vectorized PortfolioState.metrics() over many candidate portfolios
     
-    # Herfindahl concentration index
-    herfindahl = sum((v / total_value) ** 2 for v in holdings_values)
-    concentration_penalty = herfindahl * 40  # 0-40 penalty
+    Holdings are padded into (portfolios x max_holdings) arrays so every metric
+    is computed with array math on one price snapshot.
     
-    # Sector diversity bonus
-    sector_bonus = 0
-    if any(item.sector for item in portfolio):
-        unique_sectors = len(set(item.sector for item in portfolio if item.sector))
-        if unique_sectors >= 5:
-            sector_bonus = 15
-        elif unique_sectors >= 3:
-            sector_bonus = 10
-        elif unique_sectors >= 2:
-            sector_bonus = 5
+    Returns:
+        Dict of metric arrays (one entry per portfolio) plus sector_distribution dicts
+    """
+    count = len(portfolios)
+    width = max((len(p) for p in portfolios), default=0) or 1
+    
+    sectors = sorted({item.sector or "Unknown" for p in portfolios for item in p}) or ["Unknown"]
+    sector_codes = {sector: i for i, sector in enumerate(sectors)}
+    growth = np.array([sector in GROWTH_SECTORS for sector in sectors])
+    risky = np.array([sector in RISKY_SECTORS for sector in sectors])
+    
+    # Quotes are looked up once per distinct symbol (None = use each item's avg buy price)
+    quoted = {}
+    for p in portfolios:
+        for item in p:
+            if item.symbol not in quoted:
+                quoted[item.symbol] = prices.price(item.symbol, None)
+    
+    mask = np.zeros((count, width), dtype=bool)
+    for i, portfolio in enumerate(portfolios):
+        mask[i, :len(portfolio)] = True
+    items = [item for p in portfolios for item in p]
+    
+    def padded(flat: List, dtype) -> np.ndarray:
+        out = np.zeros((count, width), dtype=dtype)
+        out[mask] = flat
+        return out
+    
+    quantities = padded([item.quantity for item in items], float)
+    unit_prices = padded([
+        quoted[item.symbol] if quoted[item.symbol] is not None else item.avg_buy_price for item in items
+    ], float)
+    codes = padded([sector_codes[item.sector or "Unknown"] for item in items], np.int64)
+    has_sector = padded([bool(item.sector) for item in items], bool)
+    
+    values = quantities * unit_prices
+    totals = values.sum(axis=1)
+    holdings = mask.sum(axis=1)
+    safe_totals = np.where(totals != 0, totals, 1.0)
+    valued = totals != 0
+    
+    # Holdings per sector and value per sector: (portfolios x sectors)
+    rows = np.repeat(np.arange(count), width)[mask.ravel()]
+    sector_counts = np.zeros((count, len(sectors)))
+    np.add.at(sector_counts, (rows, codes[mask]), 1)
+    sector_values = np.zeros((count, len(sectors)))
+    np.add.at(sector_values, (rows, codes[mask]), values[mask])
+    sector_quantities = np.zeros((count, len(sectors)))
+    np.add.at(sector_quantities, (rows, codes[mask]), quantities[mask])
+    # Only holdings with a sector set count towards the sector bonus ("Unknown" may be a real label)
+    known_sector_counts = np.zeros((count, len(sectors)))
+    np.add.at(known_sector_counts, (rows, codes[mask]), has_sector[mask])
+    
+    max_values = np.where(mask, values, -np.inf).max(axis=1)
+    top_holding_pct = np.where(valued & (holdings > 0), max_values / safe_totals * 100, 0.0)
+    
+    # Risk score (see PortfolioState.risk_score)
+    concentration = np.minimum(100, top_holding_pct * 1.5)
+    diversification_penalty = np.select([holdings == 1, holdings == 2, holdings <= 5], [40, 25, 10], default=0)
+    any_sector = has_sector.any(axis=1)
+    max_sector_count = sector_counts.max(axis=1)
+    sector_risk = np.where(any_sector, np.minimum(30, max_sector_count / np.maximum(holdings, 1) * 100 * 0.5), 0)
+    risk_score = np.clip(concentration * 0.5 + diversification_penalty * 0.3 + sector_risk * 0.2, 0, 100)
+    risk_score = np.where(valued & (holdings > 0), risk_score, 0.0)
+    
+    # Diversification score (see PortfolioState.diversification_score)
+    base_score = np.select(
+        [holdings >= 10, holdings >= 7, holdings >= 5, holdings >= 3, holdings == 2],
+        [100, 85, 70, 50, 30],
+        default=10
+    ).astype(float)
+    herfindahl = ((values / safe_totals[:, None]) ** 2).sum(axis=1)
+    unique_sectors = (known_sector_counts > 0).sum(axis=1)
+    sector_bonus = np.select([unique_sectors >= 5, unique_sectors >= 3, unique_sectors >= 2], [15, 10, 5], default=0)
+    diversification = np.where(valued, np.clip(base_score - herfindahl * 40 + sector_bonus, 0, 100), base_score)
+    diversification = np.where(holdings > 0, diversification, 0.0)
+    
+    # Quantity-weighted sector exposure (see PortfolioState.metrics)
+    total_quantity = quantities.sum(axis=1)
+    safe_quantity = np.where(total_quantity != 0, total_quantity, 1.0)
+    opportunity = np.where(total_quantity != 0, np.clip(sector_quantities[:, growth].sum(axis=1) / safe_quantity * 100, 0, 100), 50.0)
+    threat = np.where(total_quantity != 0, np.clip(sector_quantities[:, risky].sum(axis=1) / safe_quantity * 100, 0, 100), 20.0)
+    opportunity = np.where(holdings > 0, opportunity, 0.0)
+    threat = np.where(holdings > 0, threat, 0.0)
+    
+    sector_pct = np.where(valued[:, None], sector_values / safe_totals[:, None] * 100, 0.0).tolist()
+    sector_present = (sector_counts > 0).tolist()
+    sector_distribution = [
+        {sector: pct for sector, pct, present in zip(sectors, pct_row, present_row) if present}
+        for pct_row, present_row in zip(sector_pct, sector_present)
+    ]
     
-    final_score = base_score - concentration_penalty + sector_bonus
-    return min(100, max(0, final_score))
+    return {
+        "total_value": totals,
+        "risk_score": risk_score,
+        "diversification_score": diversification,
+        "sentiment_score": np.full(count, 50.0),
+        "opportunity_exposure": opportunity,
+        "threat_exposure": threat,
+        "top_holding_pct": top_holding_pct,
+        "sector_distribution": sector_distribution
+    }
 
-def calculate_news_sentiment_score(portfolio: List[PortfolioItem]) -> float:
-    """
-    Calculate news sentiment score (0-100, higher = more positive)
-    Simple proxy based on recent news sentiment
-    """
-    # For now, return neutral score
-    # In production, this would analyze recent news articles
-    return 50.0
+def batch_metrics_at(batch: Dict[str, Any], index: int) -> PortfolioMetrics:
+    """Materialize one portfolio's metrics from a calculate_portfolio_metrics_batch result"""
+    return PortfolioMetrics(
+        total_value=float(batch["total_value"][index]),
+        risk_score=float(batch["risk_score"][index]),
+        diversification_score=float(batch["diversification_score"][index]),
+        sentiment_score=float(batch["sentiment_score"][index]),
+        opportunity_exposure=float(batch["opportunity_exposure"][index]),
+        threat_exposure=float(batch["threat_exposure"][index]),
+        sector_distribution=batch["sector_distribution"][index],
+        top_holding_pct=float(batch["top_holding_pct"][index])
+    )
 
-def calculate_opportunity_exposure(portfolio: List[PortfolioItem]) -> float:
-    """
-    Calculate exposure to growth opportunities (0-100)
-    Based on sector classification and growth potential
-    """
-    if not portfolio:
-        return 0.0
-    
-    growth_sectors = {"Technology", "Healthcare", "Renewable Energy", "E-commerce"}
-    
-    growth_weight = 0.0
-    total_weight = 0.0
-    
-    for item in portfolio:
-        weight = item.quantity  # Simple weight by quantity
-        total_weight += weight
-        
-        if item.sector and item.sector in growth_sectors:
-            growth_weight += weight
-    
-    if total_weight == 0:
-        return 50.0  # Neutral
-    
-    opportunity_score = (growth_weight / total_weight) * 100
-    return min(100, max(0, opportunity_score))
+def calculate_metric_changes(current_metrics: PortfolioMetrics, modified_metrics: PortfolioMetrics) -> Dict[str, float]:
+    """Before/after deltas shown by the simulator"""
+    return {
+        "risk_delta": modified_metrics.risk_score - current_metrics.risk_score,
+        "diversification_delta": modified_metrics.diversification_score - current_metrics.diversification_score,
+        "sentiment_delta": modified_metrics.sentiment_score - current_metrics.sentiment_score,
+        "opportunity_delta": modified_metrics.opportunity_exposure - current_metrics.opportunity_exposure,
+        "threat_delta": modified_metrics.threat_exposure - current_metrics.threat_exposure,
+        "value_delta": modified_metrics.total_value - current_metrics.total_value,
+        "top_holding_delta": modified_metrics.top_holding_pct - current_metrics.top_holding_pct
+    }
 
-def calculate_threat_exposure(portfolio: List[PortfolioItem]) -> float:
-    """
-    Calculate exposure to threats/risks (0-100, higher = more threats)
-    Based on sector risks and volatility
-    """
-    if not portfolio:
-        return 0.0
-    
-    risky_sectors = {"Cryptocurrency", "Penny Stocks", "Emerging Markets", "High Volatility"}
-    
-    risk_weight = 0.0
-    total_weight = 0.0
-    
-    for item in portfolio:
-        weight = item.quantity
-        total_weight += weight
-        
-        if item.sector and item.sector in risky_sectors:
-            risk_weight += weight
-    
-    if total_weight == 0:
-        return 20.0  # Low default threat
-    
-    threat_score = (risk_weight / total_weight) * 100
-    return min(100, max(0, threat_score))
+def portfolio_metrics_summary(metrics: PortfolioMetrics, holdings_count: int) -> Dict:
+    """Response block for one side of a simulation"""
+    return {
+        "total_value": metrics.total_value,
+        "risk_score": metrics.risk_score,
+        "diversification_score": metrics.diversification_score,
+        "sentiment_score": metrics.sentiment_score,
+        "opportunity_exposure": metrics.opportunity_exposure,
+        "threat_exposure": metrics.threat_exposure,
+        "sector_distribution": metrics.sector_distribution,
+        "top_holding_pct": metrics.top_holding_pct,
+        "holdings_count": holdings_count
+    }
 
-def calculate_portfolio_metrics(portfolio: List[PortfolioItem]) -> PortfolioMetrics:
-    """Calculate all metrics for a portfolio"""
-    
-    # Calculate total value
-    total_value = calculate_portfolio_value(portfolio)
-    
-    # Calculate sector distribution
-    sector_distribution = {}
-    sector_values = {}
-    
-    for item in portfolio:
-        price_data = get_live_price(item.symbol)
-        if price_data and 'price' in price_data:
-            current_price = price_data['price']
-        else:
-            current_price = item.avg_buy_price
-        
-        value = item.quantity * current_price
-        sector = item.sector or "Unknown"
+def apply_portfolio_edits(base: List[PortfolioItem], edits: List[PortfolioEdit], prices: PriceSnapshot) -> List[PortfolioItem]:
+    """Apply add/remove/set edits to a copy of the base portfolio"""
+    portfolio = [item.model_copy() for item in base]
+    for edit in edits:
+        symbol = edit.symbol.upper()
+        existing = next((item for item in portfolio if item.symbol.upper() == symbol), None)
         
-        sector_values[sector] = sector_values.get(sector, 0.0) + value
-    
-    for sector, value in sector_values.items():
-        sector_distribution[sector] = (value / total_value * 100) if total_value > 0 else 0
-    
-    # Calculate top holding percentage
-    holdings_values = []
-    for item in portfolio:
-        price_data = get_live_price(item.symbol)
-        if price_data and 'price' in price_data:
-            current_price = price_data['price']
-        else:
-            current_price = item.avg_buy_price
+        if edit.action == "remove":
+            portfolio = [item for item in portfolio if item.symbol.upper() != symbol]
+            continue
+        if edit.action not in ("add", "set"):
+            raise ValueError(f"Unknown edit action '{edit.action}' for {edit.symbol}")
+        if edit.quantity is None:
+            raise ValueError(f"Edit '{edit.action}' for {edit.symbol} needs a quantity")
+        
+        if existing is None:
+            if edit.quantity > 0:
+                portfolio.append(PortfolioItem(
+                    symbol=edit.symbol,
+                    quantity=edit.quantity,
+                    avg_buy_price=edit.avg_buy_price if edit.avg_buy_price is not None else prices.price(symbol, 0.0),
+                    sector=edit.sector
+                ))
+            continue
         
-        value = item.quantity * current_price
-        holdings_values.append(value)
-    
-    top_holding_pct = (max(holdings_values) / total_value * 100) if total_value > 0 and holdings_values else 0
+        new_quantity = existing.quantity + edit.quantity if edit.action == "add" else edit.quantity
+        if new_quantity <= 0:
+            portfolio = [item for item in portfolio if item is not existing]
+            continue
+        if edit.avg_buy_price is not None:
+            existing.avg_buy_price = edit.avg_buy_price
+        if edit.sector is not None:
+            existing.sector = edit.sector
+        existing.quantity = new_quantity
+    return portfolio
+
+def apply_weight_target(base: List[PortfolioItem], symbol: str, weight: float, sector: Optional[str], prices: PriceSnapshot) -> List[PortfolioItem]:
+    """Resize one holding to a target value weight, scaling the rest to keep total value"""
+    symbol = symbol.upper()
+    values = calculate_holding_values(base, prices)
+    total = sum(values)
+    price = prices.price(symbol, next((item.avg_buy_price for item in base if item.symbol.upper() == symbol), 0.0))
+    if total <= 0 or price <= 0:
+        raise ValueError(f"Cannot size {symbol} without a price and a non-empty portfolio")
+    
+    target_value = weight * total
+    others_value = sum(v for item, v in zip(base, values) if item.symbol.upper() != symbol)
+    scale = (total - target_value) / others_value if others_value > 0 else 0.0
+    
+    portfolio = []
+    for item in base:
+        if item.symbol.upper() == symbol:
+            continue
+        if item.quantity * scale > 0:
+            portfolio.append(item.model_copy(update={"quantity": item.quantity * scale}))
+    if target_value > 0:
+        existing = next((item for item in base if item.symbol.upper() == symbol), None)
+        portfolio.append(PortfolioItem(
+            symbol=existing.symbol if existing else symbol,
+            quantity=target_value / price,
+            avg_buy_price=existing.avg_buy_price if existing else price,
+            sector=sector or (existing.sector if existing else None)
+        ))
+    return portfolio
+
+async def project_simulation(request: SimulationRequest, prices: PriceSnapshot) -> Optional[Dict]:
+    """Monte Carlo projection of both simulator portfolios on common random paths"""
+    config = request.projection
+    
+    portfolios = {}
+    for name, portfolio in (("initial_portfolio", request.current_portfolio), ("modified_portfolio", request.modified_portfolio)):
+        holdings = {}
+        for item, value in zip(portfolio, calculate_holding_values(portfolio, prices)):
+            holdings[item.symbol.upper()] = holdings.get(item.symbol.upper(), 0.0) + value
+        portfolios[name] = holdings
+    
+    symbols = sorted({symbol for holdings in portfolios.values() for symbol in holdings})
+    await asyncio.to_thread(
+        ohlcv_store.backfill_many,
+        symbols,
+        [(prices.get(symbol) or {}).get('asset_type', 'stock') for symbol in symbols]
+    )
     
-    return PortfolioMetrics(
-        total_value=total_value,
-        risk_score=calculate_risk_score(portfolio),
-        diversification_score=calculate_diversification_score(portfolio),
-        sentiment_score=calculate_news_sentiment_score(portfolio),
-        opportunity_exposure=calculate_opportunity_exposure(portfolio),
-        threat_exposure=calculate_threat_exposure(portfolio),
-        sector_distribution=sector_distribution,
-        top_holding_pct=top_holding_pct
+    horizon = min(max(request.horizon_years, 1), settings.PROJECTION_MAX_YEARS)
+    return await asyncio.to_thread(
+        project_holdings,
+        portfolios,
+        horizon,
+        config.method,
+        config.paths,
+        config.seed
     )
 
-@app.post("/api/portfolio/simulate")
-async def simulate_portfolio_changes(request: SimulationRequest, db: AsyncSession = Depends(get_session)):
-    """
-    Simulate portfolio changes and get AI recommendation
-    """
-    try:
-        logger.info(f"🎮 Simulating portfolio changes for user {request.user_id}")
-        
-        # Calculate metrics for both portfolios
-        current_metrics = calculate_portfolio_metrics(request.current_portfolio)
-        modified_metrics = calculate_portfolio_metrics(request.modified_portfolio)
-        
-        # Calculate deltas
-        changes = {
-            "risk_delta": modified_metrics.risk_score - current_metrics.risk_score,
-            "diversification_delta": modified_metrics.diversification_score - current_metrics.diversification_score,
-            "sentiment_delta": modified_metrics.sentiment_score - current_metrics.sentiment_score,
-            "opportunity_delta": modified_metrics.opportunity_exposure - current_metrics.opportunity_exposure,
-            "threat_delta": modified_metrics.threat_exposure - current_metrics.threat_exposure,
-            "value_delta": modified_metrics.total_value - current_metrics.total_value,
-            "top_holding_delta": modified_metrics.top_holding_pct - current_metrics.top_holding_pct
-        }
-        
-        # Build AI prompt for recommendation
-        current_portfolio_summary = "\n".join([
-            f"  - {item.symbol}: {item.quantity} shares @ ${item.avg_buy_price:.2f} (Sector: {item.sector or 'Unknown'})"
-            for item in request.current_portfolio
-        ])
-        
-        modified_portfolio_summary = "\n".join([
-            f"  - {item.symbol}: {item.quantity} shares @ ${item.avg_buy_price:.2f} (Sector: {item.sector or 'Unknown'})"
-            for item in request.modified_portfolio
-        ])
-        
-        ai_prompt = f"""You are a financial advisor AI evaluating a proposed portfolio change.
+async def generate_simulation_summary(
+    current_portfolio: List[PortfolioItem],
+    modified_portfolio: List[PortfolioItem],
+    current_metrics: PortfolioMetrics,
+    modified_metrics: PortfolioMetrics,
+    changes: Dict[str, float],
+    risk_appetite: str,
+    investment_goal: str,
+    horizon_years: int
+) -> Dict:
+    """Ask Gemini whether to proceed with a portfolio change (rule-based fallback)"""
+    # Build AI prompt for recommendation
+    current_portfolio_summary = "\n".join([
+        f"  - {item.symbol}: {item.quantity} shares @ ${item.avg_buy_price:.2f} (Sector: {item.sector or 'Unknown'})"
+        for item in current_portfolio
+    ])
+    
+    modified_portfolio_summary = "\n".join([
+        f"  - {item.symbol}: {item.quantity} shares @ ${item.avg_buy_price:.2f} (Sector: {item.sector or 'Unknown'})"
+        for item in modified_portfolio
+    ])
+    
+    ai_prompt = f"""You are a financial advisor AI evaluating a proposed portfolio change.
 
 USER PROFILE:
-- Risk Appetite: {request.risk_appetite}
-- Investment Goal: {request.investment_goal}
-- Time Horizon: {request.horizon_years} years
+- Risk Appetite: {risk_appetite}
+- Investment Goal: {investment_goal}
+- Time Horizon: {horizon_years} years
 
 CURRENT PORTFOLIO:
 {current_portfolio_summary}
@@ -652,122 +832,245 @@ Respond in this EXACT JSON format:
 }}
 
 Consider:
-1. Alignment with risk appetite ({request.risk_appetite})
-2. Suitability for investment goal ({request.investment_goal})
-3. Time horizon appropriateness ({request.horizon_years} years)
+1. Alignment with risk appetite ({risk_appetite})
+2. Suitability for investment goal ({investment_goal})
+3. Time horizon appropriateness ({horizon_years} years)
 4. Diversification improvement/degradation
 5. Risk-adjusted returns potential
 6. Concentration risks
 
 Respond ONLY with the JSON object, no other text.
 """
+    
+    # Call Gemini AI
+    try:
+        ai_response_text = await gemini_companion.chat_with_user(ai_prompt)
         
-        # Call Gemini AI
-        try:
-            ai_response_text = await gemini_companion.chat_with_user(ai_prompt)
-            
-            # Extract JSON from response (handle markdown formatting)
-            import re
-            import json
-            
-            # Try to extract JSON from markdown code blocks
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', ai_response_text, re.DOTALL)
+        # Extract JSON from response (handle markdown formatting)
+        import re
+        import json
+        
+        # Try to extract JSON from markdown code blocks
+        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', ai_response_text, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(1)
+        else:
+            # Try to find raw JSON
+            json_match = re.search(r'\{.*\}', ai_response_text, re.DOTALL)
             if json_match:
-                json_str = json_match.group(1)
+                json_str = json_match.group(0)
             else:
-                # Try to find raw JSON
-                json_match = re.search(r'\{.*\}', ai_response_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                else:
-                    raise ValueError("No JSON found in AI response")
-            
-            ai_summary = json.loads(json_str)
-            
-            # Validate required keys
-            required_keys = ['should_proceed', 'reasoning', 'warnings', 'confidence']
-            if not all(key in ai_summary for key in required_keys):
-                raise ValueError("AI response missing required keys")
-            
-        except Exception as e:
-            logger.error(f"AI analysis failed: {e}, using fallback logic")
-            
-            # Fallback rule-based recommendation
-            should_proceed = True
-            warnings = []
-            
-            # Check risk alignment
-            if request.risk_appetite == "low" and changes['risk_delta'] > 10:
-                should_proceed = False
-                warnings.append("Risk increase too high for low-risk investor")
-            elif request.risk_appetite == "high" and changes['risk_delta'] < -20:
-                warnings.append("Significant risk reduction may limit growth potential")
-            
-            # Check diversification
-            if changes['diversification_delta'] < -15:
-                should_proceed = False
-                warnings.append("Diversification is significantly reduced")
-            elif changes['diversification_delta'] > 20:
-                warnings.append("Great improvement in diversification!")
-            
-            # Check concentration
-            if modified_metrics.top_holding_pct > 50:
-                should_proceed = False
-                warnings.append("Top holding exceeds 50% - too concentrated")
-            
-            # Check time horizon vs risk
-            if request.horizon_years < 3 and modified_metrics.risk_score > 70:
-                warnings.append("High risk may not suit short time horizon")
-            
-            if not warnings:
-                warnings = ["Change appears reasonable based on your profile"]
-            
-            confidence = 0.65 if should_proceed else 0.75
-            
-            ai_summary = {
-                "should_proceed": should_proceed,
-                "reasoning": f"Based on your {request.risk_appetite} risk appetite and {request.horizon_years}-year horizon, "
-                            f"this change {'aligns well' if should_proceed else 'may not be optimal'} with your goals.",
-                "warnings": warnings,
-                "confidence": confidence
-            }
+                raise ValueError("No JSON found in AI response")
+        
+        ai_summary = json.loads(json_str)
+        
+        # Validate required keys
+        required_keys = ['should_proceed', 'reasoning', 'warnings', 'confidence']
+        if not all(key in ai_summary for key in required_keys):
+            raise ValueError("AI response missing required keys")
+        
+    except Exception as e:
+        logger.error(f"AI analysis failed: {e}, using fallback logic")
+        
+        # Fallback rule-based recommendation
+        should_proceed = True
+        warnings = []
+        
+        # Check risk alignment
+        if risk_appetite == "low" and changes['risk_delta'] > 10:
+            should_proceed = False
+            warnings.append("Risk increase too high for low-risk investor")
+        elif risk_appetite == "high" and changes['risk_delta'] < -20:
+            warnings.append("Significant risk reduction may limit growth potential")
+        
+        # Check diversification
+        if changes['diversification_delta'] < -15:
+            should_proceed = False
+            warnings.append("Diversification is significantly reduced")
+        elif changes['diversification_delta'] > 20:
+            warnings.append("Great improvement in diversification!")
+        
+        # Check concentration
+        if modified_metrics.top_holding_pct > 50:
+            should_proceed = False
+            warnings.append("Top holding exceeds 50% - too concentrated")
+        
+        # Check time horizon vs risk
+        if horizon_years < 3 and modified_metrics.risk_score > 70:
+            warnings.append("High risk may not suit short time horizon")
+        
+        if not warnings:
+            warnings = ["Change appears reasonable based on your profile"]
+        
+        confidence = 0.65 if should_proceed else 0.75
+        
+        ai_summary = {
+            "should_proceed": should_proceed,
+            "reasoning": f"Based on your {risk_appetite} risk appetite and {horizon_years}-year horizon, "
+                        f"this change {'aligns well' if should_proceed else 'may not be optimal'} with your goals.",
+            "warnings": warnings,
+            "confidence": confidence
+        }
+    
+    return ai_summary
+
+@app.post("/api/portfolio/simulate")
+async def simulate_portfolio_changes(request: SimulationRequest, db: AsyncSession = Depends(get_session)):
+    """
+    Simulate portfolio changes and get AI recommendation
+    """
+    try:
+        logger.info(f"🎮 Simulating portfolio changes for user {request.user_id}")
+        
+        # Resolve every distinct symbol across both portfolios once, in batched calls
+        symbols = [item.symbol for item in request.current_portfolio + request.modified_portfolio]
+        prices = await fetch_price_snapshot(symbols)
+        
+        # Build the current state once, then apply only the edited positions
+        state = build_portfolio_state(request.current_portfolio, prices)
+        current_metrics = PortfolioMetrics(**state.metrics())
+        apply_portfolio_diff(state, request.current_portfolio, request.modified_portfolio, prices)
+        modified_metrics = PortfolioMetrics(**state.metrics())
+        
+        # Calculate deltas
+        changes = calculate_metric_changes(current_metrics, modified_metrics)
+        
+        # The AI review and the Monte Carlo projection are independent, so run them together
+        summary_task = generate_simulation_summary(
+            request.current_portfolio,
+            request.modified_portfolio,
+            current_metrics,
+            modified_metrics,
+            changes,
+            request.risk_appetite,
+            request.investment_goal,
+            request.horizon_years
+        )
+        if request.projection:
+            ai_summary, projection = await asyncio.gather(summary_task, project_simulation(request, prices))
+        else:
+            ai_summary, projection = await summary_task, None
         
         # Build response
         response = {
-            "initial_portfolio": {
-                "total_value": current_metrics.total_value,
-                "risk_score": current_metrics.risk_score,
-                "diversification_score": current_metrics.diversification_score,
-                "sentiment_score": current_metrics.sentiment_score,
-                "opportunity_exposure": current_metrics.opportunity_exposure,
-                "threat_exposure": current_metrics.threat_exposure,
-                "sector_distribution": current_metrics.sector_distribution,
-                "top_holding_pct": current_metrics.top_holding_pct,
-                "holdings_count": len(request.current_portfolio)
-            },
-            "modified_portfolio": {
-                "total_value": modified_metrics.total_value,
-                "risk_score": modified_metrics.risk_score,
-                "diversification_score": modified_metrics.diversification_score,
-                "sentiment_score": modified_metrics.sentiment_score,
-                "opportunity_exposure": modified_metrics.opportunity_exposure,
-                "threat_exposure": modified_metrics.threat_exposure,
-                "sector_distribution": modified_metrics.sector_distribution,
-                "top_holding_pct": modified_metrics.top_holding_pct,
-                "holdings_count": len(request.modified_portfolio)
-            },
+            "initial_portfolio": portfolio_metrics_summary(current_metrics, len(request.current_portfolio)),
+            "modified_portfolio": portfolio_metrics_summary(modified_metrics, len(request.modified_portfolio)),
             "changes": changes,
             "ai_summary": ai_summary
         }
         
+        if request.projection:
+            response["projection"] = projection
+        
         logger.info(f"✅ Simulation complete. Recommendation: {'Proceed' if ai_summary['should_proceed'] else 'Reconsider'}")
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Simulation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 
+@app.post("/api/portfolio/simulate/batch")
+async def simulate_portfolio_batch(request: BatchSimulationRequest):
+    """
+    Evaluate many candidate modifications of one portfolio in a single call
+    
+    Candidates come from explicit edit sets and weight sweeps; all are scored
+    on one price snapshot with array math, ranked, and only the top_k get an
+    AI review.
+    """
+    try:
+        logger.info(f"🎮 Batch simulation for user {request.user_id}")
+        
+        symbols = [item.symbol for item in request.base_portfolio]
+        symbols += [edit.symbol for candidate in request.candidates for edit in candidate.edits]
+        symbols += [sweep.symbol for sweep in request.weight_sweeps]
+        prices = await fetch_price_snapshot(symbols)
+        
+        # Expand edit sets and weight sweeps into concrete portfolios
+        names, portfolios = [], []
+        try:
+            for i, candidate in enumerate(request.candidates):
+                names.append(candidate.name or f"candidate_{i + 1}")
+                portfolios.append(apply_portfolio_edits(request.base_portfolio, candidate.edits, prices))
+            for sweep in request.weight_sweeps:
+                for weight in sweep.weights:
+                    if not 0 <= weight <= 1:
+                        raise ValueError(f"Weight {weight} for {sweep.symbol} must be between 0 and 1")
+                    names.append(f"{sweep.symbol.upper()} @ {weight:.0%}")
+                    portfolios.append(apply_weight_target(request.base_portfolio, sweep.symbol, weight, sweep.sector, prices))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if not portfolios:
+            raise HTTPException(status_code=400, detail="Provide at least one candidate or weight sweep")
+        if len(portfolios) > settings.SIMULATION_BATCH_MAX_CANDIDATES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many candidates ({len(portfolios)}); max is {settings.SIMULATION_BATCH_MAX_CANDIDATES}"
+            )
+        
+        # Row 0 is the base portfolio; metrics for every row come from one vectorized pass
+        batch = calculate_portfolio_metrics_batch([request.base_portfolio] + portfolios, prices)
+        base_metrics = batch_metrics_at(batch, 0)
+        
+        # Rank: reward diversification and opportunity, penalize risk by appetite
+        risk_weight = {"low": 1.0, "medium": 0.6, "high": 0.3}.get(request.risk_appetite.lower(), 0.6)
+        rank_score = (
+            batch["diversification_score"][1:]
+            - risk_weight * batch["risk_score"][1:]
+            + 0.2 * batch["opportunity_exposure"][1:]
+            - 0.2 * batch["threat_exposure"][1:]
+        )
+        order = np.argsort(-rank_score, kind="stable")
+        top_k = max(0, min(request.top_k, settings.SIMULATION_BATCH_MAX_AI, len(order)))
+        
+        ranked = []
+        for rank, i in enumerate(order.tolist(), start=1):
+            metrics = batch_metrics_at(batch, i + 1)
+            ranked.append({
+                "rank": rank,
+                "name": names[i],
+                "rank_score": round(float(rank_score[i]), 2),
+                "portfolio": [item.model_dump() for item in portfolios[i]],
+                "metrics": portfolio_metrics_summary(metrics, len(portfolios[i])),
+                "changes": calculate_metric_changes(base_metrics, metrics)
+            })
+        
+        # AI review only for the best candidates, concurrently
+        ai_summaries = await asyncio.gather(*[
+            generate_simulation_summary(
+                request.base_portfolio,
+                portfolios[i],
+                base_metrics,
+                batch_metrics_at(batch, i + 1),
+                ranked[rank]["changes"],
+                request.risk_appetite,
+                request.investment_goal,
+                request.horizon_years
+            )
+            for rank, i in enumerate(order[:top_k].tolist())
+        ])
+        for entry, ai_summary in zip(ranked, ai_summaries):
+            entry["ai_summary"] = ai_summary
+        
+        logger.info(f"✅ Batch simulation complete: {len(ranked)} candidates, {top_k} AI reviews")
+        
+        return {
+            "base_portfolio": portfolio_metrics_summary(base_metrics, len(request.base_portfolio)),
+            "candidates": ranked,
+            "evaluated": len(ranked),
+            "ai_reviewed": top_k
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch simulation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch simulation failed: {str(e)}")
+
 # ============================================================================
 # RECOMMENDATION OUTCOME TRACKING
 # ============================================================================
@@ -921,17 +1224,16 @@ async def fetch_news(sources: Optional[List[str]] = None, db: AsyncSession = Dep
     """Fetch news from sources"""
     logger.info(f"📰 Fetching news")
     try:
-        fetcher = get_news_fetcher()
-        articles = await fetcher.fetch_all(sources=sources)
-        saved_count = 0
-        for article_data in articles:
-            result = await db.execute(select(NewsArticle).where(NewsArticle.url == article_data['url']))
-            if result.scalar_one_or_none():
-                continue
-            db.add(NewsArticle(**article_data))
-            saved_count += 1
-        await db.commit()
-        return {"articles_fetched": len(articles), "new_saved": saved_count}
+        ingested = await ingest_news(db, get_news_fetcher(), sources=sources)
+        return {
+            "articles_fetched": ingested["fetched"],
+            "new_saved": ingested["inserted"],
+            "duplicates": ingested["duplicates"],
+            "near_duplicates": ingested["near_duplicates"],
+            "symbol_mentions": ingested["symbol_mentions"],
+            "elapsed_ms": ingested["elapsed_ms"],
+            "stages": ingested["stages"]
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -962,6 +1264,49 @@ async def get_latest_news(limit: int = 50, source: Optional[str] = None, db: Asy
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/news/search")
+async def search_news_articles(
+    q: str = Query(..., min_length=1),
+    symbol: Optional[str] = None,
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_session)
+):
+    """Ranked full-text news search with highlighted snippets (pass next_cursor back as cursor)"""
+    try:
+        page = await search_news(db, q, symbol=symbol, date_from=date_from, date_to=date_to, limit=limit, cursor=cursor)
+        return {"query": q, "total": len(page["results"]), **page}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/news/symbol/{symbol}")
+async def get_news_for_symbol(symbol: str, days: float = 7, limit: int = 50, db: AsyncSession = Depends(get_session)):
+    """Recent news mentioning a symbol (from the article_symbols index)"""
+    try:
+        articles, _ = await news_index.articles_for_symbols(db, [symbol], days=days, limit=limit)
+        return {
+            "symbol": symbol.upper(),
+            "days": days,
+            "total": len(articles),
+            "articles": [
+                {
+                    "id": a.id,
+                    "title": a.title,
+                    "summary": a.summary,
+                    "url": a.url,
+                    "source": a.source,
+                    "published_at": a.published_at.isoformat() if a.published_at else None,
+                    "sentiment": a.sentiment
+                } for a in articles
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/news/sources")
 async def get_sources(db: AsyncSession = Depends(get_session)):
     """Get news sources"""
@@ -1053,14 +1398,16 @@ async def get_market_insights(db: AsyncSession = Depends(get_session)):
                 "processed_news": []
             }
         
-        # Step 2: Process each article
+        # Step 2: Process each story (near-duplicate articles from several sources count once)
+        stories = news_dedup.group_stories(articles)
         processed_articles = []
         sentiment_scores = []
         
-        for article in articles:
-            # Map sentiment to score
+        for story in stories:
+            article = story[0]  # newest article of the story
+            # Map sentiment to score (averaged over the story's articles)
             sentiment_map = {"positive": 0.7, "neutral": 0.0, "negative": -0.7}
-            sentiment_score = sentiment_map.get(article.sentiment, 0.0)
+            sentiment_score = round(sum(sentiment_map.get(a.sentiment, 0.0) for a in story) / len(story), 3)
             sentiment_scores.append(sentiment_score)
             
             # Calculate relevance (based on keywords and source)
@@ -1078,7 +1425,9 @@ async def get_market_insights(db: AsyncSession = Depends(get_session)):
                 "relevance": relevance,
                 "summary": article.summary[:200] if article.summary else "No summary available",
                 "url": article.url,
-                "published_at": article.published_at.isoformat() if article.published_at else None
+                "published_at": article.published_at.isoformat() if article.published_at else None,
+                "article_count": len(story),
+                "sources": sorted({a.source for a in story if a.source})
             })
         
         # Step 3: Calculate aggregate metrics
@@ -1125,7 +1474,7 @@ async def get_market_insights(db: AsyncSession = Depends(get_session)):
             threat['reason'] = generate_threat_reason(threat)
         
         # Step 6: Generate AI summary
-        summary = await generate_market_summary(avg_sentiment, market_mood, global_risk, len(articles))
+        summary = await generate_market_summary(avg_sentiment, market_mood, global_risk, len(stories))
         
         logger.info(f"✅ Market Insights: {market_mood}, Sentiment: {avg_sentiment:.2f}, Risk: {global_risk}")
         
@@ -1133,12 +1482,13 @@ async def get_market_insights(db: AsyncSession = Depends(get_session)):
             "market_mood": market_mood,
             "avg_sentiment": round(avg_sentiment, 3),
             "global_risk": global_risk,
-            "confidence_score": round(min(len(articles) / 50.0, 1.0), 2),
+            "confidence_score": round(min(len(stories) / 50.0, 1.0), 2),
             "summary": summary,
             "opportunities": opportunities,
             "threats": threats,
             "processed_news": processed_articles[:20],  # Return top 20 for display
-            "total_analyzed": len(articles),
+            "total_analyzed": len(stories),
+            "total_articles": len(articles),
             "timestamp": datetime.utcnow().isoformat()
         }
         
@@ -1259,146 +1609,454 @@ async def analyze_portfolio(user_id: int, db: AsyncSession = Depends(get_session
         if not investments:
             return {"overall_risk": "low", "risk_score": 0.0}
         
-        total_risk = 0
-        for inv in investments:
-            risk_analysis = risk_engine.predict_risk_score({
-                "symbol": inv.symbol,
-                "asset_type": inv.asset_type,
-                "purchase_price": inv.purchase_price,
-                "current_price": inv.current_price or inv.purchase_price,
-                "quantity": inv.quantity
-            })
-            total_risk += risk_analysis['risk_score']
+        # Bring local history up to date (no-op for symbols checked recently)
+        await asyncio.to_thread(
+            ohlcv_store.backfill_many,
+            [inv.symbol for inv in investments],
+            [inv.asset_type for inv in investments]
+        )
+        one_year_ago = datetime.now().timestamp() - 365 * 86400
+        
+        asset_codes = encode_asset_types([inv.asset_type for inv in investments])
+        scores = risk_engine.predict_risk_scores_batch(
+            current_prices=np.array([inv.current_price or inv.purchase_price for inv in investments], dtype=float),
+            purchase_prices=np.array([inv.purchase_price for inv in investments], dtype=float),
+            asset_type_codes=asset_codes,
+            volatilities=risk_engine.historical_volatilities(
+                [ohlcv_store.closes(inv.symbol, start=one_year_ago) for inv in investments],
+                asset_codes
+            )
+        )
         
-        avg_risk = total_risk / len(investments)
+        avg_risk = float(scores['risk_score'].mean())
         overall_risk = "high" if avg_risk >= 0.7 else "medium" if avg_risk >= 0.4 else "low"
         return {"overall_risk": overall_risk, "risk_score": round(avg_risk, 3)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/risk/portfolio-ai-report")
-async def ai_portfolio_risk_report(user_id: int, db: AsyncSession = Depends(get_session)):
+@app.get("/api/risk/var/{user_id}")
+async def portfolio_value_at_risk(
+    user_id: int,
+    method: str = "historical",
+    confidence: str = "0.95,0.99",
+    horizons: str = "1,10",
+    paths: Optional[int] = None,
+    seed: Optional[int] = None,
+    lookback_days: int = 365,
+    db: AsyncSession = Depends(get_session)
+):
     """
-    AI Portfolio Risk Engine V2 - Deep Intelligence Analysis
-    Combines portfolio data + market intelligence + volatility + AI reasoning
+    Value-at-Risk and CVaR (expected shortfall) for a user's portfolio
+    
+    method: historical or monte_carlo; confidence/horizons are comma-separated lists
     """
-    logger.info(f"🧠 Generating AI Risk Report for user {user_id}...")
+    try:
+        confidence_levels = [float(c) for c in confidence.split(',') if c.strip()]
+        horizon_days = [int(h) for h in horizons.split(',') if h.strip()]
+        paths = paths or settings.VAR_DEFAULT_PATHS
+    except ValueError:
+        raise HTTPException(status_code=400, detail="confidence and horizons must be comma-separated numbers")
+    
+    if method not in ("historical", "monte_carlo"):
+        raise HTTPException(status_code=400, detail="method must be 'historical' or 'monte_carlo'")
+    if not confidence_levels or any(not 0.5 <= c < 1 for c in confidence_levels):
+        raise HTTPException(status_code=400, detail="confidence levels must be between 0.5 and 1")
+    if not horizon_days or any(not 1 <= h <= 250 for h in horizon_days):
+        raise HTTPException(status_code=400, detail="horizons must be between 1 and 250 days")
+    if not 1000 <= paths <= settings.VAR_MAX_PATHS:
+        raise HTTPException(status_code=400, detail=f"paths must be between 1000 and {settings.VAR_MAX_PATHS}")
     
     try:
-        # Step 1: Fetch portfolio data
         result = await db.execute(select(Investment).where(Investment.user_id == user_id))
         investments = result.scalars().all()
-        
         if not investments:
-            return {
-                "overall_risk": "Low",
-                "score": 0,
-                "message": "No investments in portfolio",
-                "alerts": [],
-                "opportunities": [],
-                "threats": [],
-                "ai_summary": "You don't have any investments yet. Start building your portfolio!"
-            }
+            return {"user_id": user_id, "message": "No investments in portfolio", "results": []}
         
-        # Step 2: Fetch market intelligence
-        news_result = await db.execute(
-            select(NewsArticle)
-            .order_by(NewsArticle.published_at.desc())
-            .limit(50)
+        quotes = await get_live_prices_async(
+            [inv.symbol for inv in investments],
+            [inv.asset_type for inv in investments]
         )
-        market_news = news_result.scalars().all()
-        
-        # Step 3: Build portfolio analysis
-        portfolio_holdings = []
-        total_value = 0
-        total_invested = 0
-        
+        holdings = []
         for inv in investments:
-            # Get live price (returns dict with 'price' key)
-            price_data = get_live_price(inv.symbol) 
-            current_price = price_data.get('price') if price_data else None
-            current_price = current_price or inv.current_price or inv.purchase_price
-            
-            value = current_price * inv.quantity
-            invested = inv.purchase_price * inv.quantity
-            
-            portfolio_holdings.append({
-                "symbol": inv.symbol,
-                "asset_type": inv.asset_type,
-                "quantity": inv.quantity,
-                "purchase_price": inv.purchase_price,
-                "current_price": current_price,
-                "invested": invested,
-                "current_value": value,
-                "gain_loss": value - invested,
-                "gain_loss_pct": ((value - invested) / invested * 100) if invested > 0 else 0
-            })
-            
-            total_value += value
-            total_invested += invested
-        
-        # Step 4: Compute risk metrics
-        logger.info("Computing concentration...")
-        concentration_analysis = compute_concentration(portfolio_holdings, total_value)
-        logger.info(f"Concentration score: {concentration_analysis.get('score', 0)}")
-        
-        logger.info("Computing volatility...")
-        volatility_analysis = compute_volatility(portfolio_holdings)
-        logger.info(f"Volatility score: {volatility_analysis.get('score', 0)}")
-        
-        logger.info("Matching news to holdings...")
-        news_sentiment_match = match_news_to_holdings(portfolio_holdings, market_news)
-        logger.info(f"Sentiment score: {news_sentiment_match.get('score', 0)}")
-        
-        logger.info("Computing exposure...")
-        exposure_analysis = compute_sector_exposure(portfolio_holdings)
-        logger.info(f"Exposure score: {exposure_analysis.get('score', 0)}")
-        
-        # Step 5: Calculate final risk score
-        concentration_score = float(concentration_analysis.get('score', 0))
-        volatility_score = float(volatility_analysis.get('score', 0))
-        sentiment_score = float(news_sentiment_match.get('score', 0))
-        exposure_score = float(exposure_analysis.get('score', 0))
-        
-        risk_components = {
-            "concentration_risk": concentration_score,
-            "volatility_risk": volatility_score,
-            "sentiment_risk": sentiment_score,
-            "exposure_risk": exposure_score
-        }
-        
-        logger.info(f"Risk components: {risk_components}")
-        
-        final_risk_score = (
-            concentration_score * 0.3 +
-            volatility_score * 0.25 +
-            sentiment_score * 0.25 +
-            exposure_score * 0.2
+            price_data = quotes.get(inv.symbol)
+            price = (price_data.get('price') if price_data else None) or inv.current_price or inv.purchase_price
+            holdings.append({"symbol": inv.symbol, "current_value": price * inv.quantity})
+        
+        await asyncio.to_thread(
+            ohlcv_store.backfill_many,
+            [inv.symbol for inv in investments],
+            [inv.asset_type for inv in investments]
         )
+        var_result = await asyncio.to_thread(
+            compute_portfolio_var,
+            holdings,
+            method,
+            lookback_days,
+            confidence_levels=confidence_levels,
+            horizons=horizon_days,
+            paths=paths,
+            seed=seed
+        )
+        if var_result is None:
+            raise HTTPException(status_code=422, detail="Not enough price history to compute VaR")
         
-        # Step 6: Determine overall risk level
-        if final_risk_score >= 70:
-            overall_risk = "High"
-        elif final_risk_score >= 40:
-            overall_risk = "Medium"
-        else:
-            overall_risk = "Low"
-        
-        # Step 7: Collect alerts/red flags
-        alerts = []
-        alerts.extend(concentration_analysis.get('alerts', []))
-        alerts.extend(volatility_analysis.get('alerts', []))
-        alerts.extend(news_sentiment_match.get('alerts', []))
-        alerts.extend(exposure_analysis.get('alerts', []))
+        return {"user_id": user_id, **var_result, "timestamp": datetime.utcnow().isoformat()}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ VaR error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+class OptimizationRequest(BaseModel):
+    user_id: int
+    mode: str = "min_variance"  # "min_variance", "risk_parity" or "target_volatility"
+    max_weight: Optional[float] = None  # per holding, 0-1 (defaults to the 25% rule)
+    sector_caps: Dict[str, float] = {}  # sector -> max weight (0-1)
+    sectors: Dict[str, str] = {}  # symbol -> sector (holdings are not stored with one)
+    target_volatility: Optional[float] = None  # annualized %, for target_volatility mode
+    min_trade_value: float = 1.0
+
+async def run_portfolio_optimizer(
+    investments: List[Investment],
+    quotes: Dict[str, Optional[Dict]],
+    sectors: Optional[Dict[str, str]] = None,
+    **options
+) -> Optional[Dict[str, Any]]:
+    """
+    Covariance-based rebalance for stored investments
+    
+    Args:
+        investments: User's Investment rows
+        quotes: Live quotes keyed by symbol
+        sectors: Optional symbol -> sector map used for sector caps
+        **options: Passed through to optimize_portfolio
+    
+    Returns:
+        optimize_portfolio result, or None without enough history
+    """
+    sectors = {k.upper(): v for k, v in (sectors or {}).items()}
+    holdings = []
+    for inv in investments:
+        price_data = quotes.get(inv.symbol)
+        price = (price_data.get('price') if price_data else None) or inv.current_price or inv.purchase_price
+        holdings.append({
+            "symbol": inv.symbol,
+            "quantity": inv.quantity,
+            "current_price": price,
+            "sector": sectors.get(inv.symbol.upper())
+        })
+    
+    await asyncio.to_thread(
+        ohlcv_store.backfill_many,
+        [inv.symbol for inv in investments],
+        [inv.asset_type for inv in investments]
+    )
+    return await asyncio.to_thread(optimize_portfolio, holdings, **options)
+
+@app.post("/api/portfolio/optimize")
+async def optimize_user_portfolio(request: OptimizationRequest, db: AsyncSession = Depends(get_session)):
+    """
+    Deterministic rebalance on the portfolio's covariance matrix
+    
+    Returns target weights, risk before/after and a concrete trade list
+    """
+    if request.mode not in OPTIMIZATION_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(OPTIMIZATION_MODES)}")
+    if request.mode == "target_volatility" and not (request.target_volatility and request.target_volatility > 0):
+        raise HTTPException(status_code=400, detail="target_volatility (annualized %) is required for target_volatility mode")
+    if request.max_weight is not None and not 0 < request.max_weight <= 1:
+        raise HTTPException(status_code=400, detail="max_weight must be between 0 and 1")
+    if any(not 0 < cap <= 1 for cap in request.sector_caps.values()):
+        raise HTTPException(status_code=400, detail="sector caps must be between 0 and 1")
+    
+    try:
+        result = await db.execute(select(Investment).where(Investment.user_id == request.user_id))
+        investments = result.scalars().all()
+        if not investments:
+            return {"user_id": request.user_id, "message": "No investments in portfolio", "trades": []}
         
-        # Step 8: Find opportunities (market insights matching holdings)
-        opportunities = find_opportunities_for_holdings(portfolio_holdings, market_news)
+        quotes = await get_live_prices_async(
+            [inv.symbol for inv in investments],
+            [inv.asset_type for inv in investments]
+        )
+        try:
+            optimization = await run_portfolio_optimizer(
+                investments,
+                quotes,
+                sectors=request.sectors,
+                mode=request.mode,
+                max_weight=request.max_weight,
+                sector_caps=request.sector_caps,
+                target_volatility=request.target_volatility,
+                min_trade_value=request.min_trade_value
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if optimization is None:
+            raise HTTPException(status_code=422, detail="Not enough price history to optimize")
         
-        # Step 9: Find threats (negative news matching holdings)
-        threats = find_threats_for_holdings(portfolio_holdings, market_news)
+        logger.info(f"⚖️ Optimized portfolio for user {request.user_id} ({request.mode}): {len(optimization['trades'])} trades in {optimization['solve_ms']}ms")
+        return {"user_id": request.user_id, **optimization, "timestamp": datetime.utcnow().isoformat()}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Optimizer error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def run_report_stage(
+    name: str,
+    awaitable,
+    timeout: float,
+    timings: Dict[str, float],
+    degraded: List[str],
+    fallback: Any = None,
+    required: bool = False
+):
+    """
+    Await one risk report stage with its own timeout
+
+    Args:
+        name: Stage name used in timings_ms / degraded_stages
+        awaitable: Coroutine or task for the stage
+        timeout: Seconds before the stage is abandoned
+        timings: Dict that receives the stage duration in ms
+        degraded: List that receives the name when the fallback was used
+        fallback: Value (or zero-arg callable) returned on timeout/error
+        required: Re-raise instead of falling back
+
+    Returns:
+        Stage result or fallback
+    """
+    started = time.perf_counter()
+    try:
+        return await asyncio.wait_for(awaitable, timeout=timeout)
+    except Exception as e:
+        if required:
+            raise
+        reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+        logger.warning(f"⚠️ Risk report stage '{name}' {reason} - using fallback")
+        degraded.append(name)
+        return fallback() if callable(fallback) else fallback
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def load_recent_news(limit: int = 50) -> List[NewsArticle]:
+    """Latest articles on a dedicated session so the query can overlap other DB reads"""
+    async with get_session_maker()() as session:
+        result = await session.execute(
+            select(NewsArticle)
+            .order_by(NewsArticle.published_at.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+
+async def load_indexed_news(symbols: List[str]) -> Tuple[List[NewsArticle], Dict[int, Set[str]]]:
+    """Articles mentioning the holdings within the index window (own session)"""
+    async with get_session_maker()() as session:
+        return await news_index.articles_for_symbols(session, symbols)
+
+
+# Price fetches that outlive their report's timeout (kept referenced until done)
+_detached_quote_fetches: Set[asyncio.Task] = set()
+
+
+def _forget_quote_fetch(task: asyncio.Task):
+    _detached_quote_fetches.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"⚠️ Background quote fetch failed: {task.exception()}")
+
+
+async def fetch_report_quotes(pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[Dict]]:
+    """
+    Quotes for (symbol, asset_type) pairs through the bulk price API
+
+    get_live_prices_async keys results by symbol, so a ticker held under two
+    asset types goes into a second batch; normally this is a single call.
+    """
+    batches: List[List[Tuple[str, str]]] = []
+    for pair in pairs:
+        batch = next((b for b in batches if all(s.upper() != pair[0].upper() for s, _ in b)), None)
+        if batch is None:
+            batch = []
+            batches.append(batch)
+        batch.append(pair)
+
+    results = await asyncio.gather(*(
+        get_live_prices_async([s for s, _ in batch], [t for _, t in batch]) for batch in batches
+    ))
+    return {pair: quotes.get(pair[0]) for batch, quotes in zip(batches, results) for pair in batch}
+
+
+async def build_portfolio_risk_report(user_id: int, db: AsyncSession) -> Dict[str, Any]:
+    """
+    AI Portfolio Risk Engine V2 - Deep Intelligence Analysis
+    Combines portfolio data + market intelligence + volatility + AI reasoning
+
+    Independent stages run concurrently, each with its own timeout; a stage
+    that fails or times out falls back to a neutral result and is listed in
+    degraded_stages instead of failing the whole report.
+    """
+    logger.info(f"🧠 Generating AI Risk Report for user {user_id}...")
+    report_started = time.perf_counter()
+    stage_timeout = settings.RISK_REPORT_STAGE_TIMEOUT_SECONDS
+    timings: Dict[str, float] = {}
+    degraded: List[str] = []
+    
+    # Stage 1: Portfolio and market news, read concurrently
+    news_task = asyncio.create_task(
+        run_report_stage("news", load_recent_news(50), stage_timeout, timings, degraded, fallback=list)
+    )
+    try:
+        result = await run_report_stage(
+            "investments",
+            db.execute(select(Investment).where(Investment.user_id == user_id)),
+            stage_timeout, timings, degraded, required=True
+        )
+    except BaseException:
+        news_task.cancel()
+        raise
+    investments = result.scalars().all()
+    
+    if not investments:
+        news_task.cancel()
+        return {
+            "overall_risk": "Low",
+            "score": 0,
+            "message": "No investments in portfolio",
+            "alerts": [],
+            "opportunities": [],
+            "threats": [],
+            "ai_summary": "You don't have any investments yet. Start building your portfolio!"
+        }
+    
+    # Stage 2: Bulk quotes alongside the price history backfill
+    pairs = list(dict.fromkeys((inv.symbol, inv.asset_type) for inv in investments))
+    indexed_news_task = asyncio.create_task(run_report_stage(
+        "news_index", load_indexed_news([s for s, _ in pairs]),
+        stage_timeout, timings, degraded, fallback=lambda: ([], {})
+    ))
+    backfill_task = asyncio.create_task(run_report_stage(
+        "history_backfill",
+        asyncio.to_thread(ohlcv_store.backfill_many, [s for s, _ in pairs], [t for _, t in pairs]),
+        stage_timeout, timings, degraded
+    ))
+    
+    # Shielded: on timeout the report falls back to stored prices, but the fetch
+    # (and any lookups other requests are waiting on through it) still finishes
+    # and fills the quote cache
+    quotes_task = asyncio.create_task(fetch_report_quotes(pairs))
+    _detached_quote_fetches.add(quotes_task)
+    quotes_task.add_done_callback(_forget_quote_fetch)
+    quotes = await run_report_stage(
+        "prices", asyncio.shield(quotes_task),
+        settings.RISK_REPORT_PRICE_TIMEOUT_SECONDS, timings, degraded, fallback=dict
+    )
+    
+    portfolio_holdings = []
+    total_value = 0
+    total_invested = 0
+    
+    for inv in investments:
+        # Missing or timed-out quotes fall back to the stored / purchase price
+        price_data = quotes.get((inv.symbol, inv.asset_type))
+        current_price = price_data.get('price') if price_data else None
+        current_price = current_price or inv.current_price or inv.purchase_price
+        
+        value = current_price * inv.quantity
+        invested = inv.purchase_price * inv.quantity
+        
+        portfolio_holdings.append({
+            "symbol": inv.symbol,
+            "asset_type": inv.asset_type,
+            "quantity": inv.quantity,
+            "purchase_price": inv.purchase_price,
+            "current_price": current_price,
+            "invested": invested,
+            "current_value": value,
+            "gain_loss": value - invested,
+            "gain_loss_pct": ((value - invested) / invested * 100) if invested > 0 else 0
+        })
         
-        # Step 10: Generate AI summary
-        ai_summary = await generate_ai_risk_summary(
+        total_value += value
+        total_invested += invested
+    
+    # Stage 3: News matching starts as soon as articles are in; analytics wait for history
+    market_news = await news_task
+    indexed_news, indexed_mentions = await indexed_news_task
+    latest_ids = {a.id for a in market_news}
+    market_news = list(market_news) + [a for a in indexed_news if a.id not in latest_ids]
+    news_match_task = asyncio.create_task(run_report_stage(
+        "news_matching",
+        asyncio.to_thread(
+            analyze_news_for_holdings, portfolio_holdings, market_news, indexed_mentions=indexed_mentions
+        ),
+        stage_timeout, timings, degraded,
+        fallback=lambda: ({"score": 30, "alerts": [], "matches": []}, [], [])
+    ))
+    await backfill_task
+    
+    volatility_analysis, var_analysis, (news_sentiment_match, opportunities, threats) = await asyncio.gather(
+        run_report_stage(
+            "volatility", asyncio.to_thread(analyze_portfolio_volatility, portfolio_holdings),
+            stage_timeout, timings, degraded
+        ),
+        # Historical 1-day/10-day VaR when history is available
+        run_report_stage(
+            "var", asyncio.to_thread(compute_portfolio_var, portfolio_holdings),
+            stage_timeout, timings, degraded
+        ),
+        news_match_task
+    )
+    if volatility_analysis is None:
+        # Not enough price history yet (or the stage failed) - fall back to the gain/loss proxy
+        volatility_analysis = compute_volatility(portfolio_holdings)
+    
+    concentration_analysis = compute_concentration(portfolio_holdings, total_value)
+    exposure_analysis = compute_sector_exposure(portfolio_holdings)
+    
+    # Stage 4: Calculate final risk score
+    concentration_score = float(concentration_analysis.get('score', 0))
+    volatility_score = float(volatility_analysis.get('score', 0))
+    sentiment_score = float(news_sentiment_match.get('score', 0))
+    exposure_score = float(exposure_analysis.get('score', 0))
+    
+    risk_components = {
+        "concentration_risk": concentration_score,
+        "volatility_risk": volatility_score,
+        "sentiment_risk": sentiment_score,
+        "exposure_risk": exposure_score
+    }
+    
+    logger.info(f"Risk components: {risk_components}")
+    
+    final_risk_score = (
+        concentration_score * 0.3 +
+        volatility_score * 0.25 +
+        sentiment_score * 0.25 +
+        exposure_score * 0.2
+    )
+    
+    # Determine overall risk level
+    if final_risk_score >= 70:
+        overall_risk = "High"
+    elif final_risk_score >= 40:
+        overall_risk = "Medium"
+    else:
+        overall_risk = "Low"
+    
+    # Collect alerts/red flags
+    alerts = []
+    alerts.extend(concentration_analysis.get('alerts', []))
+    alerts.extend(volatility_analysis.get('alerts', []))
+    alerts.extend(news_sentiment_match.get('alerts', []))
+    alerts.extend(exposure_analysis.get('alerts', []))
+    
+    # Stage 5: Generate AI summary (rule-based if Gemini is slow)
+    ai_summary = await run_report_stage(
+        "ai_summary",
+        generate_ai_risk_summary(
             portfolio_holdings=portfolio_holdings,
             risk_score=final_risk_score,
             overall_risk=overall_risk,
@@ -1407,44 +2065,87 @@ async def ai_portfolio_risk_report(user_id: int, db: AsyncSession = Depends(get_
             news_sentiment=news_sentiment_match,
             total_value=total_value,
             total_gain_loss=(total_value - total_invested)
-        )
-        
-        logger.info(f"✅ AI Risk Report: {overall_risk} (Score: {final_risk_score:.0f})")
+        ),
+        settings.RISK_REPORT_AI_TIMEOUT_SECONDS, timings, degraded,
+        fallback=lambda: rule_based_risk_summary(final_risk_score, alerts, total_value)
+    )
+    
+    timings["total"] = round((time.perf_counter() - report_started) * 1000, 1)
+    logger.info(f"✅ AI Risk Report: {overall_risk} (Score: {final_risk_score:.0f}) in {timings['total']}ms")
+    if degraded:
+        logger.warning(f"⚠️ Risk report for user {user_id} used fallbacks for: {', '.join(degraded)}")
+    
+    return {
+        "overall_risk": overall_risk,
+        "score": round(final_risk_score, 1),
+        "risk_components": {
+            "concentration": round(risk_components['concentration_risk'], 1),
+            "volatility": round(risk_components['volatility_risk'], 1),
+            "sentiment": round(risk_components['sentiment_risk'], 1),
+            "exposure": round(risk_components['exposure_risk'], 1)
+        },
+        "alerts": alerts,
+        "opportunities": opportunities,
+        "threats": threats,
+        "portfolio_summary": {
+            "total_holdings": len(portfolio_holdings),
+            "total_value": round(total_value, 2),
+            "total_invested": round(total_invested, 2),
+            "total_gain_loss": round(total_value - total_invested, 2),
+            "total_gain_loss_pct": round(((total_value - total_invested) / total_invested * 100) if total_invested > 0 else 0, 2)
+        },
+        "concentration_analysis": concentration_analysis,
+        "volatility_analysis": volatility_analysis,
+        "sentiment_analysis": news_sentiment_match,
+        "exposure_analysis": exposure_analysis,
+        "var_analysis": var_analysis,
+        "per_asset_risk": [
+            {
+                "symbol": h['symbol'],
+                "risk_level": "High" if h['gain_loss_pct'] < -15 else "Medium" if h['gain_loss_pct'] < -5 else "Low",
+                "value_pct": round((h['current_value'] / total_value * 100), 1)
+            }
+            for h in portfolio_holdings
+        ],
+        "ai_summary": ai_summary,
+        "timings_ms": timings,
+        "degraded_stages": degraded,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+async def risk_report_fingerprint(user_id: int, db: AsyncSession) -> str:
+    """Fingerprint of a user's report inputs: holdings, quantized live prices and latest news"""
+    result = await db.execute(select(Investment).where(Investment.user_id == user_id))
+    investments = result.scalars().all()
+    news_marker = (await db.execute(select(func.max(NewsArticle.id)))).scalar()
+    
+    quotes = await get_live_prices_async(
+        [inv.symbol for inv in investments],
+        [inv.asset_type for inv in investments]
+    ) if investments else {}
+    prices = {symbol: (quote or {}).get('price') for symbol, quote in quotes.items()}
+    return report_fingerprint(investments, prices, news_marker)
+
+risk_report_refresher.configure(build_portfolio_risk_report, risk_report_fingerprint)
+
+@app.get("/api/risk/portfolio-ai-report")
+async def ai_portfolio_risk_report(user_id: int, refresh: bool = False, db: AsyncSession = Depends(get_session)):
+    """
+    Latest precomputed risk report with its age
+    
+    Snapshots are kept current by the background refresher; refresh=true
+    rebuilds before returning. A user's first request builds synchronously.
+    """
+    try:
+        if not refresh:
+            snapshot = await load_snapshot(db, user_id)
+            if snapshot is not None:
+                return snapshot_payload(snapshot)
         
-        return {
-            "overall_risk": overall_risk,
-            "score": round(final_risk_score, 1),
-            "risk_components": {
-                "concentration": round(risk_components['concentration_risk'], 1),
-                "volatility": round(risk_components['volatility_risk'], 1),
-                "sentiment": round(risk_components['sentiment_risk'], 1),
-                "exposure": round(risk_components['exposure_risk'], 1)
-            },
-            "alerts": alerts,
-            "opportunities": opportunities,
-            "threats": threats,
-            "portfolio_summary": {
-                "total_holdings": len(portfolio_holdings),
-                "total_value": round(total_value, 2),
-                "total_invested": round(total_invested, 2),
-                "total_gain_loss": round(total_value - total_invested, 2),
-                "total_gain_loss_pct": round(((total_value - total_invested) / total_invested * 100) if total_invested > 0 else 0, 2)
-            },
-            "concentration_analysis": concentration_analysis,
-            "volatility_analysis": volatility_analysis,
-            "sentiment_analysis": news_sentiment_match,
-            "exposure_analysis": exposure_analysis,
-            "per_asset_risk": [
-                {
-                    "symbol": h['symbol'],
-                    "risk_level": "High" if h['gain_loss_pct'] < -15 else "Medium" if h['gain_loss_pct'] < -5 else "Low",
-                    "value_pct": round((h['current_value'] / total_value * 100), 1)
-                }
-                for h in portfolio_holdings
-            ],
-            "ai_summary": ai_summary,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        # Without refresh=true, a build already running for this user is reused
+        snapshot = await risk_report_refresher.refresh(user_id, force=refresh)
+        return snapshot_payload(snapshot, refreshed=True)
         
     except Exception as e:
         logger.error(f"❌ AI Risk Report error: {str(e)}")
@@ -1484,7 +2185,7 @@ def compute_concentration(holdings: List[Dict], total_value: float) -> Dict:
     }
 
 def compute_volatility(holdings: List[Dict]) -> Dict:
-    """Compute volatility risk - prototype with simple gain/loss variance"""
+    """Compute volatility risk - gain/loss variance proxy used when price history is missing"""
     if not holdings:
         return {"score": 0, "alerts": []}
     
@@ -1514,64 +2215,11 @@ def compute_volatility(holdings: List[Dict]) -> Dict:
     return {
         "score": score,
         "alerts": alerts,
+        "method": "proxy",
         "std_deviation": round(std_dev, 2),
         "variance_level": "High" if std_dev > 20 else "Medium" if std_dev > 10 else "Low"
     }
 
-def match_news_to_holdings(holdings: List[Dict], news_articles: List) -> Dict:
-    """Match news sentiment to portfolio holdings"""
-    if not holdings or not news_articles:
-        return {"score": 30, "alerts": [], "matches": []}
-    
-    symbols = [h['symbol'].lower() for h in holdings]
-    matches = []
-    alerts = []
-    
-    sentiment_map = {"positive": 0.7, "neutral": 0.0, "negative": -0.7}
-    
-    for article in news_articles:
-        title_lower = article.title.lower()
-        
-        # Check if any holding symbol mentioned in news
-        for holding in holdings:
-            symbol = holding['symbol'].lower()
-            
-            # Simple keyword matching
-            if symbol in title_lower or holding['asset_type'].lower() in title_lower:
-                sentiment_score = sentiment_map.get(article.sentiment, 0.0)
-                
-                matches.append({
-                    "symbol": holding['symbol'],
-                    "article_title": article.title,
-                    "sentiment": article.sentiment,
-                    "sentiment_score": sentiment_score,
-                    "source": article.source
-                })
-                
-                # Alert if negative news about holding
-                if sentiment_score < -0.3:
-                    alerts.append(f"🔴 Negative news about {holding['symbol']}: {article.title[:80]}...")
-    
-    # Calculate sentiment risk score
-    if matches:
-        avg_sentiment = sum(m['sentiment_score'] for m in matches) / len(matches)
-        
-        if avg_sentiment < -0.3:
-            score = 70
-        elif avg_sentiment < 0:
-            score = 45
-        else:
-            score = 25
-    else:
-        score = 30  # No news is neutral
-    
-    return {
-        "score": score,
-        "alerts": alerts,
-        "matches": matches[:10],  # Top 10 matches
-        "total_matches": len(matches)
-    }
-
 def compute_sector_exposure(holdings: List[Dict]) -> Dict:
     """Compute sector exposure risk"""
     if not holdings:
@@ -1613,62 +2261,6 @@ def compute_sector_exposure(holdings: List[Dict]) -> Dict:
         "dominant_sector_pct": round(max_sector[1], 1)
     }
 
-def find_opportunities_for_holdings(holdings: List[Dict], news_articles: List) -> List[Dict]:
-    """Find positive news opportunities related to holdings"""
-    opportunities = []
-    symbols = [h['symbol'].lower() for h in holdings]
-    
-    sentiment_map = {"positive": 0.7, "neutral": 0.0, "negative": -0.7}
-    
-    for article in news_articles:
-        if article.sentiment != "positive":
-            continue
-            
-        title_lower = article.title.lower()
-        
-        for holding in holdings:
-            symbol = holding['symbol'].lower()
-            if symbol in title_lower or holding['asset_type'].lower() in title_lower:
-                opportunities.append({
-                    "symbol": holding['symbol'],
-                    "title": article.title,
-                    "summary": article.summary[:150] if article.summary else "No summary",
-                    "sentiment_score": sentiment_map[article.sentiment],
-                    "source": article.source,
-                    "url": article.url
-                })
-                break
-    
-    return opportunities[:5]  # Top 5
-
-def find_threats_for_holdings(holdings: List[Dict], news_articles: List) -> List[Dict]:
-    """Find negative news threats related to holdings"""
-    threats = []
-    symbols = [h['symbol'].lower() for h in holdings]
-    
-    sentiment_map = {"positive": 0.7, "neutral": 0.0, "negative": -0.7}
-    
-    for article in news_articles:
-        if article.sentiment != "negative":
-            continue
-            
-        title_lower = article.title.lower()
-        
-        for holding in holdings:
-            symbol = holding['symbol'].lower()
-            if symbol in title_lower or holding['asset_type'].lower() in title_lower:
-                threats.append({
-                    "symbol": holding['symbol'],
-                    "title": article.title,
-                    "summary": article.summary[:150] if article.summary else "No summary",
-                    "sentiment_score": sentiment_map[article.sentiment],
-                    "source": article.source,
-                    "url": article.url
-                })
-                break
-    
-    return threats[:5]  # Top 5
-
 async def generate_ai_risk_summary(
     portfolio_holdings: List[Dict],
     risk_score: float,
@@ -1706,12 +2298,17 @@ Provide actionable advice for this investor. Be specific and professional."""
     except Exception as e:
         logger.error(f"AI summary generation failed: {e}")
         # Fallback to rule-based summary
-        if risk_score >= 70:
-            return f"Your portfolio has HIGH risk (score: {risk_score:.0f}/100). Main concerns: {', '.join(alerts[:2]) if alerts else 'portfolio concentration'}. Consider diversifying your holdings and reducing exposure to high-risk assets."
-        elif risk_score >= 40:
-            return f"Your portfolio has MEDIUM risk (score: {risk_score:.0f}/100). Watch out for: {', '.join(alerts[:2]) if alerts else 'market volatility'}. Your portfolio is reasonably balanced but could benefit from some adjustments."
-        else:
-            return f"Your portfolio has LOW risk (score: {risk_score:.0f}/100). Your investments are well-diversified with ${total_value:,.2f} in total value. Continue monitoring market conditions and maintain your balanced approach."
+        return rule_based_risk_summary(risk_score, alerts, total_value)
+
+
+def rule_based_risk_summary(risk_score: float, alerts: List[str], total_value: float) -> str:
+    """Summary used when Gemini is unavailable or too slow"""
+    if risk_score >= 70:
+        return f"Your portfolio has HIGH risk (score: {risk_score:.0f}/100). Main concerns: {', '.join(alerts[:2]) if alerts else 'portfolio concentration'}. Consider diversifying your holdings and reducing exposure to high-risk assets."
+    elif risk_score >= 40:
+        return f"Your portfolio has MEDIUM risk (score: {risk_score:.0f}/100). Watch out for: {', '.join(alerts[:2]) if alerts else 'market volatility'}. Your portfolio is reasonably balanced but could benefit from some adjustments."
+    else:
+        return f"Your portfolio has LOW risk (score: {risk_score:.0f}/100). Your investments are well-diversified with ${total_value:,.2f} in total value. Continue monitoring market conditions and maintain your balanced approach."
 
 # ============================================================================
 # AI INVESTMENT RECOMMENDATIONS
@@ -1742,9 +2339,14 @@ async def get_investment_recommendations(user_id: int, db: AsyncSession = Depend
         total_value = 0
         sector_distribution = {}
         
+        quotes = await get_live_prices_async(
+            [inv.symbol for inv in investments],
+            [inv.asset_type for inv in investments]
+        )
+        
         for inv in investments:
             # Get price data (returns dict with 'price' key)
-            price_data = get_live_price(inv.symbol)
+            price_data = quotes.get(inv.symbol)
             current_price = price_data.get('price', inv.purchase_price) if price_data else inv.purchase_price
             current_value = inv.quantity * current_price
             total_value += current_value
@@ -1770,6 +2372,13 @@ async def get_investment_recommendations(user_id: int, db: AsyncSession = Depend
             else:
                 sector_distribution["Other"] = sector_distribution.get("Other", 0) + item["allocation_percent"]
         
+        # Deterministic rebalance the AI explains instead of inventing trades
+        rebalance = None
+        try:
+            rebalance = await run_portfolio_optimizer(investments, quotes, mode="min_variance")
+        except Exception as e:
+            logger.warning(f"⚠️ Rebalance optimizer unavailable: {str(e)}")
+        
         # 3. Get risk analysis (if available)
         risk_data = {}
         try:
@@ -1804,6 +2413,14 @@ async def get_investment_recommendations(user_id: int, db: AsyncSession = Depend
         except:
             pass
         
+        if rebalance:
+            rebalance_text = chr(10).join(
+                [f"Max {rebalance['constraints']['max_weight'] * 100:.0f}% per holding; volatility {rebalance['current']['volatility_pct']}% -> {rebalance['optimized']['volatility_pct']}%"] +
+                [f"- {t['action'].upper()} {t['quantity']:g} {t['symbol']} (${t['value']:,.2f})" for t in rebalance['trades']]
+            )
+        else:
+            rebalance_text = "Not available (insufficient price history)"
+        
         # 5. Build Gemini AI prompt
         prompt = f"""You are a professional financial advisor AI.
 
@@ -1824,6 +2441,9 @@ Main Concerns: {', '.join(risk_data.get('alert_types', [])) if risk_data.get('al
 RECENT NEWS SENTIMENT:
 {chr(10).join([f"- {n['symbol']}: {n['title'][:50]}... (sentiment: {n['sentiment']:.2f})" for n in news_data[:3]]) if news_data else 'No recent news'}
 
+OPTIMIZER REBALANCE (minimum variance):
+{rebalance_text}
+
 TASK:
 Generate personalized investment recommendations for this user.
 
@@ -1851,6 +2471,7 @@ IMPORTANT:
 - No markdown formatting
 - No explanations outside the JSON
 - Base recommendations on actual portfolio data
+- Use the optimizer trades (when available) for sells and for buys of existing holdings, and explain them
 - Suggest realistic allocation percentages
 """
         
@@ -1876,6 +2497,7 @@ IMPORTANT:
                 raise ValueError("Invalid JSON structure")
             
             logger.info(f"✅ AI recommendations generated successfully")
+            recommendations["rebalance"] = rebalance
             return recommendations
             
         except Exception as e:
@@ -1889,6 +2511,9 @@ IMPORTANT:
                     {"symbol": "HDFC", "reason": "Banking sector leader for stability", "allocation_percent": 8}
                 ],
                 "recommended_sells": [
+                    {"symbol": t["symbol"], "reason": f"Optimizer rebalance - sell {t['quantity']:g} shares (${t['value']:,.2f}) to lower portfolio volatility"}
+                    for t in rebalance["trades"] if t["action"] == "sell"
+                ] if rebalance else [
                     {"symbol": portfolio_data[0]["symbol"] if portfolio_data else "N/A", 
                      "reason": f"Reduce concentration - currently {portfolio_data[0]['allocation_percent']:.0f}% of portfolio"}
                 ] if portfolio_data and portfolio_data[0]["allocation_percent"] > 40 else [],
@@ -1897,7 +2522,8 @@ IMPORTANT:
                     {"sector": "Finance", "target_percent": 20, "why": "Banking stocks provide steady dividends"},
                     {"sector": "Consumer Goods", "target_percent": 10, "why": "Essential sector for all-weather portfolio"}
                 ],
-                "overall_summary": f"Your portfolio of ${total_value:,.2f} needs better diversification. Consider reducing concentration in {list(sector_distribution.keys())[0] if sector_distribution else 'current holdings'} sector and adding exposure to healthcare, finance, and consumer goods."
+                "overall_summary": f"Your portfolio of ${total_value:,.2f} needs better diversification. Consider reducing concentration in {list(sector_distribution.keys())[0] if sector_distribution else 'current holdings'} sector and adding exposure to healthcare, finance, and consumer goods.",
+                "rebalance": rebalance
             }
     
     except Exception as e:
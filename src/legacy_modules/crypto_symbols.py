@@ -0,0 +1,263 @@
+"""
+Crypto Symbol Index - Local CoinGecko symbol -> coin ID resolver
+The coin list is downloaded once, kept on disk and refreshed periodically,
+so resolving a symbol is a dictionary lookup instead of a cg.search round trip.
+When several coins share a ticker, the one with the best market-cap rank wins.
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CryptoSymbolIndex:
+    """
+    Exact and prefix lookup over the CoinGecko coin list
+
+    - overrides: hand-picked symbol -> ID mapping that always wins (e.g. CRYPTO_MAPPING)
+    - loader: callable returning [{'id', 'symbol', 'name'}, ...] (cg.get_coins_list)
+    - rank_loader: optional callable returning {coin id: market cap rank}, used
+      to pick between coins that share a ticker (unranked coins go last)
+    - Symbols that fail to resolve are remembered in a bounded negative cache
+    """
+
+    def __init__(
+        self,
+        cache_path: str,
+        loader: Callable[[], List[Dict[str, Any]]],
+        overrides: Optional[Dict[str, str]] = None,
+        refresh_interval: float = 24 * 3600,
+        negative_ttl: float = 3600,
+        rank_loader: Optional[Callable[[], Dict[str, int]]] = None,
+        max_negative: int = 4096
+    ):
+        self.cache_path = cache_path
+        self.loader = loader
+        self.overrides = {k.upper(): v for k, v in (overrides or {}).items()}
+        self.refresh_interval = refresh_interval
+        self.negative_ttl = negative_ttl
+        self.rank_loader = rank_loader
+        self.max_negative = max(1, max_negative)
+
+        self._by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+        self._sorted_symbols: List[str] = []
+        self._ranks: Dict[str, int] = {}
+        self._negative: "OrderedDict[str, float]" = OrderedDict()  # symbol -> expiry, oldest first
+        self._ambiguous_logged: set = set()
+        self._loaded_at = 0.0
+        self._loaded = False
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._stats = {'lookups': 0, 'resolved': 0, 'negative_hits': 0, 'unresolved': 0, 'refreshes': 0, 'refresh_errors': 0, 'ambiguous': 0}
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _build(self, coins: List[Dict[str, Any]], loaded_at: float, ranks: Optional[Dict[str, int]] = None):
+        ranks = ranks or {}
+        by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+        for coin in coins:
+            symbol = (coin.get('symbol') or '').upper()
+            if symbol and coin.get('id'):
+                by_symbol.setdefault(symbol, []).append({'id': coin['id'], 'name': coin.get('name', coin['id'])})
+
+        # Prefer the canonical coin when many share a ticker: best market-cap
+        # rank first, then (for unranked coins) the shortest ID
+        unranked = float('inf')
+        for candidates in by_symbol.values():
+            candidates.sort(key=lambda c: (ranks.get(c['id'], unranked), len(c['id']), c['id']))
+
+        with self._lock:
+            self._by_symbol = by_symbol
+            self._sorted_symbols = sorted(by_symbol)
+            self._ranks = ranks
+            self._loaded_at = loaded_at
+            self._loaded = True
+            self._negative.clear()
+            self._ambiguous_logged.clear()
+
+    def _load_from_disk(self) -> bool:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            self._build(payload['coins'], payload.get('fetched_at', 0.0), payload.get('ranks'))
+            logger.info(f"✅ Loaded {len(self._by_symbol)} crypto symbols from {self.cache_path}")
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read crypto symbol cache: {e}")
+            return False
+
+    def _save_to_disk(self, coins: List[Dict[str, Any]], fetched_at: float, ranks: Dict[str, int]):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': fetched_at, 'coins': coins, 'ranks': ranks}, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write crypto symbol cache: {e}")
+
+    def refresh(self) -> bool:
+        """Download the coin list and rebuild the index (blocking)"""
+        try:
+            logger.info("🪙 Refreshing CoinGecko coin list...")
+            coins = [
+                {'id': c.get('id'), 'symbol': c.get('symbol'), 'name': c.get('name')}
+                for c in self.loader() or []
+            ]
+            if not coins:
+                raise ValueError("empty coin list")
+            ranks = self._load_ranks()
+            fetched_at = time.time()
+            self._build(coins, fetched_at, ranks)
+            self._save_to_disk(coins, fetched_at, ranks)
+            self._stats['refreshes'] += 1
+            logger.info(f"✅ Indexed {len(self._by_symbol)} crypto symbols")
+            return True
+        except Exception as e:
+            self._stats['refresh_errors'] += 1
+            logger.error(f"❌ Error refreshing coin list: {str(e)}")
+            return False
+
+    def _load_ranks(self) -> Dict[str, int]:
+        """Market-cap ranks from rank_loader, keeping the previous ones if it fails"""
+        if self.rank_loader is None:
+            return self._ranks
+        try:
+            return {coin_id: int(rank) for coin_id, rank in (self.rank_loader() or {}).items() if rank}
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load coin market-cap ranks: {e}")
+            return self._ranks
+
+    def load(self):
+        """Load from disk, downloading the list only if no local copy exists"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            if not self._load_from_disk() and not self.refresh():
+                # Stay usable with just the overrides; retry on the next periodic check
+                with self._lock:
+                    self._loaded = True
+                    self._loaded_at = 0.0
+
+    def _maybe_refresh_in_background(self):
+        if time.time() - self._loaded_at < self.refresh_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+                    if self._loaded_at == 0.0:
+                        # Failed again - back off for a negative TTL before retrying
+                        self._loaded_at = time.time() - self.refresh_interval + self.negative_ttl
+
+        threading.Thread(target=run, name="crypto-index-refresh", daemon=True).start()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def is_known(self, symbol: str) -> bool:
+        """True if the symbol maps to at least one coin (no network)"""
+        symbol = symbol.upper()
+        if symbol in self.overrides:
+            return True
+        self.load()
+        return symbol in self._by_symbol
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        """
+        Resolve a crypto symbol to its CoinGecko ID
+
+        Args:
+            symbol: Crypto symbol (e.g., BTC, PEPE)
+
+        Returns:
+            CoinGecko coin ID, or None if the symbol is unknown
+        """
+        symbol = symbol.upper()
+        self._stats['lookups'] += 1
+
+        if symbol in self.overrides:
+            self._stats['resolved'] += 1
+            return self.overrides[symbol]
+
+        with self._lock:
+            expires = self._negative.get(symbol)
+            if expires is not None and expires <= time.time():
+                self._negative.pop(symbol, None)
+                expires = None
+        if expires is not None:
+            self._stats['negative_hits'] += 1
+            return None
+
+        self.load()
+        self._maybe_refresh_in_background()
+
+        candidates = self._by_symbol.get(symbol)
+        if candidates:
+            self._stats['resolved'] += 1
+            if len(candidates) > 1 and symbol not in self._ambiguous_logged:
+                self._ambiguous_logged.add(symbol)
+                self._stats['ambiguous'] += 1
+                ranked = candidates[0]['id'] in self._ranks
+                logger.info(
+                    f"🪙 {symbol} matches {len(candidates)} coins, using {candidates[0]['id']} "
+                    f"({'top market cap' if ranked else 'no market-cap rank, shortest id'})"
+                )
+            return candidates[0]['id']
+
+        self._stats['unresolved'] += 1
+        with self._lock:
+            self._negative[symbol] = time.time() + self.negative_ttl
+            self._negative.move_to_end(symbol)
+            while len(self._negative) > self.max_negative:
+                self._negative.popitem(last=False)
+        return None
+
+    def search_prefix(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Coins whose symbol starts with prefix (shortest symbols first)"""
+        prefix = prefix.upper()
+        if not prefix:
+            return []
+        self.load()
+
+        start = bisect.bisect_left(self._sorted_symbols, prefix)
+        matches = []
+        for symbol in self._sorted_symbols[start:]:
+            if not symbol.startswith(prefix):
+                break
+            matches.append(symbol)
+
+        matches.sort(key=lambda s: (len(s), s))
+        return [
+            {'symbol': symbol, 'id': coin['id'], 'name': coin['name']}
+            for symbol in matches[:limit]
+            for coin in self._by_symbol[symbol][:1]
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['symbols'] = len(self._by_symbol)
+        stats['negative_cached'] = len(self._negative)
+        stats['age_seconds'] = round(time.time() - self._loaded_at, 1) if self._loaded_at else None
+        return stats
@@ -1,6 +1,7 @@
 """
 Gemini AI Service for LLM-powered financial companion
 """
+import asyncio
 import google.generativeai as genai
 from typing import Optional, Dict, List
 import json
@@ -46,7 +47,7 @@ Term: {term}
 Provide a clear, concise explanation (2-3 sentences) without using complex jargon."""
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
             logger.info(f"✅ Term explanation generated for: {term}")
             return response.text
         except Exception as e:
@@ -75,7 +76,7 @@ Provide your analysis in the following JSON format:
 }}"""
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
             logger.info(f"✅ Risk analysis response received")
             
             # Extract JSON from response
@@ -110,7 +111,7 @@ Technical Text: {technical_text}
 
 Simple Explanation:"""
         
-        response = self.model.generate_content(prompt)
+        response = await asyncio.to_thread(self.model.generate_content, prompt)
         return response.text
     
     async def detect_scam_language(self, message: str) -> Dict:
@@ -130,7 +131,7 @@ Respond in JSON format:
 }}"""
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
             logger.info(f"✅ Scam detection response received")
             
             text = response.text.strip()
@@ -169,7 +170,7 @@ User Question: {user_query}
 Provide a helpful, clear, and encouraging response. Keep it concise but informative."""
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
             logger.info(f"✅ Chat response generated")
             return response.text
         except Exception as e:
@@ -196,7 +197,7 @@ Generate content in the following JSON format:
     ]
 }}"""
         
-        response = self.model.generate_content(prompt)
+        response = await asyncio.to_thread(self.model.generate_content, prompt)
         try:
             text = response.text.strip()
             if "```json" in text:
@@ -223,7 +224,7 @@ Document:
 
 Provide a clear, concise summary highlighting the most important points."""
         
-        response = self.model.generate_content(prompt)
+        response = await asyncio.to_thread(self.model.generate_content, prompt)
         return response.text
 
 # Global instance
@@ -0,0 +1,107 @@
+"""
+Leader Lease - Elect one worker for a background job through a database row
+Every uvicorn worker (and any standalone worker) runs the same background
+loops; a named scheduler_leases row lets exactly one of them do the work
+while the others stand by and take over when the lease expires.
+"""
+import asyncio
+import logging
+import os
+import socket
+import sys
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.models import SchedulerLease
+from shared.utils.database import get_session_maker
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    """Time-limited lease on a named job, renewed by the holder while it works"""
+
+    def __init__(self, name: str, lease_seconds: float = 60):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.acquired = 0  # times this worker became leader
+
+    async def acquire(self) -> bool:
+        """
+        Take or renew the lease; True while this worker is the leader
+
+        The conditional UPDATE only matches when we already hold the lease or
+        it has expired, so two workers can't both win it.
+        """
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        async with get_session_maker()() as session:
+            result = await session.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == self.name,
+                    or_(SchedulerLease.holder == self.holder, SchedulerLease.expires_at < now)
+                )
+                .values(holder=self.holder, expires_at=expires_at)
+            )
+            leader = result.rowcount == 1
+            await session.commit()
+            if not leader:
+                existing = await session.execute(select(SchedulerLease.id).where(SchedulerLease.name == self.name))
+                if existing.first() is None:
+                    # First run against this database: create the lease row
+                    session.add(SchedulerLease(name=self.name, holder=self.holder, expires_at=expires_at))
+                    try:
+                        await session.commit()
+                        leader = True
+                    except IntegrityError:
+                        await session.rollback()  # another worker created it first
+
+        if leader and not self.is_leader:
+            self.acquired += 1
+            logger.info(f"👑 {self.name} leader: {self.holder}")
+        self.is_leader = leader
+        return leader
+
+    async def release(self):
+        """Expire our lease so another worker can take over immediately"""
+        if not self.is_leader:
+            return
+        async with get_session_maker()() as session:
+            await session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, SchedulerLease.holder == self.holder)
+                .values(expires_at=datetime.utcnow())
+            )
+            await session.commit()
+        self.is_leader = False
+
+    @asynccontextmanager
+    async def keep_alive(self):
+        """Renew the lease in the background while the body runs (e.g. a long poll)"""
+        async def renew():
+            while True:
+                await asyncio.sleep(self.lease_seconds / 3)
+                try:
+                    await self.acquire()
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not renew {self.name} lease: {e}")
+
+        task = asyncio.create_task(renew())
+        try:
+            yield self
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,243 @@
+"""
+News Dedup - Near-duplicate story clustering with MinHash + LSH
+The same event arrives from several sources under different URLs; each new
+article's title + summary shingles get a MinHash signature, LSH banding finds
+earlier articles with similar signatures, and the article joins the most
+similar one's story cluster (news_articles.cluster_id). The in-memory index
+covers a rolling window and is capped, so memory stays bounded.
+"""
+import heapq
+import logging
+import os
+import re
+import sys
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.config import settings
+from shared.models import NewsArticle
+from legacy_modules.news_source_state import naive_utc
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(text: Optional[str], size: int = 2) -> Set[str]:
+    """Word n-grams of the lowercased text (single words for very short text)"""
+    tokens = _TOKEN_PATTERN.findall((text or "").lower())
+    if len(tokens) < size:
+        return set(tokens)
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures from num_perm universal hash functions (a*x + b mod p)"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 7):
+        rng = np.random.RandomState(seed)
+        # a, b < 2^32 and x < 2^32 keep a*x + b inside uint64
+        self.a = rng.randint(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, shingle_set: Iterable[str]) -> Optional[np.ndarray]:
+        """uint32 signature, or None for empty input"""
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingle_set), dtype=np.uint64)
+        if hashes.size == 0:
+            return None
+        permuted = (np.outer(hashes, self.a) + self.b) % _PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimated_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / a.size
+
+
+class StoryIndex:
+    """
+    LSH index of recent article signatures -> story cluster ids
+
+    Signatures are split into bands; articles sharing any band bucket are
+    candidates, confirmed by estimated Jaccard similarity >= threshold.
+    Entries older than window_days (or beyond max_entries, oldest first) are
+    evicted as new ones arrive. Entries added since the last commit() are
+    tentative: rollback() removes them when their transaction didn't commit.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.5,
+                 window_days: float = 30, max_entries: int = 50000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.window = timedelta(days=window_days)
+        self.max_entries = max_entries
+
+        self.last_id = 0  # highest article id seen (for catching up from the DB)
+        self.loaded = False
+        self._entries: Dict[int, Tuple[np.ndarray, int, List[int]]] = {}  # id -> (signature, cluster, band keys)
+        self._buckets: Dict[int, Set[int]] = {}
+        self._by_age: List[Tuple[datetime, int]] = []  # heap of (published_at, id)
+        self._stats = {'assigned': 0, 'clustered': 0, 'evicted': 0, 'rolled_back': 0}
+        self._uncommitted: List[int] = []  # ids added since the last commit()
+        self._committed_last_id = 0
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        return [hash((band, signature[band * self.rows:(band + 1) * self.rows].tobytes())) for band in range(self.bands)]
+
+    def add(self, article_id: int, text: str, published_at: Optional[datetime], cluster_id: Optional[int] = None) -> Optional[int]:
+        """
+        Index an article and return its cluster id
+
+        Args:
+            article_id: NewsArticle id
+            text: Title + summary
+            published_at: Publish time (articles outside the window aren't indexed)
+            cluster_id: Known cluster (rows loaded from the DB); found by LSH when None
+
+        Returns:
+            Cluster id, or None when the article is its own story and outside the index
+        """
+        self.last_id = max(self.last_id, article_id)
+        published_at = naive_utc(published_at) or datetime.utcnow()
+        if published_at < datetime.utcnow() - self.window or article_id in self._entries:
+            return cluster_id
+        signature = self.hasher.signature(shingles(text))
+        if signature is None:
+            return cluster_id or article_id
+
+        keys = self._band_keys(signature)
+        if cluster_id is None:
+            self._stats['assigned'] += 1
+            cluster_id = article_id
+            candidates = set().union(*(self._buckets.get(key, ()) for key in keys))
+            best = 0.0
+            for candidate in candidates:
+                similarity = estimated_jaccard(signature, self._entries[candidate][0])
+                if similarity >= self.threshold and similarity > best:
+                    best = similarity
+                    cluster_id = self._entries[candidate][1]
+            if cluster_id != article_id:
+                self._stats['clustered'] += 1
+
+        self._entries[article_id] = (signature, cluster_id, keys)
+        for key in keys:
+            self._buckets.setdefault(key, set()).add(article_id)
+        heapq.heappush(self._by_age, (published_at, article_id))
+        self._uncommitted.append(article_id)
+        self.evict()
+        return cluster_id
+
+    def _remove(self, article_id: int) -> bool:
+        entry = self._entries.pop(article_id, None)
+        if entry is None:
+            return False
+        for key in entry[2]:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(article_id)
+                if not bucket:
+                    del self._buckets[key]
+        return True
+
+    def evict(self):
+        """Drop entries older than the window, then the oldest beyond max_entries"""
+        cutoff = datetime.utcnow() - self.window
+        while self._by_age and (self._by_age[0][0] < cutoff or len(self._entries) > self.max_entries):
+            _, article_id = heapq.heappop(self._by_age)
+            if self._remove(article_id):
+                self._stats['evicted'] += 1
+
+    def commit(self):
+        """Keep everything added so far (call after the session commit)"""
+        self._uncommitted = []
+        self._committed_last_id = self.last_id
+
+    def rollback(self):
+        """
+        Forget entries added since the last commit()
+
+        Their rows were never stored (and SQLite may reuse their ids), so
+        last_id goes back too and the next sync re-reads from there.
+        """
+        for article_id in self._uncommitted:
+            self._stats['rolled_back'] += self._remove(article_id)
+        self._uncommitted = []
+        self.last_id = self._committed_last_id
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['entries'] = len(self._entries)
+        stats['buckets'] = len(self._buckets)
+        stats['last_id'] = self.last_id
+        return stats
+
+
+def story_key(article: Any) -> int:
+    """Cluster id of an article (NULL cluster_id = its own story)"""
+    return article.cluster_id or article.id
+
+
+def group_stories(articles: Iterable[Any]) -> List[List[Any]]:
+    """Articles grouped by story, in order of each story's first article"""
+    stories: Dict[int, List[Any]] = {}
+    for article in articles:
+        stories.setdefault(story_key(article), []).append(article)
+    return list(stories.values())
+
+
+async def sync_story_index(session: AsyncSession, index: Optional[StoryIndex] = None) -> int:
+    """
+    Bring the index up to date with news_articles and cluster unassigned rows
+
+    The first call loads the whole window; later calls only read rows newer
+    than the last id seen - articles just inserted by ingestion, or by another
+    worker. Rows without a cluster_id get one (flushed, caller commits and
+    then calls index.commit(), or index.rollback() if the commit fails).
+
+    Returns:
+        Number of rows that joined an existing story
+    """
+    index = index or story_index
+    cutoff = datetime.utcnow() - index.window
+    result = await session.execute(
+        select(NewsArticle.id, NewsArticle.title, NewsArticle.summary, NewsArticle.published_at, NewsArticle.cluster_id)
+        .where(NewsArticle.id > index.last_id, NewsArticle.published_at >= cutoff)
+        .order_by(NewsArticle.published_at, NewsArticle.id)
+    )
+    updates = []
+    clustered = 0
+    for article_id, title, summary, published_at, cluster_id in result.all():
+        assigned = index.add(article_id, f"{title or ''} {summary or ''}", published_at, cluster_id=cluster_id)
+        if cluster_id is None and assigned is not None:
+            updates.append({"id": article_id, "cluster_id": assigned})
+            clustered += assigned != article_id
+    if updates:
+        await session.execute(update(NewsArticle), updates)
+    if not index.loaded:
+        index.loaded = True
+        logger.info(f"🧬 Story index loaded ({len(index._entries)} articles, {clustered} near-duplicates clustered)")
+    return clustered
+
+
+# Global instance
+story_index = StoryIndex(
+    num_perm=settings.NEWS_DEDUP_NUM_PERM,
+    bands=settings.NEWS_DEDUP_BANDS,
+    threshold=settings.NEWS_DEDUP_THRESHOLD,
+    window_days=settings.NEWS_DEDUP_WINDOW_DAYS,
+    max_entries=settings.NEWS_DEDUP_MAX_ENTRIES
+)
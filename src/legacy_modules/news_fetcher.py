@@ -1,14 +1,30 @@
 """
 News Fetcher Service - Collects financial news from multiple sources
 Integrated into FinBuddy
+
+Downloading (async, on the event loop) is separate from parsing + VADER
+sentiment (pure CPU, run in a process pool via process_payload), so large
+fetches don't stall API handlers
 """
+import asyncio
+import json
+import threading
+import time
 import feedparser
 import httpx
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import logging
 import os
+import sys
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.config import settings
+from legacy_modules.news_source_state import NewsSourceState, naive_utc
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -22,111 +38,301 @@ NEWSAPI_KEY = os.getenv("NEWSAPI_KEY", "")  # Get free key from newsapi.org
 ALPHA_VANTAGE_KEY = os.getenv("ALPHA_VANTAGE_KEY", "")  # Get from alphavantage.co
 FINNHUB_KEY = os.getenv("FINNHUB_KEY", "")  # Get from finnhub.io
 
+# Keyless feeds (rate-limited with NEWS_RSS_MIN_INTERVAL, revalidated with ETags)
+RSS_SOURCES = {'economic_times', 'zerodha'}
+
+SOURCE_NAMES = {
+    'economic_times': 'Economic Times',
+    'zerodha': 'Zerodha Pulse',
+    'newsapi': 'NewsAPI',
+    'alpha_vantage': 'Alpha Vantage',
+    'finnhub': 'Finnhub',
+    'marketaux': 'Marketaux',
+    'gnews': 'GNews'
+}
+
+
+class NewsSourceError(Exception):
+    """A news source answered with an error payload"""
+
+
+# ============================================================================
+# Parsing + sentiment (pure functions, run in worker processes)
+# ============================================================================
+
+def analyze_sentiment(text: str) -> int:
+    """Analyze sentiment using VADER
+    Returns: -1 (negative), 0 (neutral), 1 (positive)
+    """
+    if not text:
+        return 0
+
+    try:
+        scores = sentiment_analyzer.polarity_scores(text)
+        compound = scores['compound']
+
+        if compound >= 0.05:
+            return 1  # Positive
+        elif compound <= -0.05:
+            return -1  # Negative
+        else:
+            return 0  # Neutral
+    except Exception as e:
+        logger.error(f"Error in sentiment analysis: {e}")
+        return 0
+
+
+def _parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _parse_rss(text: str) -> List[Dict]:
+    feed = feedparser.parse(text)
+    entries = []
+    for entry in feed.entries[:20]:  # Get latest 20 articles
+        # Parse published date
+        pub_date = None
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            pub_date = datetime(*entry.published_parsed[:6])
+        entries.append({
+            'title': entry.get('title', 'No Title'),
+            'summary': entry.get('summary', ''),
+            'url': entry.get('link', ''),
+            'published_at': pub_date,
+            'content': entry.get('description', '')
+        })
+    return entries
+
+
+def _parse_newsapi(text: str) -> List[Dict]:
+    data = json.loads(text)
+    if data.get('status') != 'ok':
+        raise NewsSourceError(f"NewsAPI error: {data.get('message', 'Unknown error')}")
+    return [
+        {
+            'title': item.get('title', 'No Title'),
+            'summary': item.get('description', ''),
+            'url': item.get('url', ''),
+            'published_at': _parse_iso(item['publishedAt']),
+            'content': item.get('content', '')
+        }
+        for item in data.get('articles', [])
+    ]
+
+
+def _parse_alpha_vantage(text: str) -> List[Dict]:
+    data = json.loads(text)
+    if 'feed' not in data:
+        raise NewsSourceError(f"Alpha Vantage error: {data.get('Note', 'Unknown error')}")
+    return [
+        {
+            'title': item.get('title', 'No Title'),
+            'summary': item.get('summary', ''),
+            'url': item.get('url', ''),
+            'published_at': datetime.strptime(item['time_published'], '%Y%m%dT%H%M%S'),
+            'content': item.get('summary', '')
+        }
+        for item in data.get('feed', [])[:20]
+    ]
+
+
+def _parse_finnhub(text: str) -> List[Dict]:
+    data = json.loads(text)
+    if isinstance(data, dict) and 'error' in data:
+        raise NewsSourceError(f"Finnhub error: {data['error']}")
+    return [
+        {
+            'id': item.get('id', 0),
+            'title': item.get('headline', 'No Title'),
+            'summary': item.get('summary', ''),
+            'url': item.get('url', ''),
+            'published_at': datetime.fromtimestamp(item['datetime']),
+            'content': item.get('summary', '')
+        }
+        for item in data[:20]
+    ]
+
+
+def _parse_marketaux(text: str) -> List[Dict]:
+    data = json.loads(text)
+    if 'data' not in data:
+        raise NewsSourceError(f"Marketaux error: {data.get('error', 'Unknown error')}")
+    return [
+        {
+            'title': item.get('title', 'No Title'),
+            'summary': item.get('description', ''),
+            'url': item.get('url', ''),
+            'published_at': _parse_iso(item['published_at']),
+            'content': item.get('description', '')
+        }
+        for item in data.get('data', [])
+    ]
+
+
+def _parse_gnews(text: str) -> List[Dict]:
+    data = json.loads(text)
+    if 'articles' not in data:
+        raise NewsSourceError(f"GNews error: {data.get('errors', 'Unknown error')}")
+    return [
+        {
+            'title': item.get('title', 'No Title'),
+            'summary': item.get('description', ''),
+            'url': item.get('url', ''),
+            'published_at': _parse_iso(item['publishedAt']),
+            'content': item.get('content', '')
+        }
+        for item in data.get('articles', [])
+    ]
+
+
+SOURCE_PARSERS: Dict[str, Callable[[str], List[Dict]]] = {
+    'economic_times': _parse_rss,
+    'zerodha': _parse_rss,
+    'newsapi': _parse_newsapi,
+    'alpha_vantage': _parse_alpha_vantage,
+    'finnhub': _parse_finnhub,
+    'marketaux': _parse_marketaux,
+    'gnews': _parse_gnews
+}
+
+
+def process_payload(
+    key: str,
+    text: str,
+    cursor: Optional[datetime] = None,
+    last_id: Optional[int] = None,
+    overlap_minutes: float = 0
+) -> Dict[str, Any]:
+    """
+    Parse one raw source response and score sentiment for its new items
+
+    Args:
+        key: Source key (see SOURCE_NAMES)
+        text: Response body
+        cursor: Skip items published before this (naive UTC), less the overlap
+        last_id: Skip items with an id at or below this (Finnhub)
+        overlap_minutes: How far before the cursor items are still kept
+
+    Returns:
+        Dict with articles, published (dates for the cursor), last_id and
+        new (items past the cursor itself, not re-reads from the overlap)
+    """
+    since = cursor - timedelta(minutes=overlap_minutes) if cursor is not None else None
+    entries = SOURCE_PARSERS[key](text)
+    newest_id = max((entry.get('id', 0) for entry in entries), default=0)
+
+    articles = []
+    published = []
+    new = 0
+    for entry in entries:
+        pub_date = entry['published_at']
+        if last_id and entry.get('id', 0) <= last_id:
+            continue
+        if since is not None and pub_date is not None and naive_utc(pub_date) < since:
+            continue
+        published.append(pub_date)
+        new += cursor is None or pub_date is None or naive_utc(pub_date) > cursor
+
+        # Get sentiment
+        sentiment = analyze_sentiment(f"{entry['title'] or ''} {entry['summary'] or ''}")
+        articles.append({
+            'title': entry['title'],
+            'summary': entry['summary'],
+            'url': entry['url'],
+            'published_at': pub_date or datetime.utcnow(),
+            'source': SOURCE_NAMES[key],
+            'content': entry['content'],
+            'sentiment': 'positive' if sentiment == 1 else 'negative' if sentiment == -1 else 'neutral',
+            'sentiment_score': sentiment
+        })
+
+    return {
+        'articles': articles,
+        'published': published,
+        'last_id': max(newest_id, last_id or 0) or None,
+        'new': new
+    }
+
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            max_workers = settings.NEWS_PARSE_PROCESSES or os.cpu_count() or 1
+            _parse_pool = ProcessPoolExecutor(max_workers=max_workers)
+            logger.info(f"✅ News parse pool started ({max_workers} workers)")
+        return _parse_pool
+
+
+def shutdown_parse_pool():
+    """Stop the parse workers (server shutdown)"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(cancel_futures=True)
+            _parse_pool = None
+
+
+# ============================================================================
+# Fetcher
+# ============================================================================
 
 class NewsFetcher:
     """Fetches financial news from multiple RSS and API sources"""
-    
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
-        self.sources = {
-            'economic_times': 'Economic Times',
-            'zerodha': 'Zerodha Pulse',
-            'newsapi': 'NewsAPI',
-            'alpha_vantage': 'Alpha Vantage',
-            'finnhub': 'Finnhub',
-            'marketaux': 'Marketaux',
-            'gnews': 'GNews'
+
+    def __init__(self, timeout: float = settings.NEWS_SOURCE_TIMEOUT, max_concurrency: int = settings.NEWS_SOURCE_MAX_CONCURRENCY,
+                 state_path: str = settings.NEWS_SOURCE_STATE_PATH):
+        self.timeout = timeout
+        self.client = httpx.AsyncClient(timeout=timeout)
+        self.state = NewsSourceState(state_path)
+        self.sources = dict(SOURCE_NAMES)
+        self._requests = {
+            'economic_times': self._request_economic_times,
+            'zerodha': self._request_zerodha,
+            'newsapi': self._request_newsapi,
+            'alpha_vantage': self._request_alpha_vantage,
+            'finnhub': self._request_finnhub,
+            'marketaux': self._request_marketaux,
+            'gnews': self._request_gnews
         }
-    
-    async def fetch_economic_times_rss(self) -> List[Dict]:
-        """Fetch news from Economic Times RSS feed"""
-        url = "https://economictimes.indiatimes.com/markets/rss.cms"
-        logger.info(f"📰 Fetching from Economic Times RSS...")
-        
-        try:
-            response = await self.client.get(url)
-            feed = feedparser.parse(response.text)
-            
-            logger.info(f"Feed has {len(feed.entries)} entries")
-            
-            articles = []
-            for entry in feed.entries[:20]:  # Get latest 20 articles
-                # Parse published date
-                pub_date = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    pub_date = datetime(*entry.published_parsed[:6])
-                
-                # Get sentiment
-                text = f"{entry.get('title', '')} {entry.get('summary', '')}"
-                sentiment = self._analyze_sentiment(text)
-                
-                article = {
-                    'title': entry.get('title', 'No Title'),
-                    'summary': entry.get('summary', ''),
-                    'url': entry.get('link', ''),
-                    'published_at': pub_date or datetime.utcnow(),
-                    'source': 'Economic Times',
-                    'content': entry.get('description', ''),
-                    'sentiment': 'positive' if sentiment == 1 else 'negative' if sentiment == -1 else 'neutral',
-                    'sentiment_score': sentiment
-                }
-                articles.append(article)
-            
-            logger.info(f"✅ Fetched {len(articles)} articles from Economic Times")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching Economic Times: {e}")
-            return []
-    
-    async def fetch_zerodha_pulse_rss(self) -> List[Dict]:
-        """Fetch news from Zerodha Pulse RSS feed"""
-        url = "https://zerodha.com/z-connect/feed"
-        logger.info(f"📰 Fetching from Zerodha Pulse RSS...")
-        
-        try:
-            response = await self.client.get(url)
-            feed = feedparser.parse(response.text)
-            
-            logger.info(f"Zerodha feed has {len(feed.entries)} entries")
-            
-            articles = []
-            for entry in feed.entries[:20]:
-                # Parse published date
-                pub_date = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    pub_date = datetime(*entry.published_parsed[:6])
-                
-                # Get sentiment
-                text = f"{entry.get('title', '')} {entry.get('summary', '')}"
-                sentiment = self._analyze_sentiment(text)
-                
-                article = {
-                    'title': entry.get('title', 'No Title'),
-                    'summary': entry.get('summary', ''),
-                    'url': entry.get('link', ''),
-                    'published_at': pub_date or datetime.utcnow(),
-                    'source': 'Zerodha Pulse',
-                    'content': entry.get('description', ''),
-                    'sentiment': 'positive' if sentiment == 1 else 'negative' if sentiment == -1 else 'neutral',
-                    'sentiment_score': sentiment
-                }
-                articles.append(article)
-            
-            logger.info(f"✅ Fetched {len(articles)} articles from Zerodha Pulse")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching Zerodha Pulse: {e}")
-            return []
-    
-    async def fetch_newsapi(self) -> List[Dict]:
-        """Fetch news from NewsAPI (Free tier: 100 requests/day)"""
+        self.min_interval = {
+            key: settings.NEWS_RSS_MIN_INTERVAL if key in RSS_SOURCES else settings.NEWS_API_MIN_INTERVAL
+            for key in self.sources
+        }
+        self._semaphores = {key: asyncio.Semaphore(max(1, max_concurrency)) for key in self.sources}
+        self._next_allowed = {key: 0.0 for key in self.sources}
+        self._stats = {
+            key: {'requests': 0, 'articles': 0, 'not_modified': 0, 'errors': 0, 'timeouts': 0, 'rate_limited': 0,
+                  'total_latency_ms': 0.0, 'last_latency_ms': 0.0, 'last_error': None, 'last_success': None}
+            for key in self.sources
+        }
+
+    # ------------------------------------------------------------------
+    # Requests: (url, params) per source, None when the source is unavailable
+    # ------------------------------------------------------------------
+
+    def _since(self, key: str) -> Optional[datetime]:
+        """Request items from here: the source's cursor less the overlap window"""
+        cursor = self.state.cursor(key)
+        return cursor - timedelta(minutes=settings.NEWS_CURSOR_OVERLAP_MINUTES) if cursor else None
+
+    def _request_economic_times(self) -> Optional[Tuple[str, Dict]]:
+        """Economic Times RSS feed"""
+        return "https://economictimes.indiatimes.com/markets/rss.cms", {}
+
+    def _request_zerodha(self) -> Optional[Tuple[str, Dict]]:
+        """Zerodha Pulse RSS feed"""
+        return "https://zerodha.com/z-connect/feed", {}
+
+    def _request_newsapi(self) -> Optional[Tuple[str, Dict]]:
+        """NewsAPI (Free tier: 100 requests/day)"""
         if not NEWSAPI_KEY:
             logger.warning("⚠️ NewsAPI key not set, skipping...")
-            return []
-        
-        url = "https://newsapi.org/v2/everything"
+            return None
         params = {
             'q': 'stock market OR finance OR trading OR economy',
             'language': 'en',
@@ -134,189 +340,55 @@ class NewsFetcher:
             'pageSize': 20,
             'apiKey': NEWSAPI_KEY
         }
-        
-        logger.info(f"📰 Fetching from NewsAPI...")
-        
-        try:
-            response = await self.client.get(url, params=params)
-            data = response.json()
-            
-            if data.get('status') != 'ok':
-                logger.error(f"❌ NewsAPI error: {data.get('message', 'Unknown error')}")
-                return []
-            
-            articles = []
-            for item in data.get('articles', []):
-                pub_date = datetime.fromisoformat(item['publishedAt'].replace('Z', '+00:00'))
-                
-                text = f"{item.get('title', '')} {item.get('description', '')}"
-                sentiment = self._analyze_sentiment(text)
-                
-                article = {
-                    'title': item.get('title', 'No Title'),
-                    'summary': item.get('description', ''),
-                    'url': item.get('url', ''),
-                    'published_at': pub_date,
-                    'source': 'NewsAPI',
-                    'content': item.get('content', ''),
-                    'sentiment': 'positive' if sentiment == 1 else 'negative' if sentiment == -1 else 'neutral',
-                    'sentiment_score': sentiment
-                }
-                articles.append(article)
-            
-            logger.info(f"✅ Fetched {len(articles)} articles from NewsAPI")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching NewsAPI: {e}")
-            return []
-    
-    async def fetch_alpha_vantage(self) -> List[Dict]:
-        """Fetch news from Alpha Vantage (Free tier: 25 requests/day)"""
+        since = self._since('newsapi')
+        if since:
+            params['from'] = since.strftime('%Y-%m-%dT%H:%M:%S')
+        return "https://newsapi.org/v2/everything", params
+
+    def _request_alpha_vantage(self) -> Optional[Tuple[str, Dict]]:
+        """Alpha Vantage (Free tier: 25 requests/day)"""
         if not ALPHA_VANTAGE_KEY:
             logger.warning("⚠️ Alpha Vantage key not set, skipping...")
-            return []
-        
-        url = "https://www.alphavantage.co/query"
+            return None
         params = {
             'function': 'NEWS_SENTIMENT',
             'topics': 'financial_markets',
             'apikey': ALPHA_VANTAGE_KEY,
             'limit': 50
         }
-        
-        logger.info(f"📰 Fetching from Alpha Vantage...")
-        
-        try:
-            response = await self.client.get(url, params=params)
-            data = response.json()
-            
-            if 'feed' not in data:
-                logger.error(f"❌ Alpha Vantage error: {data.get('Note', 'Unknown error')}")
-                return []
-            
-            articles = []
-            for item in data.get('feed', [])[:20]:
-                pub_date = datetime.strptime(item['time_published'], '%Y%m%dT%H%M%S')
-                
-                text = f"{item.get('title', '')} {item.get('summary', '')}"
-                sentiment = self._analyze_sentiment(text)
-                
-                article = {
-                    'title': item.get('title', 'No Title'),
-                    'summary': item.get('summary', ''),
-                    'url': item.get('url', ''),
-                    'published_at': pub_date,
-                    'source': 'Alpha Vantage',
-                    'content': item.get('summary', ''),
-                    'sentiment': 'positive' if sentiment == 1 else 'negative' if sentiment == -1 else 'neutral',
-                    'sentiment_score': sentiment
-                }
-                articles.append(article)
-            
-            logger.info(f"✅ Fetched {len(articles)} articles from Alpha Vantage")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching Alpha Vantage: {e}")
-            return []
-    
-    async def fetch_finnhub(self) -> List[Dict]:
-        """Fetch news from Finnhub (Free tier: 60 requests/minute)"""
+        since = self._since('alpha_vantage')
+        if since:
+            params['time_from'] = since.strftime('%Y%m%dT%H%M')
+        return "https://www.alphavantage.co/query", params
+
+    def _request_finnhub(self) -> Optional[Tuple[str, Dict]]:
+        """Finnhub (Free tier: 60 requests/minute)"""
         if not FINNHUB_KEY:
             logger.warning("⚠️ Finnhub key not set, skipping...")
-            return []
-        
-        url = "https://finnhub.io/api/v1/news"
+            return None
         params = {
             'category': 'general',
             'token': FINNHUB_KEY
         }
-        
-        logger.info(f"📰 Fetching from Finnhub...")
-        
-        try:
-            response = await self.client.get(url, params=params)
-            data = response.json()
-            
-            if isinstance(data, dict) and 'error' in data:
-                logger.error(f"❌ Finnhub error: {data['error']}")
-                return []
-            
-            articles = []
-            for item in data[:20]:
-                pub_date = datetime.fromtimestamp(item['datetime'])
-                
-                text = f"{item.get('headline', '')} {item.get('summary', '')}"
-                sentiment = self._analyze_sentiment(text)
-                
-                article = {
-                    'title': item.get('headline', 'No Title'),
-                    'summary': item.get('summary', ''),
-                    'url': item.get('url', ''),
-                    'published_at': pub_date,
-                    'source': 'Finnhub',
-                    'content': item.get('summary', ''),
-                    'sentiment': 'positive' if sentiment == 1 else 'negative' if sentiment == -1 else 'neutral',
-                    'sentiment_score': sentiment
-                }
-                articles.append(article)
-            
-            logger.info(f"✅ Fetched {len(articles)} articles from Finnhub")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching Finnhub: {e}")
-            return []
-    
-    async def fetch_marketaux(self) -> List[Dict]:
-        """Fetch news from Marketaux (Free tier: 100 requests/day)"""
-        url = "https://api.marketaux.com/v1/news/all"
+        last_id = self.state.get('finnhub').get('last_id')
+        if last_id:
+            params['minId'] = last_id
+        return "https://finnhub.io/api/v1/news", params
+
+    def _request_marketaux(self) -> Optional[Tuple[str, Dict]]:
+        """Marketaux (Free tier: 100 requests/day)"""
         params = {
             'filter_entities': 'true',
             'language': 'en',
             'limit': 20
         }
-        
-        logger.info(f"📰 Fetching from Marketaux (no API key required)...")
-        
-        try:
-            response = await self.client.get(url, params=params)
-            data = response.json()
-            
-            if 'data' not in data:
-                logger.error(f"❌ Marketaux error: {data.get('error', 'Unknown error')}")
-                return []
-            
-            articles = []
-            for item in data.get('data', []):
-                pub_date = datetime.fromisoformat(item['published_at'].replace('Z', '+00:00'))
-                
-                text = f"{item.get('title', '')} {item.get('description', '')}"
-                sentiment = self._analyze_sentiment(text)
-                
-                article = {
-                    'title': item.get('title', 'No Title'),
-                    'summary': item.get('description', ''),
-                    'url': item.get('url', ''),
-                    'published_at': pub_date,
-                    'source': 'Marketaux',
-                    'content': item.get('description', ''),
-                    'sentiment': 'positive' if sentiment == 1 else 'negative' if sentiment == -1 else 'neutral',
-                    'sentiment_score': sentiment
-                }
-                articles.append(article)
-            
-            logger.info(f"✅ Fetched {len(articles)} articles from Marketaux")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching Marketaux: {e}")
-            return []
-    
-    async def fetch_gnews(self) -> List[Dict]:
-        """Fetch news from GNews (Free tier: 100 requests/day, no API key required for basic)"""
-        url = "https://gnews.io/api/v4/top-headlines"
+        since = self._since('marketaux')
+        if since:
+            params['published_after'] = since.strftime('%Y-%m-%dT%H:%M:%S')
+        return "https://api.marketaux.com/v1/news/all", params
+
+    def _request_gnews(self) -> Optional[Tuple[str, Dict]]:
+        """GNews (Free tier: 100 requests/day, no API key required for basic)"""
         params = {
             'category': 'business',
             'lang': 'en',
@@ -324,110 +396,168 @@ class NewsFetcher:
             'max': 20,
             'apikey': os.getenv("GNEWS_KEY", "")  # Optional, can work without it
         }
-        
-        logger.info(f"📰 Fetching from GNews...")
-        
+        since = self._since('gnews')
+        if since:
+            params['from'] = since.strftime('%Y-%m-%dT%H:%M:%SZ')
+        return "https://gnews.io/api/v4/top-headlines", params
+
+    # ------------------------------------------------------------------
+    # Download / process
+    # ------------------------------------------------------------------
+
+    async def download(self, key: str) -> Optional[str]:
+        """
+        Raw response body for a source, or None (no key, 304, rate limited, failed)
+
+        Applies the source's concurrency limit, rate limit, timeout and
+        conditional-GET validators, and records its metrics.
+        """
+        stats = self._stats[key]
+        name = self.sources[key]
+        async with self._semaphores[key]:
+            wait = self._next_allowed[key] - time.monotonic()
+            if wait > self.timeout:
+                stats['rate_limited'] += 1
+                logger.info(f"⏳ {name} rate limited, next call in {wait:.0f}s")
+                return None
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_allowed[key] = time.monotonic() + self.min_interval[key]
+
+            request = self._requests[key]()
+            if request is None:
+                return None
+            url, params = request
+            headers = self.state.conditional_headers(key) if key in RSS_SOURCES else {}
+            logger.info(f"📰 Fetching from {name}...")
+
+            stats['requests'] += 1
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self.client.get(url, params=params, headers=headers), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                stats['timeouts'] += 1
+                stats['last_error'] = f"timed out after {self.timeout:g}s"
+                logger.warning(f"⏱️ {name} timed out after {self.timeout:g}s")
+                return None
+            except Exception as e:
+                stats['errors'] += 1
+                stats['last_error'] = str(e)
+                logger.error(f"❌ Error fetching {name}: {e}")
+                return None
+            finally:
+                latency_ms = (time.perf_counter() - started) * 1000
+                stats['total_latency_ms'] += latency_ms
+                stats['last_latency_ms'] = round(latency_ms, 1)
+
+            if response.status_code == 304:
+                stats['not_modified'] += 1
+                logger.info(f"📭 {name} unchanged since last poll")
+                return None
+            if key in RSS_SOURCES:
+                self.state.stage_response(key, response.headers)
+            return response.text
+
+    async def process(self, key: str, text: str, executor: Optional[ProcessPoolExecutor] = None) -> List[Dict]:
+        """Parse + score a downloaded body in the parse pool and stage the source's cursor"""
+        stats = self._stats[key]
+        # Finnhub pages by id, the other sources by published_at
+        if key == 'finnhub':
+            cursor, last_id = None, self.state.get(key).get('last_id')
+        else:
+            cursor, last_id = self.state.cursor(key), None
+        loop = asyncio.get_running_loop()
         try:
-            response = await self.client.get(url, params=params)
-            data = response.json()
-            
-            if 'articles' not in data:
-                logger.error(f"❌ GNews error: {data.get('errors', 'Unknown error')}")
-                return []
-            
-            articles = []
-            for item in data.get('articles', []):
-                pub_date = datetime.fromisoformat(item['publishedAt'].replace('Z', '+00:00'))
-                
-                text = f"{item.get('title', '')} {item.get('description', '')}"
-                sentiment = self._analyze_sentiment(text)
-                
-                article = {
-                    'title': item.get('title', 'No Title'),
-                    'summary': item.get('description', ''),
-                    'url': item.get('url', ''),
-                    'published_at': pub_date,
-                    'source': 'GNews',
-                    'content': item.get('content', ''),
-                    'sentiment': 'positive' if sentiment == 1 else 'negative' if sentiment == -1 else 'neutral',
-                    'sentiment_score': sentiment
-                }
-                articles.append(article)
-            
-            logger.info(f"✅ Fetched {len(articles)} articles from GNews")
-            return articles
-            
+            result = await loop.run_in_executor(
+                executor or get_parse_pool(), process_payload, key, text, cursor, last_id, settings.NEWS_CURSOR_OVERLAP_MINUTES
+            )
         except Exception as e:
-            logger.error(f"❌ Error fetching GNews: {e}")
+            stats['errors'] += 1
+            stats['last_error'] = str(e)
+            logger.error(f"❌ Error fetching {self.sources[key]}: {e}")
+            return []
+
+        self.state.stage_items(key, result['published'], last_id=result['last_id'])
+        stats['articles'] += result['new']
+        stats['last_success'] = datetime.utcnow().isoformat()
+        logger.info(f"✅ Fetched {len(result['articles'])} articles ({result['new']} new) from {self.sources[key]}")
+        return result['articles']
+
+    async def fetch_source(self, key: str) -> List[Dict]:
+        """Download and process one source"""
+        text = await self.download(key)
+        if text is None:
             return []
-    
+        return await self.process(key, text)
+
+    async def fetch_economic_times_rss(self) -> List[Dict]:
+        """Fetch news from Economic Times RSS feed"""
+        return await self.fetch_source('economic_times')
+
+    async def fetch_zerodha_pulse_rss(self) -> List[Dict]:
+        """Fetch news from Zerodha Pulse RSS feed"""
+        return await self.fetch_source('zerodha')
+
+    async def fetch_newsapi(self) -> List[Dict]:
+        """Fetch news from NewsAPI (Free tier: 100 requests/day)"""
+        return await self.fetch_source('newsapi')
+
+    async def fetch_alpha_vantage(self) -> List[Dict]:
+        """Fetch news from Alpha Vantage (Free tier: 25 requests/day)"""
+        return await self.fetch_source('alpha_vantage')
+
+    async def fetch_finnhub(self) -> List[Dict]:
+        """Fetch news from Finnhub (Free tier: 60 requests/minute)"""
+        return await self.fetch_source('finnhub')
+
+    async def fetch_marketaux(self) -> List[Dict]:
+        """Fetch news from Marketaux (Free tier: 100 requests/day)"""
+        return await self.fetch_source('marketaux')
+
+    async def fetch_gnews(self) -> List[Dict]:
+        """Fetch news from GNews (Free tier: 100 requests/day, no API key required for basic)"""
+        return await self.fetch_source('gnews')
+
     async def fetch_all(self, sources: Optional[List[str]] = None) -> List[Dict]:
         """Fetch from all or selected sources
-        
+
         Args:
             sources: List of source keys to fetch from. If None, fetches from all sources.
-                    Valid keys: 'economic_times', 'zerodha', 'newsapi', 'alpha_vantage', 
+                    Valid keys: 'economic_times', 'zerodha', 'newsapi', 'alpha_vantage',
                                'finnhub', 'marketaux', 'gnews'
         """
-        all_articles = []
-        
-        # Default to all sources if none specified
-        if sources is None:
-            sources = list(self.sources.keys())
-        
-        # Fetch from selected sources
-        if 'economic_times' in sources:
-            et_articles = await self.fetch_economic_times_rss()
-            all_articles.extend(et_articles)
-        
-        if 'zerodha' in sources:
-            zp_articles = await self.fetch_zerodha_pulse_rss()
-            all_articles.extend(zp_articles)
-        
-        if 'newsapi' in sources:
-            na_articles = await self.fetch_newsapi()
-            all_articles.extend(na_articles)
-        
-        if 'alpha_vantage' in sources:
-            av_articles = await self.fetch_alpha_vantage()
-            all_articles.extend(av_articles)
-        
-        if 'finnhub' in sources:
-            fh_articles = await self.fetch_finnhub()
-            all_articles.extend(fh_articles)
-        
-        if 'marketaux' in sources:
-            mx_articles = await self.fetch_marketaux()
-            all_articles.extend(mx_articles)
-        
-        if 'gnews' in sources:
-            gn_articles = await self.fetch_gnews()
-            all_articles.extend(gn_articles)
-        
-        logger.info(f"📊 Total articles fetched: {len(all_articles)}")
+        # Sources run concurrently; each is bounded by its own timeout
+        selected = self.select_sources(sources)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self.fetch_source(key) for key in selected))
+        all_articles = [article for articles in results for article in articles]
+
+        logger.info(f"📊 Total articles fetched: {len(all_articles)} from {len(selected)} sources in {(time.perf_counter() - started) * 1000:.0f}ms")
         return all_articles
-    
-    def _analyze_sentiment(self, text: str) -> int:
-        """Analyze sentiment using VADER
-        Returns: -1 (negative), 0 (neutral), 1 (positive)
-        """
-        if not text:
-            return 0
-        
-        try:
-            scores = sentiment_analyzer.polarity_scores(text)
-            compound = scores['compound']
-            
-            if compound >= 0.05:
-                return 1  # Positive
-            elif compound <= -0.05:
-                return -1  # Negative
-            else:
-                return 0  # Neutral
-        except Exception as e:
-            logger.error(f"Error in sentiment analysis: {e}")
-            return 0
-    
+
+    def select_sources(self, sources: Optional[List[str]] = None) -> List[str]:
+        """Known source keys in canonical order (all when sources is None)"""
+        if sources is None:
+            return list(self.sources.keys())
+        return [key for key in self.sources if key in sources]
+
+    def commit_state(self):
+        """Persist validators/cursors from the last fetch - call once its articles are stored"""
+        self.state.commit()
+
+    def discard_state(self):
+        self.state.discard()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-source request, latency and error counters"""
+        result = {}
+        for key, source_stats in self._stats.items():
+            stats = dict(source_stats)
+            stats['avg_latency_ms'] = round(stats['total_latency_ms'] / stats['requests'], 1) if stats['requests'] else 0.0
+            stats['total_latency_ms'] = round(stats['total_latency_ms'], 1)
+            result[key] = stats
+        return result
+
     async def close(self):
         """Close HTTP client"""
         await self.client.aclose()
@@ -442,3 +572,7 @@ def get_news_fetcher() -> NewsFetcher:
     if _news_fetcher is None:
         _news_fetcher = NewsFetcher()
     return _news_fetcher
+
+def news_source_stats() -> Dict[str, Any]:
+    """Per-source fetch metrics (empty until the fetcher is first used)"""
+    return _news_fetcher.stats() if _news_fetcher is not None else {}
@@ -0,0 +1,204 @@
+"""
+News Index - Persistent symbol -> article index built at ingestion time
+Ticker and company mentions are extracted once per article into the
+article_symbols table, so per-holding news lookups ("AAPL, last 7 days")
+are indexed queries instead of a scan over the latest few articles
+"""
+import asyncio
+import logging
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.config import settings
+from shared.models import ArticleSymbol, Investment, NewsArticle
+from shared.utils.database import get_session_maker
+from legacy_modules.news_matcher import KeywordAutomaton
+
+logger = logging.getLogger(__name__)
+
+# Company / coin names that headlines use instead of the ticker
+SYMBOL_ALIASES = {
+    "apple": "AAPL",
+    "microsoft": "MSFT",
+    "alphabet": "GOOGL",
+    "google": "GOOGL",
+    "amazon": "AMZN",
+    "tesla": "TSLA",
+    "nvidia": "NVDA",
+    "meta platforms": "META",
+    "netflix": "NFLX",
+    "bitcoin": "BTC",
+    "ethereum": "ETH",
+    "solana": "SOL",
+    "dogecoin": "DOGE",
+    "cardano": "ADA",
+    "ripple": "XRP",
+}
+
+# Uppercase tokens (optionally $-prefixed) like AAPL, BRK.B, BTC-USD, and NSE
+# symbols such as BAJFINANCE or RELIANCE.NS (up to 12 characters before the suffix)
+_TICKER_PATTERN = re.compile(r"(?<![\w$])(\$?)([A-Z][A-Z0-9]{0,11}(?:[.\-][A-Z0-9]{1,4})?)(?![\w$])")
+
+_alias_automaton = KeywordAutomaton(SYMBOL_ALIASES)
+_alias_symbols = [SYMBOL_ALIASES[k] for k in _alias_automaton.keywords]
+_backfill_tasks: Set[asyncio.Task] = set()
+
+
+def extract_symbols(text: Optional[str], vocabulary: Set[str]) -> Set[str]:
+    """
+    Symbols mentioned in text
+
+    Uppercase tokens count when they are in the vocabulary (single letters
+    only as $cashtags, so "A" starting a sentence isn't Agilent); $cashtags
+    always count; company names map through SYMBOL_ALIASES.
+
+    Args:
+        text: Title / summary text
+        vocabulary: Uppercase symbols worth indexing
+
+    Returns:
+        Set of uppercase symbols
+    """
+    if not text:
+        return set()
+    found = set()
+    for cashtag, token in _TICKER_PATTERN.findall(text):
+        if cashtag or (len(token) > 1 and token in vocabulary):
+            found.add(token)
+    for keyword_index, _ in _alias_automaton.find(text.lower()):
+        found.add(_alias_symbols[keyword_index])
+    return found
+
+
+def article_symbols(article: NewsArticle, vocabulary: Set[str]) -> Set[str]:
+    return extract_symbols(article.title, vocabulary) | extract_symbols(article.summary, vocabulary)
+
+
+async def tracked_symbols(session: AsyncSession) -> Set[str]:
+    """Every held symbol plus the alias targets"""
+    result = await session.execute(select(func.upper(Investment.symbol)).distinct())
+    return {s for s in result.scalars().all() if s} | set(SYMBOL_ALIASES.values())
+
+
+async def index_articles(
+    session: AsyncSession,
+    articles: Iterable[NewsArticle],
+    vocabulary: Optional[Set[str]] = None
+) -> int:
+    """
+    Add index rows for articles (flushes so new articles have ids; caller commits)
+
+    Returns:
+        Number of (article, symbol) rows added
+    """
+    articles = list(articles)
+    if not articles:
+        return 0
+    if vocabulary is None:
+        vocabulary = await tracked_symbols(session)
+    await session.flush()
+
+    existing = await session.execute(
+        select(ArticleSymbol.article_id, ArticleSymbol.symbol)
+        .where(ArticleSymbol.article_id.in_([a.id for a in articles]))
+    )
+    seen = set(existing.all())
+
+    rows = []
+    for article in articles:
+        for symbol in article_symbols(article, vocabulary):
+            if (article.id, symbol) in seen:
+                continue
+            seen.add((article.id, symbol))
+            rows.append({"article_id": article.id, "symbol": symbol, "published_at": article.published_at})
+    if rows:
+        await session.execute(insert(ArticleSymbol), rows)
+    return len(rows)
+
+
+async def backfill_symbols(session: AsyncSession, symbols: Iterable[str], days: Optional[float] = None) -> int:
+    """Index recent articles for symbols that weren't in the vocabulary when they were ingested"""
+    vocabulary = {s.upper() for s in symbols if s}
+    days = days or settings.NEWS_INDEX_WINDOW_DAYS
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    result = await session.execute(select(NewsArticle).where(NewsArticle.published_at >= cutoff))
+    added = await index_articles(session, result.scalars().all(), vocabulary)
+    await session.commit()
+    if added:
+        logger.info(f"🗂️ Backfilled {added} news index rows for {', '.join(sorted(vocabulary))}")
+    return added
+
+
+async def _backfill_quietly(symbols: List[str]):
+    try:
+        async with get_session_maker()() as session:
+            await backfill_symbols(session, symbols)
+    except Exception as e:
+        logger.error(f"❌ News index backfill failed for {symbols}: {str(e)}")
+
+
+def schedule_backfill(symbols: Iterable[str]):
+    """Backfill in the background on its own session (e.g. after a first purchase of a symbol)"""
+    task = asyncio.create_task(_backfill_quietly(list(symbols)))
+    _backfill_tasks.add(task)
+    task.add_done_callback(_backfill_tasks.discard)
+
+
+async def build_index_if_empty(session: AsyncSession) -> int:
+    """Index the recent window once for databases that predate the index"""
+    if (await session.execute(select(ArticleSymbol.id).limit(1))).first() is not None:
+        return 0
+    return await backfill_symbols(session, await tracked_symbols(session))
+
+
+async def articles_for_symbols(
+    session: AsyncSession,
+    symbols: Iterable[str],
+    days: Optional[float] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[NewsArticle], Dict[int, Set[str]]]:
+    """
+    Recent articles mentioning any of the symbols (indexed query)
+
+    Args:
+        session: Database session
+        symbols: Symbols to look up
+        days: Look-back window (defaults to NEWS_INDEX_WINDOW_DAYS)
+        limit: Max articles (defaults to NEWS_INDEX_MAX_ARTICLES)
+
+    Returns:
+        (articles newest first, article id -> indexed symbols among those requested)
+    """
+    symbols = list({s.upper() for s in symbols if s})
+    if not symbols:
+        return [], {}
+    cutoff = datetime.utcnow() - timedelta(days=days or settings.NEWS_INDEX_WINDOW_DAYS)
+
+    hits = await session.execute(
+        select(ArticleSymbol.article_id, ArticleSymbol.symbol)
+        .where(ArticleSymbol.symbol.in_(symbols), ArticleSymbol.published_at >= cutoff)
+        .order_by(ArticleSymbol.published_at.desc())
+    )
+    mentions: Dict[int, Set[str]] = {}
+    for article_id, symbol in hits.all():
+        if article_id not in mentions and len(mentions) >= (limit or settings.NEWS_INDEX_MAX_ARTICLES):
+            continue
+        mentions.setdefault(article_id, set()).add(symbol)
+    if not mentions:
+        return [], {}
+
+    result = await session.execute(
+        select(NewsArticle)
+        .where(NewsArticle.id.in_(list(mentions)))
+        .order_by(NewsArticle.published_at.desc())
+    )
+    return result.scalars().all(), mentions
@@ -0,0 +1,117 @@
+"""
+News Ingest - Bulk, URL-deduplicated insertion of fetched articles
+Articles are deduplicated by URL in memory, then written with one
+INSERT ... ON CONFLICT(url) DO NOTHING per chunk; RETURNING tells us which
+rows were new, so ingestion costs a few statements instead of a SELECT per
+article
+"""
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.config import settings
+from shared.models import NewsArticle
+from legacy_modules import news_dedup, news_index
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_COLUMNS = ('title', 'summary', 'url', 'published_at', 'source', 'content', 'sentiment', 'sentiment_score', 'fetched_at')
+
+
+def dedupe_by_url(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """First article per URL, dropping articles without one"""
+    unique = {}
+    for article in articles:
+        url = article.get('url')
+        if url and url not in unique:
+            unique[url] = article
+    return list(unique.values())
+
+
+def _insert_ignoring_duplicates(dialect: str):
+    """Dialect INSERT with ON CONFLICT(url) DO NOTHING, or None if unsupported"""
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(NewsArticle).on_conflict_do_nothing(index_elements=['url'])
+
+
+async def _insert_chunk(session: AsyncSession, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Insert one chunk; returns url -> id for the rows that were new"""
+    stmt = _insert_ignoring_duplicates(session.bind.dialect.name)
+    if stmt is not None:
+        result = await session.execute(stmt.values(rows).returning(NewsArticle.url, NewsArticle.id))
+        return dict(result.all())
+
+    # Other databases: one SELECT for the chunk's URLs, then a plain bulk insert
+    existing = await session.execute(select(NewsArticle.url).where(NewsArticle.url.in_([r['url'] for r in rows])))
+    known = set(existing.scalars().all())
+    rows = [r for r in rows if r['url'] not in known]
+    if not rows:
+        return {}
+    result = await session.execute(insert(NewsArticle).values(rows).returning(NewsArticle.url, NewsArticle.id))
+    return dict(result.all())
+
+
+async def ingest_articles(session: AsyncSession, articles: List[Dict[str, Any]], chunk_size: int = None) -> Dict[str, int]:
+    """
+    Store fetched articles, skipping URLs already in the database
+
+    Each chunk is inserted, symbol-indexed, story-clustered and committed on
+    its own.
+
+    Args:
+        session: Database session
+        articles: Article dicts from NewsFetcher
+        chunk_size: Rows per INSERT (defaults to NEWS_INGEST_CHUNK_SIZE)
+
+    Returns:
+        Dict with fetched, inserted, duplicates, near_duplicates and symbol_mentions counts
+    """
+    chunk_size = max(1, chunk_size or settings.NEWS_INGEST_CHUNK_SIZE)
+    unique = dedupe_by_url(articles)
+    fetched_at = datetime.utcnow()
+    vocabulary = await news_index.tracked_symbols(session) if unique else set()
+
+    inserted = 0
+    mentions = 0
+    near_duplicates = 0
+    for start in range(0, len(unique), chunk_size):
+        chunk = unique[start:start + chunk_size]
+        rows = [{column: article.get(column) for column in ARTICLE_COLUMNS} for article in chunk]
+        for row in rows:
+            row['fetched_at'] = row['fetched_at'] or fetched_at
+
+        try:
+            new_ids = await _insert_chunk(session, rows)
+            new_articles = [NewsArticle(id=new_ids[row['url']], **row) for row in rows if row['url'] in new_ids]
+            mentions += await news_index.index_articles(session, new_articles, vocabulary)
+            if new_ids:
+                near_duplicates += await news_dedup.sync_story_index(session)
+            await session.commit()
+        except Exception:
+            news_dedup.story_index.rollback()
+            raise
+        news_dedup.story_index.commit()
+        inserted += len(new_ids)
+
+    duplicates = len(articles) - inserted
+    logger.info(f"🗞️ Ingested {inserted} new articles ({duplicates} duplicates, {near_duplicates} near-duplicates)")
+    return {
+        "fetched": len(articles),
+        "inserted": inserted,
+        "duplicates": duplicates,
+        "near_duplicates": near_duplicates,
+        "symbol_mentions": mentions
+    }
@@ -0,0 +1,219 @@
+"""
+News Matcher - Multi-pattern matching of portfolio holdings in news titles
+An Aho-Corasick automaton over every holding keyword (symbol and asset type)
+scans each title once, whatever the number of holdings, and only accepts
+whole-word hits so short tickers like "T" or "ON" don't match inside words
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SENTIMENT_MAP = {"positive": 0.7, "neutral": 0.0, "negative": -0.7}
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lowercase keywords
+
+    find() walks the text once and yields every whole-word occurrence of
+    every keyword, so the cost is O(len(text) + hits) instead of
+    O(len(text) * keywords).
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for keyword in dict.fromkeys(k.lower() for k in keywords if k):
+            self._insert(keyword)
+        self._link()
+
+    def _insert(self, keyword: str):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(len(self.keywords))
+        self.keywords.append(keyword)
+
+    def _link(self):
+        """Breadth-first failure links; outputs inherit their fallback state's outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Whole-word keyword occurrences in text
+
+        Args:
+            text: Text to scan (lowercased by the caller)
+
+        Yields:
+            (keyword index, start offset) per hit
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        length = len(text)
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            after_ok = i + 1 == length or not _is_word_char(text[i + 1])
+            if not after_ok:
+                continue
+            for index in out[state]:
+                start = i - len(self.keywords[index]) + 1
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    yield index, start
+
+
+class HoldingsMatcher:
+    """Maps a news title to the portfolio holdings it mentions (built once per portfolio)"""
+
+    def __init__(self, holdings: List[Dict]):
+        self.holdings = holdings
+        keyword_holdings: Dict[str, List[int]] = {}
+        for index, holding in enumerate(holdings):
+            for keyword in (holding.get('symbol'), holding.get('asset_type')):
+                if keyword:
+                    owners = keyword_holdings.setdefault(keyword.lower(), [])
+                    if not owners or owners[-1] != index:
+                        owners.append(index)
+
+        self._automaton = KeywordAutomaton(keyword_holdings)
+        self._owners = [keyword_holdings[k] for k in self._automaton.keywords]
+        self._by_symbol: Dict[str, List[int]] = {}
+        for index, holding in enumerate(holdings):
+            self._by_symbol.setdefault(str(holding.get('symbol', '')).upper(), []).append(index)
+
+    def holdings_in(self, text: Optional[str], symbols: Iterable[str] = ()) -> List[int]:
+        """Indices of holdings mentioned in text (or listed in symbols), in portfolio order"""
+        found = set()
+        for symbol in symbols:
+            found.update(self._by_symbol.get(symbol.upper(), ()))
+        if text:
+            for keyword_index, _ in self._automaton.find(text.lower()):
+                found.update(self._owners[keyword_index])
+        return sorted(found)
+
+
+def _article_entry(holding: Dict, article: Any) -> Dict:
+    return {
+        "symbol": holding['symbol'],
+        "title": article.title,
+        "summary": article.summary[:150] if article.summary else "No summary",
+        "sentiment_score": SENTIMENT_MAP[article.sentiment],
+        "source": article.source,
+        "url": article.url
+    }
+
+
+def analyze_news_for_holdings(
+    holdings: List[Dict],
+    news_articles: List,
+    max_opportunities: int = 5,
+    max_threats: int = 5,
+    indexed_mentions: Optional[Dict[int, Iterable[str]]] = None
+) -> Tuple[Dict, List[Dict], List[Dict]]:
+    """
+    Sentiment match, opportunities and threats from one pass over the articles
+
+    Near-duplicate articles (same cluster_id) count once per holding, so a
+    story syndicated by several sources doesn't amplify its sentiment.
+
+    Args:
+        holdings: Portfolio holdings (symbol, asset_type, ...)
+        news_articles: NewsArticle rows (title, summary, sentiment, source, url)
+        max_opportunities: Positive articles to keep
+        max_threats: Negative articles to keep
+        indexed_mentions: Article id -> symbols from the news index (company-name hits)
+
+    Returns:
+        (sentiment analysis dict, opportunities, threats)
+    """
+    if not holdings or not news_articles:
+        return {"score": 30, "alerts": [], "matches": []}, [], []
+
+    matcher = HoldingsMatcher(holdings)
+    matches = []
+    alerts = []
+    opportunities = []
+    threats = []
+    seen = set()  # (story, holding index)
+    seen_stories = set()
+
+    for article in news_articles:
+        story = getattr(article, 'cluster_id', None) or article.id
+        mentioned = [
+            index for index in matcher.holdings_in(article.title, indexed_mentions.get(article.id, ()) if indexed_mentions else ())
+            if (story, index) not in seen
+        ]
+        if not mentioned:
+            continue
+        seen.update((story, index) for index in mentioned)
+        sentiment_score = SENTIMENT_MAP.get(article.sentiment, 0.0)
+
+        for index in mentioned:
+            holding = holdings[index]
+            matches.append({
+                "symbol": holding['symbol'],
+                "article_title": article.title,
+                "sentiment": article.sentiment,
+                "sentiment_score": sentiment_score,
+                "source": article.source
+            })
+            # Alert if negative news about holding
+            if sentiment_score < -0.3:
+                alerts.append(f"🔴 Negative news about {holding['symbol']}: {article.title[:80]}...")
+
+        # Opportunities / threats credit the first holding the article mentions, once per story
+        if story in seen_stories:
+            continue
+        seen_stories.add(story)
+        if article.sentiment == "positive" and len(opportunities) < max_opportunities:
+            opportunities.append(_article_entry(holdings[mentioned[0]], article))
+        elif article.sentiment == "negative" and len(threats) < max_threats:
+            threats.append(_article_entry(holdings[mentioned[0]], article))
+
+    # Calculate sentiment risk score
+    if matches:
+        avg_sentiment = sum(m['sentiment_score'] for m in matches) / len(matches)
+
+        if avg_sentiment < -0.3:
+            score = 70
+        elif avg_sentiment < 0:
+            score = 45
+        else:
+            score = 25
+    else:
+        score = 30  # No news is neutral
+
+    sentiment = {
+        "score": score,
+        "alerts": alerts,
+        "matches": matches[:10],  # Top 10 matches
+        "total_matches": len(matches)
+    }
+    return sentiment, opportunities, threats
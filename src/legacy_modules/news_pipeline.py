@@ -0,0 +1,282 @@
+"""
+News Pipeline - Staged news ingestion with backpressure
+fetch (async downloads) -> bounded queue -> process (parse + sentiment in the
+parse process pool) -> bounded queue -> write (chunked bulk inserts)
+
+Each stage runs concurrently with the others, so a large fetch keeps the
+event loop free for API handlers; the bounded queues stop fast producers
+from buffering more than a few payloads ahead of a slow stage.
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.config import settings
+from shared.models import NewsSourceUsage
+from shared.utils.database import get_session_maker
+from legacy_modules.news_fetcher import NewsFetcher
+from legacy_modules.news_ingest import ingest_articles
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()  # end-of-stream marker passed down the queues
+
+_pipeline_stats: Dict[str, Any] = {'runs': 0, 'failures': 0, 'last_run': None}
+
+# Fetches share the fetcher's staged source state, so one ingest at a time per process
+_ingest_lock = asyncio.Lock()
+
+
+class StageMetrics:
+    """Items in/out, busy time and time blocked on a full downstream queue"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_ms = 0.0
+        self.blocked_ms = 0.0
+        self.queue_high_water = 0
+        self._started = None
+        self._finished = None
+
+    def start(self):
+        if self._started is None:
+            self._started = time.perf_counter()
+
+    def finish(self):
+        self._finished = time.perf_counter()
+
+    def observe_queue(self, queue: asyncio.Queue):
+        """Track the deepest the stage's input queue got"""
+        self.queue_high_water = max(self.queue_high_water, queue.qsize())
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self._finished or time.perf_counter()) - self._started if self._started else 0.0
+        return {
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'busy_ms': round(self.busy_ms, 1),
+            'blocked_ms': round(self.blocked_ms, 1),
+            'elapsed_ms': round(elapsed * 1000, 1),
+            'items_per_sec': round(self.items_out / elapsed, 1) if elapsed else 0.0,
+            'queue_high_water': self.queue_high_water
+        }
+
+
+async def _put(queue: asyncio.Queue, item: Any, metrics: StageMetrics):
+    """Put with backpressure, counting the time spent waiting for room"""
+    started = time.perf_counter()
+    await queue.put(item)
+    metrics.blocked_ms += (time.perf_counter() - started) * 1000
+
+
+async def run_ingest_pipeline(
+    session: AsyncSession,
+    fetcher: NewsFetcher,
+    sources: Optional[List[str]] = None,
+    queue_size: Optional[int] = None,
+    process_workers: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Fetch, score and store news from the selected sources
+
+    Source cursors/validators are only staged here; ingest_news commits or
+    discards them on the fetcher once this returns or raises.
+
+    Args:
+        session: Database session for the writer stage
+        fetcher: News fetcher (downloads + parsing)
+        sources: Source keys (all when None)
+        queue_size: Capacity of each inter-stage queue (defaults to NEWS_PIPELINE_QUEUE_SIZE)
+        process_workers: Payloads parsed concurrently (defaults to NEWS_PIPELINE_PROCESS_WORKERS)
+        chunk_size: Articles per write (defaults to NEWS_INGEST_CHUNK_SIZE)
+
+    Returns:
+        Dict with fetched, inserted, duplicates, near_duplicates, symbol_mentions and per-stage metrics
+    """
+    selected = fetcher.select_sources(sources)
+    queue_size = max(1, queue_size or settings.NEWS_PIPELINE_QUEUE_SIZE)
+    process_workers = max(1, process_workers or settings.NEWS_PIPELINE_PROCESS_WORKERS)
+    chunk_size = max(1, chunk_size or settings.NEWS_INGEST_CHUNK_SIZE)
+
+    payloads: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    batches: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    fetch, process, write = StageMetrics('fetch'), StageMetrics('process'), StageMetrics('write')
+    totals = {'fetched': 0, 'inserted': 0, 'duplicates': 0, 'near_duplicates': 0, 'symbol_mentions': 0}
+    started = time.perf_counter()
+
+    async def download(key: str):
+        fetch.items_in += 1
+        began = time.perf_counter()
+        text = await fetcher.download(key)
+        fetch.busy_ms += (time.perf_counter() - began) * 1000
+        if text is not None:
+            fetch.items_out += 1
+            await _put(payloads, (key, text), fetch)
+            process.observe_queue(payloads)
+
+    async def fetch_stage():
+        fetch.start()
+        await asyncio.gather(*(download(key) for key in selected))
+        fetch.finish()
+        for _ in range(process_workers):
+            await payloads.put(_DONE)
+
+    async def process_worker():
+        while True:
+            item = await payloads.get()
+            if item is _DONE:
+                return
+            process.start()
+            key, text = item
+            process.items_in += 1
+            began = time.perf_counter()
+            articles = await fetcher.process(key, text)
+            process.busy_ms += (time.perf_counter() - began) * 1000
+            if articles:
+                process.items_out += len(articles)
+                await _put(batches, articles, process)
+                write.observe_queue(batches)
+
+    async def process_stage():
+        await asyncio.gather(*(process_worker() for _ in range(process_workers)))
+        process.finish()
+        await batches.put(_DONE)
+
+    async def flush(buffer: List[Dict]):
+        began = time.perf_counter()
+        ingested = await ingest_articles(session, buffer, chunk_size=chunk_size)
+        write.busy_ms += (time.perf_counter() - began) * 1000
+        write.items_out += ingested['inserted']
+        for name in totals:
+            totals[name] += ingested[name]
+
+    async def write_stage():
+        buffer = []
+        while True:
+            item = await batches.get()
+            if item is _DONE:
+                break
+            write.start()
+            write.items_in += len(item)
+            buffer.extend(item)
+            if len(buffer) >= chunk_size:
+                await flush(buffer)
+                buffer = []
+        if buffer:
+            await flush(buffer)
+        write.finish()
+
+    tasks = [asyncio.create_task(stage()) for stage in (fetch_stage, process_stage, write_stage)]
+    try:
+        await asyncio.gather(*tasks)
+    except Exception:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        _pipeline_stats['failures'] += 1
+        raise
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    result = {
+        **totals,
+        'sources': len(selected),
+        'elapsed_ms': round(elapsed_ms, 1),
+        'stages': {stage.name: stage.to_dict() for stage in (fetch, process, write)}
+    }
+    _pipeline_stats['runs'] += 1
+    _pipeline_stats['last_run'] = {**result, 'finished_at': datetime.utcnow().isoformat()}
+    logger.info(
+        f"🗞️ News pipeline: {totals['fetched']} fetched, {totals['inserted']} new from "
+        f"{len(selected)} sources in {elapsed_ms:.0f}ms"
+    )
+    return result
+
+
+def _upsert_usage(dialect: str):
+    """Dialect INSERT that adds to an existing (source, day) row, or None if unsupported"""
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(NewsSourceUsage)
+    return stmt.on_conflict_do_update(
+        index_elements=['source', 'day'],
+        set_={'requests': NewsSourceUsage.requests + stmt.excluded.requests}
+    )
+
+
+async def record_source_usage(requests: Dict[str, int]):
+    """Add today's requests per source to news_source_usage (own session)"""
+    requests = {key: count for key, count in requests.items() if count}
+    if not requests:
+        return
+    day = datetime.utcnow().date()
+    async with get_session_maker()() as session:
+        stmt = _upsert_usage(session.bind.dialect.name)
+        if stmt is not None:
+            await session.execute(stmt.values([{'source': key, 'day': day, 'requests': count} for key, count in requests.items()]))
+        else:
+            for key, count in requests.items():
+                result = await session.execute(
+                    update(NewsSourceUsage)
+                    .where(NewsSourceUsage.source == key, NewsSourceUsage.day == day)
+                    .values(requests=NewsSourceUsage.requests + count)
+                )
+                if result.rowcount == 0:
+                    session.add(NewsSourceUsage(source=key, day=day, requests=count))
+        await session.commit()
+
+
+async def source_usage_today() -> Dict[str, int]:
+    """Requests made to each source so far today, by any worker"""
+    async with get_session_maker()() as session:
+        result = await session.execute(
+            select(NewsSourceUsage.source, NewsSourceUsage.requests)
+            .where(NewsSourceUsage.day == datetime.utcnow().date())
+        )
+        return dict(result.all())
+
+
+async def ingest_news(session: AsyncSession, fetcher: NewsFetcher, sources: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Run the pipeline and persist the sources' cursors once articles are stored
+
+    Callers (the fetch endpoints, the scheduler) are serialized so one run's
+    failure can't discard another run's staged cursors. Requests made are
+    recorded against the sources' daily quotas whether or not the run succeeds.
+    """
+    async with _ingest_lock:
+        before = fetcher.stats()
+        try:
+            result = await run_ingest_pipeline(session, fetcher, sources=sources)
+        except Exception:
+            fetcher.discard_state()
+            raise
+        finally:
+            after = fetcher.stats()
+            try:
+                await record_source_usage({key: after[key]['requests'] - before[key]['requests'] for key in after})
+            except Exception as e:
+                logger.warning(f"⚠️ Could not record news source usage: {e}")
+        fetcher.commit_state()
+        return result
+
+
+def news_pipeline_stats() -> Dict[str, Any]:
+    """Run counters and the last run's per-stage metrics"""
+    return dict(_pipeline_stats)
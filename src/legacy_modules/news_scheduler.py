@@ -0,0 +1,291 @@
+"""
+News Scheduler - Background news ingestion with adaptive per-source polling
+Each source is polled on its own interval, tightened when it keeps producing
+new articles and relaxed when it is quiet, never faster than its free-tier
+daily quota allows. A lease row in the database elects one leader, so only
+one of several server workers (or a standalone worker) polls at a time.
+Quota usage is read from news_source_usage, which every ingest (manual
+fetches included) adds to, so it survives a leader failover.
+
+Run standalone with: python legacy_modules/news_scheduler.py
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.config import settings
+from shared.utils.database import get_session_maker, init_db
+from legacy_modules.news_fetcher import NewsFetcher, get_news_fetcher, shutdown_parse_pool
+from legacy_modules.news_pipeline import ingest_news, source_usage_today
+from legacy_modules.leader_lease import LeaderLease
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "news_scheduler"
+
+# Free-tier requests per day (None = no daily quota)
+SOURCE_DAILY_QUOTAS = {
+    'economic_times': None,
+    'zerodha': None,
+    'newsapi': 100,
+    'alpha_vantage': 25,
+    'finnhub': None,  # 60/minute
+    'marketaux': 100,
+    'gnews': 100
+}
+
+RATE_SMOOTHING = 0.3  # EWMA weight of the latest poll's articles/second
+
+
+class SourceSchedule:
+    """Polling interval, quota usage and observed publish rate for one source"""
+
+    def __init__(self, key: str, min_interval: float, max_interval: float, daily_quota: Optional[int] = None):
+        self.key = key
+        self.daily_quota = daily_quota
+        # Spread the daily quota evenly rather than spending it in the morning
+        self.min_interval = max(min_interval, 86400 / daily_quota) if daily_quota else min_interval
+        self.max_interval = max(max_interval, self.min_interval)
+        self.interval = self.min_interval
+        self.next_due = 0.0  # monotonic; 0 = poll on the first pass
+        self.last_poll: Optional[float] = None
+        self.rate = 0.0  # new articles per second (EWMA)
+        self.rate_samples = 0
+        self.polls = 0
+        self.quota_day = None
+        self.quota_used = 0
+
+    def sync_quota(self, used: int):
+        """Take today's request count as recorded in the database"""
+        self.quota_day = datetime.utcnow().date()
+        self.quota_used = used
+
+    def quota_exhausted(self) -> bool:
+        if not self.daily_quota:
+            return False
+        if self.quota_day != datetime.utcnow().date():
+            self.quota_day = datetime.utcnow().date()
+            self.quota_used = 0
+        return self.quota_used >= self.daily_quota
+
+    def seconds_to_quota_reset(self) -> float:
+        now = datetime.utcnow()
+        return (datetime.combine(now.date() + timedelta(days=1), datetime.min.time()) - now).total_seconds()
+
+    def observe(self, now: float, new_articles: int, requested: bool, failed: bool, rate_limited: bool = False):
+        """
+        Pick the next interval from one poll's outcome
+
+        Args:
+            now: time.monotonic() at the end of the poll
+            new_articles: Articles newer than the source's cursor (0 for a 304)
+            requested: Whether an HTTP request was actually made
+            failed: Error or timeout
+            rate_limited: The fetcher skipped it (e.g. a manual fetch just ran)
+        """
+        self.polls += 1
+        if requested:
+            self.quota_used += 1
+
+        if rate_limited:
+            pass  # try again after the current interval
+        elif not requested:
+            # No API key configured: check back rarely
+            self.interval = self.max_interval
+        elif failed:
+            self.interval = min(self.max_interval, self.interval * 2)
+        elif self.last_poll is not None:
+            observed = new_articles / max(now - self.last_poll, 1.0)
+            self.rate = observed if not self.rate_samples else RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * self.rate
+            self.rate_samples += 1
+            if self.rate > 0:
+                # Aim for about NEWS_SCHEDULER_TARGET_ARTICLES new articles per poll
+                target = settings.NEWS_SCHEDULER_TARGET_ARTICLES / self.rate
+                self.interval = min(self.max_interval, max(self.min_interval, target))
+            else:
+                self.interval = min(self.max_interval, self.interval * 1.5)
+
+        if requested and not failed:
+            self.last_poll = now
+        self.next_due = now + self.interval
+        if self.quota_exhausted():
+            self.next_due = now + max(self.interval, self.seconds_to_quota_reset())
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            'interval_seconds': round(self.interval, 1),
+            'next_poll_in_seconds': round(max(0.0, self.next_due - now), 1),
+            'articles_per_hour': round(self.rate * 3600, 2),
+            'polls': self.polls,
+            'quota_used_today': self.quota_used if self.daily_quota else None,
+            'daily_quota': self.daily_quota
+        }
+
+
+class NewsScheduler:
+    """
+    Leader-elected background poller for all news sources
+
+    Due sources are fetched together through ingest_news, so they share one
+    pipeline run (and one DB writer). Request handlers never wait on it.
+    """
+
+    def __init__(
+        self,
+        fetcher: Optional[NewsFetcher] = None,
+        min_interval: float = 120,
+        max_interval: float = 3600,
+        lease_seconds: float = 60
+    ):
+        self._fetcher = fetcher
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.lease_seconds = lease_seconds
+        self.lease = LeaderLease(LEASE_NAME, lease_seconds)
+
+        self._schedules: Dict[str, SourceSchedule] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {'cycles': 0, 'polls': 0, 'articles_inserted': 0, 'errors': 0,
+                       'last_poll_ms': 0.0, 'last_error': None}
+
+    @property
+    def fetcher(self) -> NewsFetcher:
+        if self._fetcher is None:
+            self._fetcher = get_news_fetcher()
+        return self._fetcher
+
+    def schedule(self, key: str) -> SourceSchedule:
+        if key not in self._schedules:
+            self._schedules[key] = SourceSchedule(key, self.min_interval, self.max_interval, SOURCE_DAILY_QUOTAS.get(key))
+        return self._schedules[key]
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+
+    def due_sources(self, now: float) -> List[str]:
+        return [
+            key for key in self.fetcher.select_sources()
+            if self.schedule(key).next_due <= now and not self.schedule(key).quota_exhausted()
+        ]
+
+    async def poll(self, sources: List[str]) -> Dict[str, Any]:
+        """Ingest the given sources and reschedule each from its own counters"""
+        before = self.fetcher.stats()
+        started = time.perf_counter()
+        try:
+            async with get_session_maker()() as session:
+                result = await ingest_news(session, self.fetcher, sources=sources)
+        finally:
+            after = self.fetcher.stats()
+            now = time.monotonic()
+            for key in sources:
+                delta = {name: after[key][name] - before[key][name] for name in ('requests', 'articles', 'errors', 'timeouts', 'rate_limited')}
+                self.schedule(key).observe(
+                    now,
+                    new_articles=delta['articles'],
+                    requested=delta['requests'] > 0,
+                    failed=delta['errors'] > 0 or delta['timeouts'] > 0,
+                    rate_limited=delta['rate_limited'] > 0
+                )
+            self._stats['polls'] += len(sources)
+            self._stats['last_poll_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+        self._stats['articles_inserted'] += result['inserted']
+        return result
+
+    async def run_once(self):
+        """Renew the lease and poll whichever sources are due"""
+        if not await self.lease.acquire():
+            return
+        used = await source_usage_today()
+        for key in self.fetcher.select_sources():
+            self.schedule(key).sync_quota(used.get(key, 0))
+        due = self.due_sources(time.monotonic())
+        if due:
+            # A slow poll must not outlive the lease and let a second leader poll too
+            async with self.lease.keep_alive():
+                await self.poll(due)
+        self._stats['cycles'] += 1
+
+    def _sleep_seconds(self) -> float:
+        """Until the next source is due, but renew the lease well before it expires"""
+        renew = self.lease_seconds / 3
+        if not self.lease.is_leader or not self._schedules:
+            return renew
+        next_due = min(schedule.next_due for schedule in self._schedules.values())
+        return max(1.0, min(renew, next_due - time.monotonic()))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self._stats['errors'] += 1
+                self._stats['last_error'] = str(e)
+                logger.error(f"❌ News scheduler cycle failed: {str(e)}")
+            await asyncio.sleep(self._sleep_seconds())
+
+    def start(self):
+        """Start polling on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"✅ News scheduler started ({self.lease.holder})")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.lease.release()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not release news scheduler lease: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        stats = dict(self._stats)
+        stats['running'] = self._task is not None and not self._task.done()
+        stats['leader'] = self.lease.is_leader
+        stats['holder'] = self.lease.holder
+        stats['lease_acquired'] = self.lease.acquired
+        stats['sources'] = {key: schedule.to_dict(now) for key, schedule in self._schedules.items()}
+        return stats
+
+
+# Global instance
+news_scheduler = NewsScheduler(
+    min_interval=settings.NEWS_SCHEDULER_MIN_INTERVAL_SECONDS,
+    max_interval=settings.NEWS_SCHEDULER_MAX_INTERVAL_SECONDS,
+    lease_seconds=settings.NEWS_SCHEDULER_LEASE_SECONDS
+)
+
+
+async def main():
+    """Standalone worker: poll until interrupted"""
+    await init_db()
+    news_scheduler.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await news_scheduler.stop()
+        await news_scheduler.fetcher.close()
+        shutdown_parse_pool()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("🛑 News scheduler stopped")
@@ -0,0 +1,247 @@
+"""
+News Search - Full-text search over news_articles
+SQLite uses an FTS5 external-content table kept in sync by triggers;
+PostgreSQL uses a GIN index on the title/summary/content tsvector. Both rank
+matches (bm25 / ts_rank_cd), return highlighted snippets and page with an
+opaque keyset cursor, so searches never scan the articles table.
+"""
+import base64
+import json
+import logging
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+logger = logging.getLogger(__name__)
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS news_articles_fts USING fts5(
+        title, summary, content,
+        content='news_articles', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS news_articles_fts_ai AFTER INSERT ON news_articles BEGIN
+        INSERT INTO news_articles_fts(rowid, title, summary, content) VALUES (new.id, new.title, new.summary, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS news_articles_fts_ad AFTER DELETE ON news_articles BEGIN
+        INSERT INTO news_articles_fts(news_articles_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS news_articles_fts_au AFTER UPDATE OF title, summary, content ON news_articles BEGIN
+        INSERT INTO news_articles_fts(news_articles_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO news_articles_fts(rowid, title, summary, content) VALUES (new.id, new.title, new.summary, new.content);
+    END""",
+]
+
+_PG_DOCUMENT = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(summary, '') || ' ' || coalesce(content, ''))"
+_PG_WEIGHTED = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'C')"
+)
+
+
+def search_terms(query: str) -> List[str]:
+    return _TERM_PATTERN.findall(query or "")
+
+
+def encode_cursor(score: float, article_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, article_id]).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    """(score, id) from an opaque cursor; raises ValueError when malformed"""
+    if not cursor:
+        return None
+    try:
+        score, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(article_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+async def ensure_search_index(session: AsyncSession) -> bool:
+    """
+    Create the full-text index (and its triggers) if missing
+
+    Returns:
+        True when the index was created (and filled from existing rows)
+    """
+    dialect = session.bind.dialect.name
+    if dialect == "sqlite":
+        exists = await session.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'news_articles_fts'"))
+        created = exists.first() is None
+        for statement in _SQLITE_SETUP:
+            await session.execute(text(statement))
+        if created:
+            await session.execute(text("INSERT INTO news_articles_fts(news_articles_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        exists = await session.execute(text("SELECT 1 FROM pg_indexes WHERE indexname = 'ix_news_articles_fts'"))
+        created = exists.first() is None
+        await session.execute(text(f"CREATE INDEX IF NOT EXISTS ix_news_articles_fts ON news_articles USING GIN (({_PG_DOCUMENT}))"))
+    else:
+        logger.warning(f"⚠️ No full-text index for {dialect}, news search will scan")
+        return False
+    await session.commit()
+    if created:
+        logger.info("🔎 News full-text index built")
+    return created
+
+
+def _filters(symbol: Optional[str], date_from: Optional[datetime], date_to: Optional[datetime], params: Dict[str, Any]) -> str:
+    """Extra WHERE clauses on news_articles (aliased a)"""
+    clauses = []
+    if symbol:
+        clauses.append("a.id IN (SELECT article_id FROM article_symbols WHERE symbol = :symbol)")
+        params['symbol'] = symbol.upper()
+    if date_from:
+        clauses.append("a.published_at >= :date_from")
+        params['date_from'] = date_from
+    if date_to:
+        clauses.append("a.published_at < :date_to")
+        params['date_to'] = date_to
+    return "".join(f" AND {clause}" for clause in clauses)
+
+
+async def search_news(
+    session: AsyncSession,
+    query: str,
+    symbol: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Ranked full-text search over title, summary and content
+
+    All query words must match (stemmed, so "hike" finds "hikes").
+
+    Args:
+        session: Database session
+        query: Search words
+        symbol: Only articles indexed under this symbol
+        date_from: Published at or after
+        date_to: Published before
+        limit: Page size
+        cursor: next_cursor from the previous page
+
+    Returns:
+        Dict with results (best first, with snippet and score) and next_cursor
+    """
+    terms = search_terms(query)
+    limit = max(1, min(limit, 100))
+    if not terms:
+        return {"results": [], "next_cursor": None}
+    after = decode_cursor(cursor)
+    params: Dict[str, Any] = {'limit': limit + 1}
+    where = _filters(symbol, date_from, date_to, params)
+    dialect = session.bind.dialect.name
+
+    if dialect == "sqlite":
+        # Quoted terms can't be read as FTS5 operators; lower bm25 = better
+        params['match'] = " ".join('"' + term.replace('"', '') + '"' for term in terms)
+        keyset = ""
+        if after:
+            keyset = " AND (m.score > :after_score OR (m.score = :after_score AND a.id > :after_id))"
+            params['after_score'], params['after_id'] = after
+        # Title matches count most, then summary, then body; snippets are added for the page only
+        sql = f"""
+            SELECT a.id, a.title, a.summary, a.url, a.source, a.published_at, a.sentiment, a.cluster_id, m.score, NULL AS snippet
+            FROM (
+                SELECT rowid AS id, bm25(news_articles_fts, 10.0, 4.0, 1.0) AS score
+                FROM news_articles_fts WHERE news_articles_fts MATCH :match
+            ) m JOIN news_articles a ON a.id = m.id
+            WHERE 1 = 1{where}{keyset}
+            ORDER BY m.score, a.id
+            LIMIT :limit
+        """
+    elif dialect == "postgresql":
+        # Scores are negated so both dialects page "ascending score = better"
+        params['query'] = " ".join(terms)
+        keyset = ""
+        if after:
+            keyset = " AND (-ts_rank_cd(" + _PG_WEIGHTED + ", q) > :after_score OR (-ts_rank_cd(" + _PG_WEIGHTED + ", q) = :after_score AND a.id > :after_id))"
+            params['after_score'], params['after_id'] = after
+        sql = f"""
+            SELECT a.id, a.title, a.summary, a.url, a.source, a.published_at, a.sentiment, a.cluster_id,
+                   -ts_rank_cd({_PG_WEIGHTED}, q) AS score,
+                   ts_headline('english', coalesce(a.summary, a.title), q,
+                               'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=12') AS snippet
+            FROM news_articles a, plainto_tsquery('english', :query) q
+            WHERE {_PG_DOCUMENT} @@ q{where}{keyset}
+            ORDER BY score, a.id
+            LIMIT :limit
+        """
+    else:
+        # No full-text index: every term as a substring, newest first
+        term_clauses = []
+        for i, term in enumerate(terms):
+            params[f'term{i}'] = f"%{term.lower()}%"
+            term_clauses.append(f"(lower(a.title) LIKE :term{i} OR lower(coalesce(a.summary, '')) LIKE :term{i})")
+        keyset = ""
+        if after:
+            keyset = " AND a.id < :after_id"
+            params['after_id'] = after[1]
+        sql = f"""
+            SELECT a.id, a.title, a.summary, a.url, a.source, a.published_at, a.sentiment, a.cluster_id, 0.0 AS score, a.summary AS snippet
+            FROM news_articles a
+            WHERE {' AND '.join(term_clauses)}{where}{keyset}
+            ORDER BY a.id DESC
+            LIMIT :limit
+        """
+
+    statement = text(sql)
+    for name in ('date_from', 'date_to'):
+        if name in params:
+            # Typed so SQLite compares against the stored DATETIME string format
+            statement = statement.bindparams(bindparam(name, type_=DateTime))
+    rows = (await session.execute(statement, params)).mappings().all()
+    page = rows[:limit]
+    snippets = {}
+    if dialect == "sqlite" and page:
+        ids = ", ".join(str(int(row['id'])) for row in page)
+        result = await session.execute(
+            text(
+                "SELECT rowid, snippet(news_articles_fts, -1, '<mark>', '</mark>', '…', 16) FROM news_articles_fts "
+                f"WHERE news_articles_fts MATCH :match AND rowid IN ({ids})"
+            ),
+            {'match': params['match']}
+        )
+        snippets = dict(result.all())
+    next_cursor = encode_cursor(page[-1]['score'], page[-1]['id']) if len(rows) > limit else None
+    return {
+        "results": [
+            {
+                "id": row['id'],
+                "title": row['title'],
+                "summary": row['summary'],
+                "url": row['url'],
+                "source": row['source'],
+                "published_at": _isoformat(row['published_at']),
+                "sentiment": row['sentiment'],
+                "cluster_id": row['cluster_id'] or row['id'],
+                "score": round(-float(row['score']), 4),
+                "snippet": snippets.get(row['id'], row['snippet'])
+            }
+            for row in page
+        ],
+        "next_cursor": next_cursor
+    }
+
+
+def _isoformat(value: Any) -> Optional[str]:
+    """Raw SQL on SQLite returns DATETIME columns as strings"""
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else str(value).replace(' ', 'T')
@@ -0,0 +1,108 @@
+"""
+News Source State - Per-source polling state kept on disk
+Stores each feed's ETag / Last-Modified and the newest item seen (published_at
+cursor, last id), so polls can be conditional (304 when unchanged) and API
+sources can ask only for items newer than the cursor
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Drop tzinfo after converting to UTC (feeds mix aware and naive datetimes)"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class NewsSourceState:
+    """
+    ETag / Last-Modified / cursor per news source, persisted as JSON
+
+    Updates from a fetch are staged and only become the state used for the
+    next conditional request after commit(), which callers run once the
+    articles are stored - a failed ingest re-fetches instead of skipping items.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._staged: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._state = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read news source state: {e}")
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write news source state: {e}")
+
+    def get(self, source: str) -> Dict[str, Any]:
+        return dict(self._state.get(source, {}))
+
+    def cursor(self, source: str) -> Optional[datetime]:
+        """Newest published_at already stored for the source (naive UTC)"""
+        value = self._state.get(source, {}).get('cursor')
+        return datetime.fromisoformat(value) if value else None
+
+    def conditional_headers(self, source: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since for the source's last full response"""
+        state = self._state.get(source, {})
+        headers = {}
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+        return headers
+
+    def stage_response(self, source: str, headers: Any):
+        """Remember validators from a 200 response"""
+        with self._lock:
+            staged = self._staged.setdefault(source, {})
+            staged['etag'] = headers.get('etag')
+            staged['last_modified'] = headers.get('last-modified')
+
+    def stage_items(self, source: str, published: Iterable[Optional[datetime]], last_id: Any = None):
+        """Advance the cursor to the newest published_at (and id) in a batch"""
+        newest = max((naive_utc(p) for p in published if p is not None), default=None)
+        with self._lock:
+            staged = self._staged.setdefault(source, {})
+            current = staged.get('cursor') or self._state.get(source, {}).get('cursor')
+            if newest is not None and (current is None or newest.isoformat() > current):
+                staged['cursor'] = newest.isoformat()
+            if last_id is not None:
+                staged['last_id'] = last_id
+
+    def commit(self):
+        """Make staged updates current and write them to disk"""
+        with self._lock:
+            if not self._staged:
+                return
+            for source, updates in self._staged.items():
+                self._state.setdefault(source, {}).update(updates)
+                self._state[source]['updated_at'] = datetime.utcnow().isoformat()
+            self._staged = {}
+            self._save()
+
+    def discard(self):
+        with self._lock:
+            self._staged = {}
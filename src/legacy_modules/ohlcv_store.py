@@ -0,0 +1,315 @@
+"""
+OHLCV Store - Local columnar price history per symbol
+Bars live in one .npy file per symbol and interval, shaped (6, n) float64 with
+rows timestamp/open/high/low/close/volume, so each field is a contiguous row
+that can be memory-mapped and sliced without copying
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import yfinance as yf
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from legacy_modules.price_service import cg, _resolve_coin_id
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(FIELDS))
+
+# Supported bar sizes (seconds per bar)
+INTERVAL_SECONDS = {'1d': 86400, '1h': 3600}
+
+# First retry after a failed backfill; doubles per consecutive failure
+ERROR_BACKOFF_SECONDS = 60
+
+
+def _empty_bars() -> np.ndarray:
+    return np.empty((len(FIELDS), 0), dtype=np.float64)
+
+
+def _bucket_ohlcv(timestamps: np.ndarray, prices: np.ndarray, volumes: np.ndarray, step: int) -> np.ndarray:
+    """Aggregate (possibly finer-grained) price points into bars of `step` seconds"""
+    if len(timestamps) == 0:
+        return _empty_bars()
+
+    order = np.argsort(timestamps, kind='stable')
+    timestamps, prices, volumes = timestamps[order], prices[order], volumes[order]
+    buckets = np.floor(timestamps / step) * step
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+
+    return np.vstack([
+        buckets[starts],
+        prices[starts],
+        np.maximum.reduceat(prices, starts),
+        np.minimum.reduceat(prices, starts),
+        prices[ends],
+        volumes[ends]
+    ]).astype(np.float64)
+
+
+def _fetch_stock_bars(symbol: str, start_ts: float, interval: str) -> np.ndarray:
+    """Fetch bars newer than start_ts from Yahoo Finance"""
+    start = datetime.fromtimestamp(start_ts, tz=timezone.utc).strftime('%Y-%m-%d')
+    hist = yf.Ticker(symbol).history(start=start, interval=interval, auto_adjust=False)
+    if hist is None or hist.empty:
+        return _empty_bars()
+
+    if interval == '1d':
+        # Daily bars are keyed by their trading date at 00:00 UTC
+        timestamps = np.array([
+            datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp()
+            for d in hist.index
+        ], dtype=np.float64)
+    else:
+        timestamps = hist.index.asi8 / 1e9
+
+    bars = np.vstack([
+        timestamps,
+        hist['Open'].to_numpy(dtype=np.float64),
+        hist['High'].to_numpy(dtype=np.float64),
+        hist['Low'].to_numpy(dtype=np.float64),
+        hist['Close'].to_numpy(dtype=np.float64),
+        hist['Volume'].to_numpy(dtype=np.float64)
+    ])
+    return bars[:, ~np.isnan(bars[CLOSE])]
+
+
+def _fetch_crypto_bars(symbol: str, start_ts: float, interval: str) -> np.ndarray:
+    """Fetch bars newer than start_ts from CoinGecko market_chart/range"""
+    coin_id = _resolve_coin_id(symbol)
+    if not coin_id:
+        return _empty_bars()
+
+    chart = cg.get_coin_market_chart_range_by_id(
+        id=coin_id,
+        vs_currency='usd',
+        from_timestamp=int(start_ts),
+        to_timestamp=int(time.time())
+    )
+    prices = np.array(chart.get('prices') or [], dtype=np.float64).reshape(-1, 2)
+    volumes = np.array(chart.get('total_volumes') or [], dtype=np.float64).reshape(-1, 2)
+    if len(prices) == 0:
+        return _empty_bars()
+
+    # CoinGecko picks the granularity from the range; bucket it into our bar size
+    volume_col = volumes[:, 1] if len(volumes) == len(prices) else np.zeros(len(prices))
+    return _bucket_ohlcv(prices[:, 0] / 1000.0, prices[:, 1], volume_col, INTERVAL_SECONDS[interval])
+
+
+BAR_FETCHERS = {
+    'stock': _fetch_stock_bars,
+    'crypto': _fetch_crypto_bars
+}
+
+
+class OHLCVStore:
+    """
+    Memory-mapped OHLCV history with incremental backfill
+
+    Reads return views into the memory-mapped file; writes rewrite the file
+    atomically (temp file + os.replace) so readers never see a partial array.
+    """
+
+    def __init__(self, root: str, lookback_days: int = 730, refresh_seconds: float = 3600):
+        self.root = root
+        self.lookback_days = lookback_days
+        self.refresh_seconds = refresh_seconds
+
+        self._maps: Dict[str, tuple] = {}
+        self._retry_at: Dict[tuple, float] = {}  # next backfill check per (symbol, interval)
+        self._failures: Dict[tuple, int] = {}  # consecutive fetch errors
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {'reads': 0, 'backfills': 0, 'bars_written': 0, 'fetch_errors': 0}
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _path(self, symbol: str, interval: str) -> str:
+        safe_symbol = re.sub(r'[^A-Z0-9._^=-]', '_', symbol.upper())
+        return os.path.join(self.root, interval, f"{safe_symbol}.npy")
+
+    def _open(self, symbol: str, interval: str) -> np.ndarray:
+        """Memory-map the symbol's file, reopening only when it has been rewritten"""
+        path = self._path(symbol, interval)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return _empty_bars()
+
+        cached = self._maps.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        bars = np.load(path, mmap_mode='r')
+        with self._lock:
+            self._maps[path] = (mtime, bars)
+        return bars
+
+    def bars(
+        self,
+        symbol: str,
+        interval: str = '1d',
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Read bars in [start, end) without copying
+
+        Args:
+            symbol: Stock or crypto symbol
+            interval: Bar size ('1d' or '1h')
+            start: Inclusive epoch seconds (None = from the first bar)
+            end: Exclusive epoch seconds (None = through the last bar)
+
+        Returns:
+            Read-only (6, k) view; row i is FIELDS[i]
+        """
+        self._stats['reads'] += 1
+        bars = self._open(symbol, interval)
+        timestamps = bars[TS]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='left'))
+        return bars[:, lo:hi]
+
+    def closes(self, symbol: str, interval: str = '1d', start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Contiguous close-price view for the given range"""
+        return self.bars(symbol, interval, start, end)[CLOSE]
+
+    def last_timestamp(self, symbol: str, interval: str = '1d') -> Optional[float]:
+        timestamps = self._open(symbol, interval)[TS]
+        return float(timestamps[-1]) if len(timestamps) else None
+
+    def write(self, symbol: str, new_bars: np.ndarray, interval: str = '1d') -> int:
+        """
+        Append bars newer than the last stored one
+
+        Returns:
+            Number of bars appended
+        """
+        new_bars = np.asarray(new_bars, dtype=np.float64).reshape(len(FIELDS), -1)
+        existing = self._open(symbol, interval)
+        if existing.shape[1]:
+            new_bars = new_bars[:, new_bars[TS] > existing[TS, -1]]
+        if new_bars.shape[1] == 0:
+            return 0
+
+        new_bars = new_bars[:, np.argsort(new_bars[TS], kind='stable')]
+        merged = np.ascontiguousarray(np.hstack([existing, new_bars]))
+
+        path = self._path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, merged)
+
+        # Release our mapping before swapping the file in (required on Windows)
+        with self._lock:
+            self._maps.pop(path, None)
+        del existing
+        os.replace(tmp_path, path)
+
+        self._stats['bars_written'] += new_bars.shape[1]
+        return new_bars.shape[1]
+
+    # ------------------------------------------------------------------
+    # Backfill
+    # ------------------------------------------------------------------
+
+    def backfill(self, symbol: str, asset_type: str = 'stock', interval: str = '1d', force: bool = False) -> int:
+        """
+        Fetch only bars newer than the last stored one
+
+        Checks each symbol at most once per refresh_seconds unless force=True;
+        after a fetch error it retries with exponential backoff (capped at
+        refresh_seconds). Bars that have not closed yet are never stored.
+
+        Returns:
+            Number of bars appended
+        """
+        if interval not in INTERVAL_SECONDS:
+            raise ValueError(f"Unsupported interval: {interval}")
+
+        symbol = symbol.upper()
+        asset_type = 'crypto' if (asset_type or '').lower() in ('crypto', 'cryptocurrency') else 'stock'
+        key = (symbol, interval)
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            now = time.time()
+            if not force and now < self._retry_at.get(key, 0.0):
+                return 0
+
+            step = INTERVAL_SECONDS[interval]
+            last_ts = self.last_timestamp(symbol, interval)
+            start_ts = last_ts + step if last_ts is not None else now - self.lookback_days * 86400
+            if start_ts + step > now:
+                self._retry_at[key] = now + self.refresh_seconds
+                return 0
+
+            try:
+                self._stats['backfills'] += 1
+                bars = BAR_FETCHERS[asset_type](symbol, start_ts, interval)
+            except Exception as e:
+                self._stats['fetch_errors'] += 1
+                failures = self._failures[key] = self._failures.get(key, 0) + 1
+                backoff = min(self.refresh_seconds, ERROR_BACKOFF_SECONDS * 2 ** (failures - 1))
+                self._retry_at[key] = now + backoff
+                logger.error(f"❌ Error backfilling {symbol} ({interval}), retrying in {backoff:.0f}s: {str(e)}")
+                return 0
+
+            # Drop the still-forming bar so it is not frozen into history
+            bars = bars[:, bars[TS] + step <= now]
+            appended = self.write(symbol, bars, interval)
+            self._failures.pop(key, None)
+            self._retry_at[key] = now + self.refresh_seconds
+            if appended:
+                logger.info(f"📈 Stored {appended} new {interval} bars for {symbol}")
+            return appended
+
+    def backfill_many(
+        self,
+        symbols: Sequence[str],
+        asset_types: Union[str, Sequence[str]] = 'stock',
+        interval: str = '1d'
+    ) -> Dict[str, int]:
+        """Backfill several symbols concurrently; returns bars appended per symbol"""
+        symbols = list(symbols)
+        if isinstance(asset_types, str):
+            asset_types = [asset_types] * len(symbols)
+        pairs = list(dict.fromkeys(zip((s.upper() for s in symbols), asset_types)))
+        if not pairs:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(4, len(pairs)), thread_name_prefix="ohlcv-backfill") as pool:
+            counts = pool.map(lambda p: self.backfill(p[0], p[1], interval), pairs)
+            return {symbol: count for (symbol, _), count in zip(pairs, counts)}
+
+    def stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats['open_files'] = len(self._maps)
+        return stats
+
+
+# Global instance
+ohlcv_store = OHLCVStore(
+    root=settings.OHLCV_DATA_DIR,
+    lookback_days=settings.OHLCV_LOOKBACK_DAYS,
+    refresh_seconds=settings.OHLCV_REFRESH_MINUTES * 60
+)
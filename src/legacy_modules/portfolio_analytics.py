@@ -0,0 +1,282 @@
+"""
+Portfolio Analytics - Return-based volatility, covariance and correlation
+Builds aligned daily return matrices from the local OHLCV store and estimates
+per-asset volatility, Ledoit-Wolf shrinkage covariance and EWMA covariance
+"""
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from legacy_modules.ohlcv_store import ohlcv_store, OHLCVStore, TS, CLOSE
+from legacy_modules.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# RiskMetrics decay for daily data
+EWMA_LAMBDA = 0.94
+MIN_OBSERVATIONS = 30
+
+
+def build_return_matrix(
+    symbols: Sequence[str],
+    lookback_days: int = 365,
+    store: OHLCVStore = ohlcv_store,
+    as_of: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Align daily closes on common dates and convert to log returns
+
+    Stocks and crypto trade on different calendars, so closes are inner-joined
+    on dates every symbol has; a weekend in crypto is folded into Monday's return.
+
+    Returns:
+        Dict with symbols (those with history), missing, dates and returns (T, N)
+    """
+    end = as_of if as_of is not None else datetime.now().timestamp()
+    start = end - lookback_days * 86400
+
+    series = {}
+    missing = []
+    for symbol in dict.fromkeys(s.upper() for s in symbols):
+        bars = store.bars(symbol, '1d', start=start)
+        if bars.shape[1] > MIN_OBSERVATIONS:
+            series[symbol] = bars
+        else:
+            missing.append(symbol)
+
+    if not series:
+        return {"symbols": [], "missing": missing, "dates": np.empty(0), "returns": np.empty((0, 0))}
+
+    dates = None
+    for bars in series.values():
+        dates = bars[TS] if dates is None else np.intersect1d(dates, bars[TS], assume_unique=True)
+
+    closes = np.empty((len(dates), len(series)))
+    for j, bars in enumerate(series.values()):
+        idx = np.searchsorted(bars[TS], dates)
+        closes[:, j] = bars[CLOSE][idx]
+
+    valid = np.all(closes > 0, axis=1)
+    dates, closes = dates[valid], closes[valid]
+    returns = np.diff(np.log(closes), axis=0) if len(closes) > 1 else np.empty((0, len(series)))
+
+    return {"symbols": list(series), "missing": missing, "dates": dates[1:], "returns": returns}
+
+
+def periods_per_year(dates: np.ndarray) -> float:
+    """Observed return periods per year (~252 for stocks, ~365 for crypto-only)"""
+    if len(dates) < 2:
+        return 252.0
+    span_years = (dates[-1] - dates[0]) / (365.25 * 86400)
+    return (len(dates) - 1) / span_years if span_years > 0 else 252.0
+
+
+def ledoit_wolf_covariance(returns: np.ndarray) -> Dict[str, Any]:
+    """
+    Ledoit-Wolf (2004) shrinkage of the sample covariance towards a scaled identity
+
+    Returns:
+        Dict with covariance (N, N) and shrinkage intensity in [0, 1]
+    """
+    t, n = returns.shape
+    x = returns - returns.mean(axis=0)
+    sample = x.T @ x / t
+
+    mu = np.trace(sample) / n
+    target = mu * np.eye(n)
+    d2 = np.sum((sample - target) ** 2) / n
+    if d2 <= 0:
+        return {"covariance": sample, "shrinkage": 0.0}
+
+    # sum_t ||x_t x_t' - S||_F^2 = sum_t |x_t|^4 - T * ||S||_F^2
+    b2_bar = (np.sum(np.sum(x ** 2, axis=1) ** 2) - t * np.sum(sample ** 2)) / (t ** 2 * n)
+    shrinkage = float(min(max(b2_bar, 0.0), d2) / d2)
+
+    return {"covariance": shrinkage * target + (1 - shrinkage) * sample, "shrinkage": shrinkage}
+
+
+def ewma_covariance(returns: np.ndarray, decay: float = EWMA_LAMBDA) -> np.ndarray:
+    """Exponentially weighted covariance (zero-mean, RiskMetrics style)"""
+    t = returns.shape[0]
+    weights = (1 - decay) * decay ** np.arange(t - 1, -1, -1)
+    weights /= weights.sum()
+    return (returns * weights[:, None]).T @ returns
+
+
+def covariance_to_correlation(covariance: np.ndarray) -> np.ndarray:
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / np.outer(std, std)
+    correlation = np.nan_to_num(correlation)
+    np.fill_diagonal(correlation, 1.0)
+    return correlation
+
+
+class CovarianceModel:
+    """Risk model estimated once per symbol set and day (annualized figures)"""
+
+    def __init__(self, symbols: List[str], missing: List[str], returns: np.ndarray, dates: np.ndarray):
+        self.symbols = symbols
+        self.missing = missing
+        self.observations = returns.shape[0]
+        self.periods_per_year = periods_per_year(dates)
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+
+        shrunk = ledoit_wolf_covariance(returns)
+        self.shrinkage = shrunk['shrinkage']
+        self.covariance = shrunk['covariance'] * self.periods_per_year
+        self.ewma_covariance = ewma_covariance(returns) * self.periods_per_year
+        self.volatility = np.sqrt(np.diag(self.covariance))
+        self.ewma_volatility = np.sqrt(np.diag(self.ewma_covariance))
+        self.correlation = covariance_to_correlation(self.covariance)
+        self.ewma_correlation = covariance_to_correlation(self.ewma_covariance)
+
+    def portfolio_volatility(self, weights: np.ndarray, ewma: bool = False) -> float:
+        covariance = self.ewma_covariance if ewma else self.covariance
+        return float(np.sqrt(max(weights @ covariance @ weights, 0.0)))
+
+    def average_correlation(self) -> float:
+        n = len(self.symbols)
+        if n < 2:
+            return 1.0
+        return float((self.correlation.sum() - n) / (n * (n - 1)))
+
+
+class CovarianceCache:
+    """
+    LRU of CovarianceModel keyed by (sorted symbol set, lookback, date)
+
+    Users holding the same symbols share one estimate for the day; concurrent
+    requests for a key not yet cached are collapsed into a single build.
+    """
+
+    def __init__(self, store: OHLCVStore = ohlcv_store, lookback_days: int = 365, max_entries: int = 256):
+        self.store = store
+        self.lookback_days = lookback_days
+        self.max_entries = max_entries
+        self._models: "OrderedDict[tuple, CovarianceModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("covariance_flight")
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def _build(self, symbols: tuple) -> Optional[CovarianceModel]:
+        matrix = build_return_matrix(symbols, self.lookback_days, self.store)
+        if not matrix['symbols'] or matrix['returns'].shape[0] < MIN_OBSERVATIONS:
+            return None
+        return CovarianceModel(matrix['symbols'], matrix['missing'], matrix['returns'], matrix['dates'])
+
+    def get(self, symbols: Sequence[str]) -> Optional[CovarianceModel]:
+        """Model for the symbol set, or None when there is not enough history"""
+        key = (tuple(sorted({s.upper() for s in symbols})), self.lookback_days, datetime.utcnow().date().isoformat())
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self._stats['hits'] += 1
+                return self._models[key]
+            self._stats['misses'] += 1
+
+        model = self._flight.do(key, lambda: self._build(key[0]))
+        if model is None:
+            # Not cached: history may still be backfilling
+            return None
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+        return model
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['size'] = len(self._models)
+        stats['single_flight'] = self._flight.stats()
+        return stats
+
+
+def analyze_portfolio_volatility(holdings: List[Dict], cache: "CovarianceCache" = None) -> Optional[Dict]:
+    """
+    Return-based volatility analysis for report holdings
+
+    Args:
+        holdings: Report holdings with 'symbol' and 'current_value'
+        cache: CovarianceCache to use (defaults to the shared instance)
+
+    Returns:
+        Volatility analysis dict, or None if history covers under half the portfolio
+    """
+    cache = cache or covariance_cache
+    model = cache.get([h['symbol'] for h in holdings])
+    if model is None:
+        return None
+
+    values = np.zeros(len(model.symbols))
+    for h in holdings:
+        i = model.index.get(h['symbol'].upper())
+        if i is not None:
+            values[i] += h['current_value']
+
+    total_value = sum(h['current_value'] for h in holdings)
+    covered = values.sum()
+    if total_value <= 0 or covered / total_value < 0.5:
+        return None
+
+    weights = values / covered
+    portfolio_vol = model.portfolio_volatility(weights) * 100
+    ewma_vol = model.portfolio_volatility(weights, ewma=True) * 100
+    weighted_asset_vol = float(weights @ model.volatility) * 100
+    avg_correlation = model.average_correlation()
+
+    alerts = []
+    # Annualized portfolio volatility thresholds
+    if portfolio_vol > 40:
+        score = 75
+        alerts.append(f"📈 High volatility detected: Portfolio annualized volatility is {portfolio_vol:.1f}%")
+    elif portfolio_vol > 20:
+        score = 45
+        alerts.append(f"📊 Moderate volatility: Portfolio annualized volatility is {portfolio_vol:.1f}%")
+    else:
+        score = 20
+
+    if ewma_vol > portfolio_vol * 1.5 and ewma_vol > 20:
+        alerts.append(f"⚡ Volatility is rising: recent (EWMA) volatility is {ewma_vol:.1f}%")
+    if len(model.symbols) > 1 and avg_correlation > 0.7:
+        alerts.append(f"🔗 Holdings move together (average correlation {avg_correlation:.2f}) - limited diversification")
+
+    return {
+        "score": score,
+        "alerts": alerts,
+        "method": "historical",
+        "std_deviation": round(portfolio_vol, 2),
+        "variance_level": "High" if portfolio_vol > 40 else "Medium" if portfolio_vol > 20 else "Low",
+        "ewma_volatility": round(ewma_vol, 2),
+        "diversification_ratio": round(weighted_asset_vol / portfolio_vol, 2) if portfolio_vol > 0 else 1.0,
+        "average_correlation": round(avg_correlation, 3),
+        "per_asset_volatility": [
+            {
+                "symbol": symbol,
+                "volatility": round(float(model.volatility[i]) * 100, 2),
+                "ewma_volatility": round(float(model.ewma_volatility[i]) * 100, 2)
+            }
+            for symbol, i in model.index.items()
+        ],
+        "correlation": {
+            "symbols": model.symbols,
+            "matrix": np.round(model.correlation, 3).tolist()
+        },
+        "shrinkage": round(model.shrinkage, 3),
+        "observations": model.observations,
+        "missing_history": model.missing
+    }
+
+
+# Global instance
+covariance_cache = CovarianceCache()
@@ -0,0 +1,403 @@
+"""
+Portfolio Optimizer - Deterministic rebalancing on the return covariance
+Minimum variance, risk parity and target volatility solved by projected
+gradient over long-only weights with a single-holding cap and sector caps,
+returned as concrete trade lists
+"""
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from legacy_modules.portfolio_analytics import covariance_cache, CovarianceCache
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+OPTIMIZATION_MODES = ("min_variance", "risk_parity", "target_volatility")
+
+TOLERANCE = 1e-10
+# Floor used by risk parity so the log barrier stays finite
+RISK_PARITY_FLOOR = 1e-6
+
+
+def _solve_threshold(values: np.ndarray, lower: np.ndarray, upper: np.ndarray, floors: np.ndarray, target: float) -> float:
+    """
+    Find t with sum(clip(values - max(t, floors), lower, upper)) == target
+
+    The sum is piecewise linear and non-increasing in t, so it is evaluated at
+    every breakpoint at once and interpolated exactly.
+    """
+    candidates = np.unique(np.concatenate([values - lower, values - upper, floors[np.isfinite(floors)]]))
+    effective = np.maximum(candidates[:, None], floors[None, :])
+    totals = np.clip(values - effective, lower, upper).sum(axis=1)
+
+    k = int(np.searchsorted(-totals, -target, side='left'))
+    if k == 0:
+        return float(candidates[0])
+    if k == len(candidates):
+        return float(candidates[-1])
+    span = totals[k - 1] - totals[k]
+    return float(candidates[k - 1] + (totals[k - 1] - target) / span * (candidates[k] - candidates[k - 1]))
+
+
+class WeightConstraints:
+    """
+    Long-only, fully invested weights with per-asset and per-sector caps
+
+    project() is the exact Euclidean projection onto the feasible set: each
+    capped sector gets its own threshold, found once per call.
+    """
+
+    def __init__(self, upper: np.ndarray, groups: np.ndarray, group_caps: np.ndarray, lower: float = 0.0):
+        self.upper = upper
+        self.lower = np.full(len(upper), lower)
+        self.groups = groups
+        self.group_caps = group_caps
+
+    def is_feasible(self) -> bool:
+        if self.lower.sum() > 1 + 1e-12:
+            return False
+        group_upper = np.bincount(self.groups, weights=self.upper, minlength=len(self.group_caps))
+        return float(np.minimum(group_upper, self.group_caps).sum()) >= 1 - 1e-12
+
+    def project(self, v: np.ndarray) -> np.ndarray:
+        floors = np.full(len(v), -np.inf)
+        for g, cap in enumerate(self.group_caps):
+            members = self.groups == g
+            if not np.isfinite(cap) or self.upper[members].sum() <= cap:
+                continue
+            # Sector threshold that makes the sector sum exactly its cap
+            t = _solve_threshold(v[members], self.lower[members], self.upper[members], floors[members], cap)
+            floors[members] = t
+
+        t = _solve_threshold(v, self.lower, self.upper, floors, 1.0)
+        return np.clip(v - np.maximum(t, floors), self.lower, self.upper)
+
+
+def _projected_gradient(
+    objective: Callable[[np.ndarray], float],
+    gradient: Callable[[np.ndarray], np.ndarray],
+    w0: np.ndarray,
+    constraints: WeightConstraints,
+    lipschitz: Optional[float] = None,
+    max_iterations: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Minimize a smooth convex objective over the constraint set
+
+    With a Lipschitz constant (quadratic objectives) this is FISTA with a fixed
+    1/L step and adaptive restart; without one it is plain projected gradient
+    with backtracking, which keeps every iterate feasible (needed for barriers).
+    """
+    max_iterations = max_iterations or settings.OPTIMIZER_MAX_ITERATIONS
+    x = constraints.project(w0)
+
+    if lipschitz is not None:
+        step = 1.0 / lipschitz
+        y, x_prev, momentum = x.copy(), x.copy(), 1.0
+        for iteration in range(1, max_iterations + 1):
+            x = constraints.project(y - step * gradient(y))
+            if np.abs(x - x_prev).max() < TOLERANCE:
+                return {"weights": x, "iterations": iteration, "converged": True}
+            next_momentum = (1 + np.sqrt(1 + 4 * momentum ** 2)) / 2
+            if (y - x) @ (x - x_prev) > 0:
+                # Restart when momentum points uphill
+                next_momentum = 1.0
+            y = x + ((momentum - 1) / next_momentum) * (x - x_prev)
+            x_prev, momentum = x, next_momentum
+        return {"weights": x, "iterations": max_iterations, "converged": False}
+
+    step = 1.0
+    value = objective(x)
+    for iteration in range(1, max_iterations + 1):
+        grad = gradient(x)
+        while True:
+            candidate = constraints.project(x - step * grad)
+            delta = candidate - x
+            candidate_value = objective(candidate)
+            if candidate_value <= value + grad @ delta + (delta @ delta) / (2 * step) or step < 1e-12:
+                break
+            step /= 2
+        x, value = candidate, candidate_value
+        if np.abs(delta).max() < TOLERANCE:
+            return {"weights": x, "iterations": iteration, "converged": True}
+        step *= 2
+    return {"weights": x, "iterations": max_iterations, "converged": False}
+
+
+def risk_contributions(weights: np.ndarray, covariance: np.ndarray) -> np.ndarray:
+    """Share of portfolio variance contributed by each asset (sums to 1)"""
+    variance = float(weights @ covariance @ weights)
+    if variance <= 0:
+        return np.zeros(len(weights))
+    return weights * (covariance @ weights) / variance
+
+
+def _equal_risk_variance(covariance: np.ndarray) -> float:
+    """Variance of the unconstrained equal-risk-contribution portfolio (Newton on the Spinu objective)"""
+    n = len(covariance)
+    y = 1.0 / np.sqrt(np.diag(covariance))
+    for _ in range(50):
+        grad = covariance @ y - 1.0 / (n * y)
+        hessian = covariance + np.diag(1.0 / (n * y ** 2))
+        step = np.linalg.solve(hessian, grad)
+        # Damp the step so y stays positive
+        scale = 1.0
+        while np.any(y - scale * step <= 0):
+            scale /= 2
+        y = y - scale * step
+        if np.abs(grad).max() < 1e-12:
+            break
+    w = y / y.sum()
+    return float(w @ covariance @ w)
+
+
+def optimize_weights(
+    covariance: np.ndarray,
+    mode: str,
+    current_weights: np.ndarray,
+    constraints: WeightConstraints,
+    target_volatility: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Optimal weights for one mode
+
+    Args:
+        covariance: Annualized covariance (N, N)
+        mode: "min_variance", "risk_parity" or "target_volatility"
+        current_weights: Current value weights (start point; anchor for target_volatility)
+        constraints: Feasible set
+        target_volatility: Annualized volatility as a fraction (target_volatility mode)
+
+    Returns:
+        Dict with weights, iterations and converged (plus target_reached for target_volatility)
+    """
+    lipschitz = 2 * float(np.linalg.eigvalsh(covariance)[-1]) + 1e-12
+
+    def variance(w):
+        return float(w @ covariance @ w)
+
+    def variance_grad(w):
+        return 2 * covariance @ w
+
+    if mode == "min_variance":
+        return _projected_gradient(variance, variance_grad, current_weights, constraints, lipschitz)
+
+    if mode == "risk_parity":
+        # Over the capped simplex, min 1/2 w'Cw - k/n sum(log w) with k = ERC variance
+        # is exactly equal risk contribution when no cap binds, and the closest convex compromise otherwise
+        n = len(current_weights)
+        kappa = _equal_risk_variance(covariance)
+        rp_constraints = WeightConstraints(constraints.upper, constraints.groups, constraints.group_caps, RISK_PARITY_FLOOR)
+        return _projected_gradient(
+            lambda w: 0.5 * variance(w) - kappa / n * float(np.log(w).sum()),
+            lambda w: covariance @ w - kappa / (n * w),
+            np.full(n, 1.0 / n),
+            rp_constraints
+        )
+
+    if mode == "target_volatility":
+        # Smallest move from current weights whose volatility is at most the target:
+        # min |w - w0|^2 + lam * w'Cw, with lam found by bisection
+        target_variance = target_volatility ** 2
+
+        def solve(lam, start):
+            return _projected_gradient(
+                lambda w: float((w - current_weights) @ (w - current_weights)) + lam * variance(w),
+                lambda w: 2 * (w - current_weights) + lam * variance_grad(w),
+                start,
+                constraints,
+                2.0 + lam * lipschitz
+            )
+
+        result = solve(0.0, current_weights)
+        iterations = result['iterations']
+        if variance(result['weights']) <= target_variance:
+            return {**result, "target_reached": True}
+
+        floor = _projected_gradient(variance, variance_grad, current_weights, constraints, lipschitz)
+        iterations += floor['iterations']
+        if variance(floor['weights']) > target_variance:
+            return {**floor, "iterations": iterations, "target_reached": False}
+
+        lo, hi = 0.0, 1.0
+        best = floor
+        while True:
+            result = solve(hi, best['weights'])
+            iterations += result['iterations']
+            if variance(result['weights']) <= target_variance or hi > 1e8:
+                best = result
+                break
+            lo, hi = hi, hi * 10
+
+        for _ in range(40):
+            mid = (lo + hi) / 2
+            result = solve(mid, best['weights'])
+            iterations += result['iterations']
+            if variance(result['weights']) <= target_variance:
+                hi, best = mid, result
+            else:
+                lo = mid
+            if hi - lo < 1e-3 * hi:
+                break
+        return {**best, "iterations": iterations, "target_reached": True}
+
+    raise ValueError(f"Unknown optimization mode: {mode}")
+
+
+def build_trade_list(
+    symbols: Sequence[str],
+    prices: np.ndarray,
+    current_values: np.ndarray,
+    target_values: np.ndarray,
+    min_trade_value: float = 1.0
+) -> List[Dict[str, Any]]:
+    """Buy/sell orders that move current values to target values, largest first"""
+    trades = []
+    for i in np.argsort(-np.abs(target_values - current_values)):
+        delta = float(target_values[i] - current_values[i])
+        if abs(delta) < min_trade_value or prices[i] <= 0:
+            continue
+        trades.append({
+            "symbol": symbols[i],
+            "action": "buy" if delta > 0 else "sell",
+            "quantity": round(abs(delta) / float(prices[i]), 6),
+            "value": round(abs(delta), 2),
+            "price": round(float(prices[i]), 4)
+        })
+    return trades
+
+
+def optimize_portfolio(
+    holdings: List[Dict],
+    mode: str = "min_variance",
+    max_weight: Optional[float] = None,
+    sector_caps: Optional[Dict[str, float]] = None,
+    target_volatility: Optional[float] = None,
+    min_trade_value: float = 1.0,
+    cache: CovarianceCache = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Rebalance report-style holdings with the shared covariance model
+
+    Holdings without price history are left untouched; the optimizer
+    reallocates only the value held in covered symbols.
+
+    Args:
+        holdings: Dicts with 'symbol', 'quantity', 'current_price' and optional 'sector'
+        mode: "min_variance", "risk_parity" or "target_volatility"
+        max_weight: Cap per holding (defaults to settings.OPTIMIZER_MAX_WEIGHT)
+        sector_caps: Sector -> maximum weight
+        target_volatility: Annualized volatility in percent (target_volatility mode)
+        min_trade_value: Smallest trade to report
+        cache: CovarianceCache to use (defaults to the shared instance)
+
+    Returns:
+        Dict with weights, risk before/after and the trade list, or None without history
+
+    Raises:
+        ValueError: Unknown mode or infeasible constraints
+    """
+    if mode not in OPTIMIZATION_MODES:
+        raise ValueError(f"Unknown optimization mode: {mode}")
+    if mode == "target_volatility" and not target_volatility:
+        raise ValueError("target_volatility is required for target_volatility mode")
+
+    started = time.perf_counter()
+    cache = cache or covariance_cache
+    model = cache.get([h['symbol'] for h in holdings])
+    if model is None:
+        return None
+
+    symbols = model.symbols
+    n = len(symbols)
+    current_values = np.zeros(n)
+    prices = np.zeros(n)
+    sector_of = {}
+    for h in holdings:
+        i = model.index.get(h['symbol'].upper())
+        if i is None:
+            continue
+        current_values[i] += h['quantity'] * h['current_price']
+        prices[i] = h['current_price']
+        sector_of.setdefault(symbols[i], h.get('sector') or "Unknown")
+
+    covered = float(current_values.sum())
+    if covered <= 0:
+        return None
+    current_weights = current_values / covered
+
+    # A cap below 1/n cannot be fully invested; relax it to equal weight
+    requested_max = max_weight or settings.OPTIMIZER_MAX_WEIGHT
+    effective_max = max(requested_max, 1.0 / n)
+
+    sectors = [sector_of[s] for s in symbols]
+    sector_names = sorted(set(sectors))
+    caps = sector_caps or {}
+    constraints = WeightConstraints(
+        upper=np.full(n, effective_max),
+        groups=np.array([sector_names.index(s) for s in sectors]),
+        group_caps=np.array([caps.get(s, np.inf) for s in sector_names], dtype=float)
+    )
+    if not constraints.is_feasible():
+        raise ValueError("Sector caps are too tight to stay fully invested")
+
+    result = optimize_weights(
+        model.covariance,
+        mode,
+        current_weights,
+        constraints,
+        target_volatility=target_volatility / 100 if target_volatility else None
+    )
+    weights = result['weights']
+    target_values = weights * covered
+
+    def risk_summary(w: np.ndarray) -> Dict[str, Any]:
+        contributions = risk_contributions(w, model.covariance)
+        return {
+            "volatility_pct": round(model.portfolio_volatility(w) * 100, 2),
+            "max_weight_pct": round(float(w.max()) * 100, 2),
+            "risk_contributions": {s: round(float(c) * 100, 2) for s, c in zip(symbols, contributions)},
+            "sector_weights": {
+                sector: round(float(w[[x == sector for x in sectors]].sum()) * 100, 2) for sector in sector_names
+            }
+        }
+
+    optimization = {
+        "mode": mode,
+        "weights": [
+            {
+                "symbol": symbol,
+                "sector": sectors[i],
+                "current_weight": round(float(current_weights[i]) * 100, 2),
+                "target_weight": round(float(weights[i]) * 100, 2)
+            }
+            for i, symbol in enumerate(symbols)
+        ],
+        "current": risk_summary(current_weights),
+        "optimized": risk_summary(weights),
+        "trades": build_trade_list(symbols, prices, current_values, target_values, min_trade_value),
+        "turnover_pct": round(float(np.abs(weights - current_weights).sum()) / 2 * 100, 2),
+        "covered_value": round(covered, 2),
+        "constraints": {
+            "max_weight": round(effective_max, 4),
+            "max_weight_relaxed": effective_max > requested_max,
+            "sector_caps": {s: c for s, c in caps.items() if s in sector_names}
+        },
+        "iterations": result['iterations'],
+        "converged": result['converged'],
+        "observations": model.observations,
+        "missing_history": model.missing,
+        "solve_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+    if mode == "target_volatility":
+        optimization["target_volatility_pct"] = target_volatility
+        optimization["target_reached"] = result['target_reached']
+    return optimization
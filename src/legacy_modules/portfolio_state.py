@@ -0,0 +1,230 @@
+"""
+Portfolio State - Incrementally maintained portfolio metrics
+Keeps running totals (value, sum of squared values, per-sector maps) and a
+lazy-deletion max-heap of holdings, so add/remove/resize are O(log n) and
+simulator metrics never need a full recomputation
+"""
+import heapq
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Sector groups used for opportunity / threat exposure
+GROWTH_SECTORS = {"Technology", "Healthcare", "Renewable Energy", "E-commerce"}
+RISKY_SECTORS = {"Cryptocurrency", "Penny Stocks", "Emerging Markets", "High Volatility"}
+
+
+class PortfolioState:
+    """
+    Running sums behind the simulator's portfolio metrics
+
+    Positions are keyed by any hashable (e.g. (symbol, occurrence)); each has
+    a quantity, a unit price and an optional sector. metrics() defines the
+    simulator's metrics; calculate_portfolio_metrics_batch in all_in_one_server
+    computes the same values for many portfolios at once.
+    """
+
+    def __init__(self):
+        self._positions: Dict[Hashable, Tuple[float, float, Optional[str]]] = {}
+        self._versions: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._counter = 0
+        # Positions with a non-zero value / quantity; lets sums snap back to exactly 0
+        self._valued = 0
+        self._sized = 0
+
+        self.total_value = 0.0
+        self.sum_sq_values = 0.0
+        self.total_quantity = 0.0
+        self.sector_value: Dict[str, float] = {}
+        self.sector_count: Dict[str, int] = {}
+        self.sector_quantity: Dict[str, float] = {}
+        self.known_sector_count: Dict[str, int] = {}
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[Tuple[Hashable, float, float, Optional[str]]]) -> "PortfolioState":
+        """Build from (key, quantity, price, sector) tuples"""
+        state = cls()
+        for key, quantity, price, sector in positions:
+            state.add(key, quantity, price, sector)
+        return state
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def position(self, key: Hashable) -> Optional[Tuple[float, float, Optional[str]]]:
+        """(quantity, price, sector) for a key, or None"""
+        return self._positions.get(key)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _apply(self, quantity: float, price: float, sector: Optional[str], sign: int):
+        value = quantity * price
+        bucket = sector or "Unknown"
+        self.total_value += sign * value
+        self.sum_sq_values += sign * value * value
+        self.total_quantity += sign * quantity
+        self.sector_value[bucket] = self.sector_value.get(bucket, 0.0) + sign * value
+        self.sector_quantity[bucket] = self.sector_quantity.get(bucket, 0.0) + sign * quantity
+        self.sector_count[bucket] = self.sector_count.get(bucket, 0) + sign
+        self._valued += sign * (value != 0)
+        self._sized += sign * (quantity != 0)
+        if self._valued == 0:
+            # Removing positions leaves rounding residue; the zero-value branches need exact zeros
+            self.total_value = self.sum_sq_values = 0.0
+        if self._sized == 0:
+            self.total_quantity = 0.0
+        if self.sector_count[bucket] == 0:
+            del self.sector_count[bucket], self.sector_value[bucket], self.sector_quantity[bucket]
+        if sector:
+            self.known_sector_count[sector] = self.known_sector_count.get(sector, 0) + sign
+            if self.known_sector_count[sector] == 0:
+                del self.known_sector_count[sector]
+
+    def add(self, key: Hashable, quantity: float, price: float, sector: Optional[str] = None):
+        """Add a new position (O(log n))"""
+        if key in self._positions:
+            raise KeyError(f"Position {key!r} already exists")
+        self._positions[key] = (quantity, price, sector)
+        self._apply(quantity, price, sector, +1)
+
+        self._counter += 1
+        self._versions[key] = self._counter
+        heapq.heappush(self._heap, (-(quantity * price), self._counter, key))
+        if len(self._heap) > 2 * len(self._positions) + 64:
+            self._compact()
+
+    def _compact(self):
+        """Drop stale heap entries once they outnumber live ones (amortized O(1) per update)"""
+        self._heap = [entry for entry in self._heap if self._versions.get(entry[2]) == entry[1]]
+        heapq.heapify(self._heap)
+
+    def remove(self, key: Hashable):
+        """Remove a position (O(1); its heap entry is discarded lazily)"""
+        quantity, price, sector = self._positions.pop(key)
+        self._versions.pop(key, None)
+        self._apply(quantity, price, sector, -1)
+        if not self._positions:
+            self._heap.clear()
+
+    def resize(self, key: Hashable, quantity: float, price: Optional[float] = None, sector: Optional[str] = ...):
+        """Change a position's quantity (and optionally price or sector) in O(log n)"""
+        _, old_price, old_sector = self._positions[key]
+        self.remove(key)
+        self.add(
+            key,
+            quantity,
+            old_price if price is None else price,
+            old_sector if sector is ... else sector
+        )
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def top_holding(self) -> Optional[Tuple[Hashable, float]]:
+        """Largest position by value (amortized O(log n))"""
+        while self._heap:
+            neg_value, version, key = self._heap[0]
+            if self._versions.get(key) == version:
+                return key, -neg_value
+            heapq.heappop(self._heap)
+        return None
+
+    def herfindahl(self) -> float:
+        """Sum of squared value weights"""
+        if self.total_value == 0:
+            return 0.0
+        return self.sum_sq_values / (self.total_value ** 2)
+
+    def risk_score(self) -> float:
+        """0-100, higher = riskier: top-holding concentration, few holdings, one dominant sector"""
+        n = len(self._positions)
+        if n == 0 or self.total_value == 0:
+            return 0.0
+
+        max_holding_pct = self.top_holding()[1] / self.total_value * 100
+        concentration_score = min(100, max_holding_pct * 1.5)
+
+        if n == 1:
+            diversification_penalty = 40
+        elif n == 2:
+            diversification_penalty = 25
+        elif n <= 5:
+            diversification_penalty = 10
+        else:
+            diversification_penalty = 0
+
+        sector_risk = 0
+        if self.known_sector_count:
+            sector_concentration_pct = (max(self.sector_count.values()) / n) * 100
+            sector_risk = min(30, sector_concentration_pct * 0.5)
+
+        risk_score = (concentration_score * 0.5) + (diversification_penalty * 0.3) + (sector_risk * 0.2)
+        return min(100, max(0, risk_score))
+
+    def diversification_score(self) -> float:
+        """0-100, higher = better: holding count, less value concentration (Herfindahl), more sectors"""
+        n = len(self._positions)
+        if n == 0:
+            return 0.0
+
+        if n >= 10:
+            base_score = 100
+        elif n >= 7:
+            base_score = 85
+        elif n >= 5:
+            base_score = 70
+        elif n >= 3:
+            base_score = 50
+        elif n == 2:
+            base_score = 30
+        else:
+            base_score = 10
+
+        if self.total_value == 0:
+            return base_score
+
+        concentration_penalty = self.herfindahl() * 40
+
+        unique_sectors = len(self.known_sector_count)
+        if unique_sectors >= 5:
+            sector_bonus = 15
+        elif unique_sectors >= 3:
+            sector_bonus = 10
+        elif unique_sectors >= 2:
+            sector_bonus = 5
+        else:
+            sector_bonus = 0
+
+        return min(100, max(0, base_score - concentration_penalty + sector_bonus))
+
+    def _sector_quantity_share(self, sectors: set, default: float) -> float:
+        """Quantity share (0-100) held in the given sectors (opportunity / threat exposure)"""
+        if not self._positions:
+            return 0.0
+        if self.total_quantity == 0:
+            return default
+        quantity = sum(q for sector, q in self.sector_quantity.items() if sector in sectors)
+        return min(100, max(0, quantity / self.total_quantity * 100))
+
+    def metrics(self) -> Dict[str, Any]:
+        """All simulator metrics (PortfolioMetrics fields) from the running sums"""
+        total = self.total_value
+        top = self.top_holding()
+        return {
+            "total_value": total,
+            "risk_score": self.risk_score(),
+            "diversification_score": self.diversification_score(),
+            "sentiment_score": 50.0,
+            "opportunity_exposure": self._sector_quantity_share(GROWTH_SECTORS, 50.0),
+            "threat_exposure": self._sector_quantity_share(RISKY_SECTORS, 20.0),
+            "sector_distribution": {
+                sector: (value / total * 100) if total > 0 else 0
+                for sector, value in self.sector_value.items()
+            },
+            "top_holding_pct": (top[1] / total * 100) if total > 0 and top else 0
+        }
@@ -0,0 +1,388 @@
+"""
+Async Price Providers - Non-blocking quote fetching for the FastAPI handlers
+Pluggable Yahoo Finance / CoinGecko providers over one pooled httpx client,
+plus a thread-pool adapter for libraries that stay synchronous
+"""
+import asyncio
+import logging
+import sys
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import httpx
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.config import settings
+from legacy_modules.quote_cache import quote_cache
+from legacy_modules.price_service import (
+    CRYPTO_MAPPING,
+    COINGECKO_BATCH_SIZE,
+    PriceSnapshot,
+    crypto_index,
+    price_flight,
+    _chunks,
+    _fetch_crypto_prices,
+    _fetch_stock_prices,
+    _resolve_coin_id,
+    _with_cached_details
+)
+
+logger = logging.getLogger(__name__)
+
+# Shared pooled HTTP client (created lazily inside the running event loop)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the pooled AsyncClient shared by every provider"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.PRICE_PROVIDER_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.PRICE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PRICE_HTTP_MAX_CONNECTIONS
+            ),
+            headers={'User-Agent': 'Mozilla/5.0 (FinBuddy)'}
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (call on application shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class PriceProvider(ABC):
+    """
+    Async quote source for one asset type
+
+    Subclasses implement _fetch; fetch_quotes adds the overall timeout and
+    request/error/latency counters.
+    """
+
+    name = "provider"
+
+    def __init__(self, max_concurrency: int, timeout: float):
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._stats = {'requests': 0, 'symbols': 0, 'errors': 0, 'timeouts': 0, 'total_latency_ms': 0.0}
+
+    @abstractmethod
+    async def _fetch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch quotes for upper-cased symbols, returning {symbol: quote}"""
+
+    async def fetch_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch quotes without blocking the event loop
+
+        Args:
+            symbols: Upper-cased symbols for this provider's asset type
+
+        Returns:
+            Dict of symbol -> price info for every symbol that resolved
+        """
+        if not symbols:
+            return {}
+
+        started = time.perf_counter()
+        self._stats['requests'] += 1
+        self._stats['symbols'] += len(symbols)
+        try:
+            # Overall budget covers queueing on the semaphore plus every chunk
+            return await asyncio.wait_for(self._fetch(symbols), timeout=self.timeout * 3)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            logger.warning(f"⏱️ {self.name} timed out for {len(symbols)} symbols")
+            return {}
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"❌ {self.name} error: {str(e)}")
+            return {}
+        finally:
+            self._stats['total_latency_ms'] += (time.perf_counter() - started) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['avg_latency_ms'] = round(stats['total_latency_ms'] / stats['requests'], 1) if stats['requests'] else 0.0
+        stats['total_latency_ms'] = round(stats['total_latency_ms'], 1)
+        stats['max_concurrency'] = self.max_concurrency
+        return stats
+
+
+class YahooPriceProvider(PriceProvider):
+    """Yahoo Finance chart endpoint, one pooled request per symbol fanned out concurrently"""
+
+    name = "Yahoo Finance"
+    CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+
+    async def _fetch_one(self, symbol: str) -> Optional[Dict[str, Any]]:
+        async with self._semaphore:
+            try:
+                response = await get_http_client().get(
+                    self.CHART_URL.format(symbol=symbol),
+                    params={'range': '1d', 'interval': '1d'},
+                    timeout=self.timeout
+                )
+            except httpx.HTTPError as e:
+                self._stats['errors'] += 1
+                logger.error(f"❌ Yahoo request failed for {symbol}: {str(e)}")
+                return None
+
+        if response.status_code != 200:
+            self._stats['errors'] += 1
+            logger.error(f"❌ Yahoo returned {response.status_code} for {symbol}")
+            return None
+
+        try:
+            results = (response.json().get('chart') or {}).get('result') or []
+        except ValueError:
+            self._stats['errors'] += 1
+            logger.error(f"❌ Yahoo returned a malformed body for {symbol}")
+            return None
+        if not results:
+            return None
+
+        meta = results[0].get('meta', {})
+        current_price = meta.get('regularMarketPrice')
+        if current_price is None:
+            return None
+
+        previous_close = meta.get('previousClose') or meta.get('chartPreviousClose') or current_price
+        change_24h = ((current_price - previous_close) / previous_close * 100) if previous_close > 0 else 0
+
+        # The chart payload has no market cap, so keep any a cached quote already has
+        return _with_cached_details({
+            'symbol': symbol,
+            'name': meta.get('longName') or meta.get('shortName') or symbol,
+            'price': current_price,
+            'change_24h': change_24h,
+            'market_cap': 0,
+            'source': 'Yahoo Finance',
+            'asset_type': 'stock'
+        })
+
+    async def _fetch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        quotes = await asyncio.gather(*(self._fetch_one(symbol) for symbol in symbols))
+        return {symbol: quote for symbol, quote in zip(symbols, quotes) if quote}
+
+
+class CoinGeckoPriceProvider(PriceProvider):
+    """CoinGecko simple/price endpoint, one request per chunk of coin IDs"""
+
+    name = "CoinGecko"
+    PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+
+    async def _resolve_ids(self, symbols: List[str]) -> Dict[str, List[str]]:
+        symbol_by_id = {}
+        for symbol in symbols:
+            coin_id = CRYPTO_MAPPING.get(symbol)
+            if not coin_id:
+                # Unmapped symbols need a (blocking) lookup - keep it off the loop
+                coin_id = await asyncio.to_thread(_resolve_coin_id, symbol)
+            if coin_id:
+                symbol_by_id.setdefault(coin_id, []).append(symbol)
+        return symbol_by_id
+
+    async def _fetch_chunk(self, coin_ids: List[str]) -> Dict[str, Any]:
+        headers = {'x-cg-demo-api-key': settings.COINGECKO_API_KEY} if settings.COINGECKO_API_KEY else None
+        async with self._semaphore:
+            try:
+                response = await get_http_client().get(
+                    self.PRICE_URL,
+                    params={
+                        'ids': ','.join(coin_ids),
+                        'vs_currencies': 'usd',
+                        'include_24hr_change': 'true',
+                        'include_market_cap': 'true'
+                    },
+                    headers=headers,
+                    timeout=self.timeout
+                )
+            except httpx.HTTPError as e:
+                # Only this chunk's coins go unpriced; the other chunks still count
+                self._stats['errors'] += 1
+                logger.error(f"❌ CoinGecko request failed for {len(coin_ids)} coins: {str(e)}")
+                return {}
+        if response.status_code != 200:
+            self._stats['errors'] += 1
+            logger.error(f"❌ CoinGecko returned {response.status_code}")
+            return {}
+        try:
+            return response.json()
+        except ValueError:
+            self._stats['errors'] += 1
+            logger.error("❌ CoinGecko returned a malformed body")
+            return {}
+
+    async def _fetch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        symbol_by_id = await self._resolve_ids(symbols)
+        chunks = list(_chunks(list(symbol_by_id), COINGECKO_BATCH_SIZE))
+        payloads = await asyncio.gather(*(self._fetch_chunk(chunk) for chunk in chunks))
+
+        results = {}
+        for price_data in payloads:
+            for coin_id, data in price_data.items():
+                for symbol in symbol_by_id.get(coin_id, []):
+                    results[symbol] = {
+                        'symbol': symbol,
+                        'name': coin_id.replace('-', ' ').title(),
+                        'price': data.get('usd', 0),
+                        'change_24h': data.get('usd_24h_change', 0),
+                        'market_cap': data.get('usd_market_cap', 0),
+                        'source': 'CoinGecko',
+                        'asset_type': 'crypto'
+                    }
+        return results
+
+
+class ThreadPoolPriceProvider(PriceProvider):
+    """Adapter running a synchronous batch fetcher (yfinance, pycoingecko) on a dedicated pool"""
+
+    def __init__(self, name: str, batch_fetcher: Callable[[List[str]], Dict[str, Dict[str, Any]]],
+                 max_concurrency: int, timeout: float):
+        super().__init__(max_concurrency, timeout)
+        self.name = name
+        self.batch_fetcher = batch_fetcher
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix=f"prices-{name}")
+
+    async def _fetch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.batch_fetcher, symbols)
+
+
+def _build_provider(kind: str) -> PriceProvider:
+    """Instantiate the configured provider for 'stock' or 'crypto'"""
+    timeout = settings.PRICE_PROVIDER_TIMEOUT
+    if kind == 'crypto':
+        if settings.PRICE_PROVIDER_CRYPTO.lower() == 'pycoingecko':
+            return ThreadPoolPriceProvider('pycoingecko', _fetch_crypto_prices, settings.COINGECKO_MAX_CONCURRENCY, timeout)
+        return CoinGeckoPriceProvider(settings.COINGECKO_MAX_CONCURRENCY, timeout)
+    if settings.PRICE_PROVIDER_STOCK.lower() == 'yfinance':
+        return ThreadPoolPriceProvider('yfinance', _fetch_stock_prices, settings.YAHOO_MAX_CONCURRENCY, timeout)
+    return YahooPriceProvider(settings.YAHOO_MAX_CONCURRENCY, timeout)
+
+
+# Active providers by asset kind (swap with register_provider)
+_providers: Dict[str, PriceProvider] = {}
+_background_tasks = set()
+
+
+def get_provider(kind: str) -> PriceProvider:
+    if kind not in _providers:
+        _providers[kind] = _build_provider(kind)
+    return _providers[kind]
+
+
+def register_provider(kind: str, provider: PriceProvider):
+    """Plug in a different provider for 'stock' or 'crypto'"""
+    _providers[kind] = provider
+
+
+def provider_stats() -> Dict[str, Any]:
+    return {kind: dict(provider.stats(), provider=provider.name) for kind, provider in _providers.items()}
+
+
+async def _cached_quotes(symbols: List[str], kind: str) -> Dict[str, Dict[str, Any]]:
+    """Serve from the quote cache; fetch misses inline and refresh stale keys in the background"""
+    if not symbols:
+        return {}
+
+    results, stale, misses = quote_cache.partition(symbols, kind)
+    provider = get_provider(kind)
+
+    claimed = quote_cache.claim_refresh(stale, kind)
+    if claimed:
+        task = asyncio.create_task(_refresh(provider, claimed, kind))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    if misses:
+        fetched = await _coalesced_fetch(provider, misses, kind)
+        for symbol, quote in fetched.items():
+            quote_cache.put(symbol, kind, quote)
+            results[symbol] = quote
+
+    return results
+
+
+async def _coalesced_fetch(provider: PriceProvider, symbols: List[str], kind: str) -> Dict[str, Dict[str, Any]]:
+    """Fetch through the shared single-flight so identical in-flight lookups are awaited, not repeated"""
+    async def fetch(keys):
+        fetched = await provider.fetch_quotes([symbol for _, symbol in keys])
+        return {(kind, symbol): quote for symbol, quote in fetched.items()}
+
+    results = await price_flight.do_many_async([(kind, symbol) for symbol in symbols], fetch)
+    return {symbol: quote for (_, symbol), quote in results.items() if quote is not None}
+
+
+async def _refresh(provider: PriceProvider, symbols: List[str], kind: str):
+    fetched = None
+    try:
+        fetched = await _coalesced_fetch(provider, symbols, kind)
+    finally:
+        quote_cache.finish_refresh(symbols, kind, fetched)
+
+
+async def get_live_prices_async(
+    symbols: Sequence[str],
+    asset_types: Union[str, Sequence[str], None] = None
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Async counterpart of price_service.get_live_prices
+
+    Stock and crypto lookups run concurrently on their providers; failed stock
+    lookups that are known crypto tickers are retried as crypto, mirroring
+    get_live_price.
+
+    Args:
+        symbols: Symbols to fetch (e.g., ['AAPL', 'BTC'])
+        asset_types: One asset type for all symbols, or one per symbol
+
+    Returns:
+        Dict keyed by the symbols as passed in, value is price info or None
+    """
+    if asset_types is None or isinstance(asset_types, str):
+        asset_types = [asset_types or 'stock'] * len(symbols)
+
+    is_crypto = [(asset_type or 'stock').lower() in ['crypto', 'cryptocurrency'] for asset_type in asset_types]
+    stock_symbols = list(dict.fromkeys(s.upper() for s, crypto in zip(symbols, is_crypto) if not crypto))
+    crypto_symbols = list(dict.fromkeys(s.upper() for s, crypto in zip(symbols, is_crypto) if crypto))
+
+    stock_quotes, crypto_quotes = await asyncio.gather(
+        _cached_quotes(stock_symbols, 'stock'),
+        _cached_quotes(crypto_symbols, 'crypto')
+    )
+
+    missing = [s for s in stock_symbols if s not in stock_quotes and s not in crypto_quotes and len(s) <= 5]
+    if missing:
+        # The first lookup may download the coin list - keep it off the event loop
+        await asyncio.to_thread(crypto_index.load)
+    fallback = [s for s in missing if crypto_index.is_known(s)]
+    if fallback:
+        logger.info(f"🔄 {len(fallback)} stock lookups failed, trying crypto...")
+        crypto_quotes.update(await _cached_quotes(fallback, 'crypto'))
+
+    results = {}
+    for symbol, crypto in zip(symbols, is_crypto):
+        upper = symbol.upper()
+        results[symbol] = crypto_quotes.get(upper) if crypto else (stock_quotes.get(upper) or crypto_quotes.get(upper))
+    return results
+
+
+async def fetch_price_snapshot(symbols: Sequence[str], asset_type: str = "stock") -> PriceSnapshot:
+    """Build a PriceSnapshot without blocking the event loop"""
+    unique_symbols = sorted({symbol.upper() for symbol in symbols if symbol})
+    if not unique_symbols:
+        return PriceSnapshot({})
+    return PriceSnapshot(await get_live_prices_async(unique_symbols, asset_type))
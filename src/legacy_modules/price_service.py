@@ -3,10 +3,20 @@ Price Service - Fetch live prices from multiple sources
 Supports stocks (Yahoo Finance) and crypto (CoinGecko)
 """
 import logging
-from typing import Optional, Dict, Any
+import sys
+import os
+from typing import Optional, Dict, Any, Callable, Iterable, List, Sequence, Union
 import yfinance as yf
 from pycoingecko import CoinGeckoAPI
 
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from legacy_modules.quote_cache import quote_cache
+from legacy_modules.single_flight import SingleFlight
+from legacy_modules.crypto_symbols import CryptoSymbolIndex
+from shared.config import settings
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -39,7 +49,67 @@ CRYPTO_MAPPING = {
 }
 
 
+# Concurrent lookups of the same (asset_type, symbol) share one upstream fetch
+price_flight = SingleFlight("price_flight")
+
+# Max symbols per upstream request for the bulk quote API
+COINGECKO_BATCH_SIZE = 100
+YAHOO_BATCH_SIZE = 50
+
+
+def _load_market_cap_ranks() -> Dict[str, int]:
+    """CoinGecko ID -> market cap rank for the top CRYPTO_RANKED_COINS coins"""
+    ranks = {}
+    pages = -(-settings.CRYPTO_RANKED_COINS // 250)
+    for page in range(1, pages + 1):
+        for coin in cg.get_coins_markets(vs_currency='usd', order='market_cap_desc', per_page=250, page=page) or []:
+            if coin.get('market_cap_rank'):
+                ranks[coin['id']] = coin['market_cap_rank']
+    return ranks
+
+
+# Local symbol -> CoinGecko ID index (CRYPTO_MAPPING always wins)
+crypto_index = CryptoSymbolIndex(
+    cache_path=settings.CRYPTO_INDEX_PATH,
+    loader=cg.get_coins_list,
+    overrides=CRYPTO_MAPPING,
+    refresh_interval=settings.CRYPTO_INDEX_REFRESH_HOURS * 3600,
+    negative_ttl=settings.CRYPTO_NEGATIVE_TTL,
+    rank_loader=_load_market_cap_ranks,
+    max_negative=settings.CRYPTO_NEGATIVE_MAX_ENTRIES
+)
+
+
+def _resolve_coin_id(symbol: str) -> Optional[str]:
+    """Map a crypto symbol to its CoinGecko ID via the local index"""
+    coin_id = crypto_index.resolve(symbol)
+    if not coin_id:
+        logger.error(f"❌ Could not find {symbol} on CoinGecko")
+    return coin_id
+
+
+def _chunks(items: List[str], size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
 def get_crypto_price(symbol: str) -> Optional[Dict[str, Any]]:
+    """
+    Get cryptocurrency price, served from the quote cache when fresh
+    
+    Args:
+        symbol: Crypto symbol (e.g., BTC, ETH)
+    
+    Returns:
+        Dict with price info or None if failed
+    """
+    return quote_cache.get_or_fetch(
+        symbol, 'crypto',
+        lambda: price_flight.do(('crypto', symbol.upper()), lambda: _fetch_crypto_price(symbol))
+    )
+
+
+def _fetch_crypto_price(symbol: str) -> Optional[Dict[str, Any]]:
     """
     Fetch cryptocurrency price from CoinGecko
     
@@ -52,20 +122,9 @@ def get_crypto_price(symbol: str) -> Optional[Dict[str, Any]]:
     try:
         symbol = symbol.upper()
         
-        # Get CoinGecko ID from mapping
-        coin_id = CRYPTO_MAPPING.get(symbol)
-        
+        coin_id = _resolve_coin_id(symbol)
         if not coin_id:
-            # Try to search for the coin
-            logger.warning(f"⚠️ {symbol} not in mapping, searching CoinGecko...")
-            search_results = cg.search(query=symbol)
-            
-            if search_results and 'coins' in search_results and len(search_results['coins']) > 0:
-                coin_id = search_results['coins'][0]['id']
-                logger.info(f"✅ Found coin ID: {coin_id}")
-            else:
-                logger.error(f"❌ Could not find {symbol} on CoinGecko")
-                return None
+            return None
         
         # Fetch price data
         logger.info(f"📊 Fetching price for {symbol} (ID: {coin_id})...")
@@ -100,6 +159,22 @@ def get_crypto_price(symbol: str) -> Optional[Dict[str, Any]]:
 
 
 def get_stock_price(symbol: str) -> Optional[Dict[str, Any]]:
+    """
+    Get stock price, served from the quote cache when fresh
+    
+    Args:
+        symbol: Stock symbol (e.g., AAPL, GOOGL)
+    
+    Returns:
+        Dict with price info or None if failed
+    """
+    return quote_cache.get_or_fetch(
+        symbol, 'stock',
+        lambda: price_flight.do(('stock', symbol.upper()), lambda: _fetch_stock_price(symbol))
+    )
+
+
+def _fetch_stock_price(symbol: str) -> Optional[Dict[str, Any]]:
     """
     Fetch stock price from Yahoo Finance
     
@@ -187,8 +262,8 @@ def get_live_price(symbol: str, asset_type: str = "stock") -> Optional[Dict[str,
             # Try stock first
             result = get_stock_price(symbol)
             
-            # If stock fails and symbol looks like crypto, try crypto
-            if not result and len(symbol) <= 5:
+            # If stock fails and symbol is a known crypto ticker, try crypto
+            if not result and len(symbol) <= 5 and crypto_index.is_known(symbol):
                 logger.info(f"🔄 Stock lookup failed, trying crypto...")
                 result = get_crypto_price(symbol)
             
@@ -199,6 +274,258 @@ def get_live_price(symbol: str, asset_type: str = "stock") -> Optional[Dict[str,
         return None
 
 
+def _fetch_crypto_prices(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch many crypto prices with one CoinGecko call per chunk of IDs
+    
+    Args:
+        symbols: Upper-cased crypto symbols
+    
+    Returns:
+        Dict of symbol -> price info for every symbol that resolved
+    """
+    symbol_by_id = {}
+    for symbol in symbols:
+        try:
+            coin_id = _resolve_coin_id(symbol)
+        except Exception as e:
+            logger.error(f"❌ Error resolving {symbol} on CoinGecko: {str(e)}")
+            coin_id = None
+        if coin_id:
+            symbol_by_id.setdefault(coin_id, []).append(symbol)
+    
+    results = {}
+    for chunk in _chunks(list(symbol_by_id), COINGECKO_BATCH_SIZE):
+        try:
+            logger.info(f"📊 Fetching {len(chunk)} crypto prices from CoinGecko...")
+            price_data = cg.get_price(
+                ids=chunk,
+                vs_currencies='usd',
+                include_24hr_change=True,
+                include_market_cap=True
+            )
+        except Exception as e:
+            logger.error(f"❌ Error fetching crypto batch: {str(e)}")
+            continue
+        
+        for coin_id in chunk:
+            data = price_data.get(coin_id)
+            if not data:
+                continue
+            for symbol in symbol_by_id[coin_id]:
+                results[symbol] = {
+                    'symbol': symbol,
+                    'name': coin_id.replace('-', ' ').title(),
+                    'price': data.get('usd', 0),
+                    'change_24h': data.get('usd_24h_change', 0),
+                    'market_cap': data.get('usd_market_cap', 0),
+                    'source': 'CoinGecko',
+                    'asset_type': 'crypto'
+                }
+    
+    return results
+
+
+def _fetch_stock_prices(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch many stock prices with one Yahoo Finance multi-ticker download per chunk
+    
+    Args:
+        symbols: Upper-cased stock symbols
+    
+    Returns:
+        Dict of symbol -> price info for every symbol that returned bars
+    """
+    results = {}
+    for chunk in _chunks(symbols, YAHOO_BATCH_SIZE):
+        try:
+            logger.info(f"📈 Downloading {len(chunk)} stock quotes from Yahoo Finance...")
+            data = yf.download(
+                tickers=chunk,
+                period='5d',
+                interval='1d',
+                group_by='ticker',
+                auto_adjust=False,
+                progress=False,
+                threads=False
+            )
+        except Exception as e:
+            logger.error(f"❌ Error fetching stock batch: {str(e)}")
+            continue
+        
+        if data is None or data.empty:
+            continue
+        
+        multi_ticker = getattr(data.columns, 'nlevels', 1) > 1
+        for symbol in chunk:
+            try:
+                frame = data[symbol] if multi_ticker else data
+                closes = frame['Close'].dropna()
+            except KeyError:
+                continue
+            if closes.empty:
+                continue
+            
+            current_price = float(closes.iloc[-1])
+            previous_close = float(closes.iloc[-2]) if len(closes) > 1 else current_price
+            change_24h = ((current_price - previous_close) / previous_close * 100) if previous_close > 0 else 0
+            
+            results[symbol] = _with_cached_details({
+                'symbol': symbol,
+                'name': symbol,
+                'price': current_price,
+                'change_24h': change_24h,
+                'market_cap': 0,  # Not available from bulk download
+                'source': 'Yahoo Finance',
+                'asset_type': 'stock'
+            })
+    
+    return results
+
+
+def _with_cached_details(quote: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keep the name and market cap of a cached single-ticker quote
+    
+    Bulk downloads only carry prices, and their quotes replace the shared
+    'stock' cache entry that get_stock_price also reads, so only the price
+    and change should move.
+    """
+    cached = quote_cache.peek(quote['symbol'], 'stock')
+    if cached:
+        previous = cached[0]
+        quote['name'] = previous.get('name') or quote['name']
+        quote['market_cap'] = previous.get('market_cap') or quote['market_cap']
+    return quote
+
+
+def coalesced(kind: str, batch_fetcher: Callable[[List[str]], Dict[str, Dict[str, Any]]]):
+    """Wrap a batch fetcher so symbols already being fetched elsewhere are awaited, not re-fetched"""
+    def fetch(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        results = price_flight.do_many(
+            [(kind, symbol) for symbol in symbols],
+            lambda keys: {
+                (kind, symbol): quote
+                for symbol, quote in batch_fetcher([symbol for _, symbol in keys]).items()
+            }
+        )
+        return {symbol: quote for (_, symbol), quote in results.items() if quote is not None}
+    return fetch
+
+
+def get_live_prices(
+    symbols: Sequence[str],
+    asset_types: Union[str, Sequence[str], None] = None
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Fetch live prices for many symbols in a few batched provider calls
+    
+    Symbols are grouped by provider: crypto goes to CoinGecko in chunks of IDs,
+    everything else to one Yahoo Finance multi-ticker download per chunk.
+    Stocks that fail and are known crypto tickers (<= 5 chars) are retried as
+    crypto, mirroring get_live_price. Fresh quotes are served from the quote cache.
+    
+    Args:
+        symbols: Symbols to fetch (e.g., ['AAPL', 'BTC'])
+        asset_types: One asset type for all symbols, or one per symbol
+    
+    Returns:
+        Dict keyed by the symbols as passed in, value is price info or None
+    """
+    if asset_types is None or isinstance(asset_types, str):
+        asset_types = [asset_types or 'stock'] * len(symbols)
+    
+    stock_symbols = []
+    crypto_symbols = []
+    for symbol, asset_type in zip(symbols, asset_types):
+        upper = symbol.upper()
+        if (asset_type or 'stock').lower() in ['crypto', 'cryptocurrency']:
+            crypto_symbols.append(upper)
+        else:
+            stock_symbols.append(upper)
+    
+    stock_symbols = list(dict.fromkeys(stock_symbols))
+    crypto_symbols = list(dict.fromkeys(crypto_symbols))
+    
+    try:
+        stock_quotes = quote_cache.get_many(
+            stock_symbols, 'stock', coalesced('stock', _fetch_stock_prices)
+        ) if stock_symbols else {}
+        
+        # Stocks that failed and are known crypto tickers get one batched crypto retry
+        fallback = [
+            s for s in stock_symbols
+            if s not in stock_quotes and len(s) <= 5 and crypto_index.is_known(s)
+        ]
+        if fallback:
+            logger.info(f"🔄 {len(fallback)} stock lookups failed, trying crypto...")
+        crypto_quotes = quote_cache.get_many(
+            list(dict.fromkeys(crypto_symbols + fallback)), 'crypto', coalesced('crypto', _fetch_crypto_prices)
+        ) if crypto_symbols or fallback else {}
+    except Exception as e:
+        logger.error(f"❌ Error in get_live_prices: {str(e)}")
+        return {symbol: None for symbol in symbols}
+    
+    results = {}
+    for symbol, asset_type in zip(symbols, asset_types):
+        upper = symbol.upper()
+        if (asset_type or 'stock').lower() in ['crypto', 'cryptocurrency']:
+            results[symbol] = crypto_quotes.get(upper)
+        else:
+            results[symbol] = stock_quotes.get(upper) or crypto_quotes.get(upper)
+    
+    logger.info(f"✅ Priced {sum(1 for q in results.values() if q)}/{len(results)} symbols")
+    return results
+
+
+class PriceSnapshot:
+    """
+    Point-in-time prices for a set of symbols, resolved once per request
+
+    Every distinct symbol is fetched exactly once (batched), so metric
+    code can look prices up as often as it likes without extra provider calls.
+    """
+
+    def __init__(self, quotes: Dict[str, Optional[Dict[str, Any]]]):
+        self._quotes = {symbol.upper(): quote for symbol, quote in quotes.items()}
+
+    @classmethod
+    def fetch(cls, symbols: Iterable[str], asset_type: str = "stock") -> "PriceSnapshot":
+        """
+        Resolve every distinct symbol once, in batched provider calls
+
+        Args:
+            symbols: Symbols to price (duplicates are collapsed)
+            asset_type: Asset type used for every symbol
+
+        Returns:
+            PriceSnapshot holding one quote (or None) per symbol
+        """
+        unique_symbols = sorted({symbol.upper() for symbol in symbols if symbol})
+        if not unique_symbols:
+            return cls({})
+
+        logger.info(f"📸 Building price snapshot for {len(unique_symbols)} symbols...")
+        return cls(get_live_prices(unique_symbols, asset_type))
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Return the raw quote dict for a symbol, or None if it could not be priced"""
+        return self._quotes.get(symbol.upper())
+
+    def price(self, symbol: str, fallback: float) -> float:
+        """Return the snapshot price for a symbol, or the fallback if unavailable"""
+        quote = self.get(symbol)
+        if quote and quote.get('price') is not None:
+            return quote['price']
+        return fallback
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._quotes
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+
 # Test function
 if __name__ == "__main__":
     print("🧪 Testing Price Service...\n")
@@ -0,0 +1,242 @@
+"""
+Projection Engine - Monte Carlo forward projection of buy-and-hold portfolios
+Simulates correlated daily asset paths (GBM or bootstrap of historical
+returns) once and values several portfolios on the same paths, in chunks
+that stay within a fixed memory budget
+"""
+import logging
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from legacy_modules.portfolio_analytics import build_return_matrix, ledoit_wolf_covariance, periods_per_year, MIN_OBSERVATIONS
+from legacy_modules.var_engine import _cholesky
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_METHODS = ("gbm", "bootstrap")
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Paths per chunk and points kept for the fan chart
+CHUNK_PATHS = 10_000
+FAN_POINTS = 25
+
+
+class _ReturnModel:
+    """
+    Draws daily log-return blocks of shape (steps, paths, assets)
+
+    Blocks are time-major, so consecutive draws from one generator produce the
+    same stream as a single draw: results do not depend on the block size.
+    Paths are simulated in float32 to halve memory traffic.
+    """
+
+    def __init__(self, returns: np.ndarray, method: str):
+        self.method = method
+        self.returns32 = returns.astype(np.float32)
+        if method == "gbm":
+            self.mu = returns.mean(axis=0).astype(np.float32)
+            self.chol_t = _cholesky(ledoit_wolf_covariance(returns)['covariance']).T.astype(np.float32)
+
+    def draw(self, rng: np.random.Generator, steps: int, paths: int) -> np.ndarray:
+        if self.method == "bootstrap":
+            # Resample whole days so cross-asset correlation is preserved
+            return self.returns32[rng.integers(0, len(self.returns32), size=(steps, paths))]
+        shocks = rng.standard_normal((steps, paths, len(self.mu)), dtype=np.float32)
+        return self.mu + shocks @ self.chol_t
+
+
+def _fill_missing_history(symbols: List[str], matrix: Dict[str, Any]) -> np.ndarray:
+    """Return matrix over `symbols`; assets without history track the covered assets' average"""
+    covered = {symbol: i for i, symbol in enumerate(matrix['symbols'])}
+    returns = matrix['returns']
+    proxy = returns.mean(axis=1)
+    columns = [returns[:, covered[s]] if s in covered else proxy for s in symbols]
+    return np.column_stack(columns)
+
+
+def project_portfolios(
+    returns: np.ndarray,
+    initial_values: Dict[str, np.ndarray],
+    horizon_years: float,
+    steps_per_year: int = 252,
+    method: str = "gbm",
+    paths: int = 10_000,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    memory_mb: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Project buy-and-hold portfolios on common random paths
+
+    Args:
+        returns: Historical daily log returns (T, N) for the union of assets
+        initial_values: Portfolio name -> current value held in each of the N assets
+        horizon_years: Projection horizon
+        steps_per_year: Simulation steps per year (trading days)
+        method: "gbm" (multivariate normal log returns) or "bootstrap" (resampled days)
+        paths: Number of simulated paths
+        seed: Seed for reproducible paths (None = random, returned in the result)
+        percentiles: Percentiles for the fan chart
+        memory_mb: Working-set budget per chunk (defaults to settings)
+
+    Returns:
+        Dict with per-portfolio fan chart and loss/drawdown stats plus pairwise comparison
+    """
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Unknown projection method: {method}")
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**32)
+
+    names = list(initial_values)
+    values0 = np.column_stack([np.asarray(initial_values[n], dtype=float) for n in names])  # (N, P)
+    start_totals = values0.sum(axis=0)
+    values0 = values0.astype(np.float32)
+    n_assets = values0.shape[0]
+    steps = max(1, int(round(horizon_years * steps_per_year)))
+
+    fan_steps = np.unique(np.linspace(0, steps, FAN_POINTS).round().astype(int))
+    model = _ReturnModel(returns, method)
+
+    # Bound the (paths x steps x assets) float32 working set: shocks, draws, cumulative sums, price relatives
+    budget = (memory_mb or settings.PROJECTION_MEMORY_MB) * 1024 * 1024
+    chunk_paths = min(paths, CHUNK_PATHS)
+    block_steps = int(max(1, min(steps, budget // (chunk_paths * n_assets * 4 * 4))))
+
+    chunk_sizes = [chunk_paths] * (paths // chunk_paths)
+    if paths % chunk_paths:
+        chunk_sizes.append(paths % chunk_paths)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+    fan = np.empty((len(names), len(fan_steps), paths), dtype=np.float32)
+    final = np.empty((len(names), paths))
+    max_drawdown = np.empty((len(names), paths))
+
+    offset = 0
+    for chunk_seed, n_paths in zip(seeds, chunk_sizes):
+        rng = np.random.default_rng(chunk_seed)
+        sl = slice(offset, offset + n_paths)
+        log_price = np.zeros((n_paths, n_assets), dtype=np.float32)
+        running_max = np.tile(start_totals, (n_paths, 1))
+        chunk_dd = np.zeros((n_paths, len(names)))
+        fan[:, 0, sl] = start_totals[:, None]
+
+        step = 0
+        while step < steps:
+            block = min(block_steps, steps - step)
+            draws = model.draw(rng, block, n_paths)
+            # Seeding the first row keeps the running sum identical to one long cumsum
+            draws[0] += log_price
+            cumulative = np.cumsum(draws, axis=0, out=draws)
+            log_price = cumulative[-1].copy()
+            values = np.exp(cumulative) @ values0  # (block, paths, P)
+            del cumulative
+
+            peaks = np.maximum(np.maximum.accumulate(values, axis=0), running_max)
+            drawdown = np.where(peaks > 0, 1 - values / np.where(peaks > 0, peaks, 1.0), 0.0)
+            chunk_dd = np.maximum(chunk_dd, drawdown.max(axis=0))
+            running_max = peaks[-1]
+
+            # Fan-chart points that fall in this block (step numbers are 1-based)
+            in_block = (fan_steps > step) & (fan_steps <= step + block)
+            for k in np.flatnonzero(in_block):
+                fan[:, k, sl] = values[fan_steps[k] - step - 1].T
+            step += block
+
+        final[:, sl] = values[-1].T
+        max_drawdown[:, sl] = chunk_dd.T
+        offset += n_paths
+
+    fan_percentiles = np.percentile(fan, percentiles, axis=2)  # (q, P, points)
+    years = (fan_steps / steps_per_year).round(3).tolist()
+
+    portfolios = {}
+    for p, name in enumerate(names):
+        start = float(start_totals[p])
+        portfolios[name] = {
+            "initial_value": round(start, 2),
+            "fan_chart": {
+                "years": years,
+                **{f"p{int(q) if float(q).is_integer() else q}": np.round(fan_percentiles[i, p], 2).tolist()
+                   for i, q in enumerate(percentiles)}
+            },
+            "expected_final_value": round(float(final[p].mean()), 2),
+            "median_final_value": round(float(np.median(final[p])), 2),
+            "prob_loss": round(float((final[p] < start).mean()), 4),
+            "expected_max_drawdown_pct": round(float(max_drawdown[p].mean()) * 100, 2),
+            "p95_max_drawdown_pct": round(float(np.percentile(max_drawdown[p], 95)) * 100, 2)
+        }
+
+    comparison = None
+    if len(names) == 2:
+        # Same paths for both portfolios, so the difference isolates the change itself
+        growth = final / np.maximum(start_totals, 1e-12)[:, None]
+        comparison = {
+            "prob_outperform": round(float((growth[1] > growth[0]).mean()), 4),
+            "median_final_value_delta": round(float(np.median(final[1] - final[0])), 2),
+            "prob_loss_delta": round(portfolios[names[1]]['prob_loss'] - portfolios[names[0]]['prob_loss'], 4),
+            "expected_max_drawdown_delta": round(
+                portfolios[names[1]]['expected_max_drawdown_pct'] - portfolios[names[0]]['expected_max_drawdown_pct'], 2
+            )
+        }
+
+    return {
+        "method": method,
+        "paths": paths,
+        "seed": seed,
+        "horizon_years": horizon_years,
+        "steps": steps,
+        "chunk_paths": chunk_paths,
+        "block_steps": block_steps,
+        "portfolios": portfolios,
+        "comparison": comparison
+    }
+
+
+def project_holdings(
+    portfolios: Dict[str, Dict[str, float]],
+    horizon_years: float,
+    method: str = "gbm",
+    paths: int = 10_000,
+    seed: Optional[int] = None,
+    lookback_days: int = 730
+) -> Optional[Dict[str, Any]]:
+    """
+    Projection for portfolios given as {name: {symbol: current_value}}
+
+    Uses stored daily history for the union of symbols; symbols without
+    history follow the average of the covered ones.
+
+    Returns:
+        project_portfolios result, or None without enough history
+    """
+    symbols = sorted({s.upper() for holdings in portfolios.values() for s in holdings})
+    matrix = build_return_matrix(symbols, lookback_days)
+    if not matrix['symbols'] or matrix['returns'].shape[0] < MIN_OBSERVATIONS:
+        return None
+
+    index = {s: i for i, s in enumerate(symbols)}
+    initial_values = {}
+    for name, holdings in portfolios.items():
+        values = np.zeros(len(symbols))
+        for symbol, value in holdings.items():
+            values[index[symbol.upper()]] += value
+        initial_values[name] = values
+
+    result = project_portfolios(
+        _fill_missing_history(symbols, matrix),
+        initial_values,
+        horizon_years,
+        steps_per_year=int(round(periods_per_year(matrix['dates']))),
+        method=method,
+        paths=paths,
+        seed=seed
+    )
+    result["missing_history"] = matrix['missing']
+    return result
@@ -0,0 +1,382 @@
+"""
+Quote Cache - TTL + stale-while-revalidate cache for live prices
+Sits in front of the Yahoo Finance / CoinGecko lookups in price_service
+"""
+import json
+import logging
+import sys
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.config import settings
+
+try:
+    import redis
+except ImportError:  # Redis is optional - fall back to in-process memory
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+CRYPTO_ASSET_TYPES = {'crypto', 'cryptocurrency'}
+
+
+class MemoryQuoteBackend:
+    """In-process LRU store of (quote, fetched_at) pairs"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, quote: Dict[str, Any], fetched_at: float, max_age: float):
+        with self._lock:
+            self._entries[key] = (quote, fetched_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisQuoteBackend:
+    """
+    Redis store shared by every server worker
+
+    Keys expire once they are too old to be served even as stale; the size
+    bound is delegated to Redis (configure maxmemory-policy allkeys-lru).
+    """
+
+    def __init__(self, host: str, port: int, db: int, password: str = "", prefix: str = "finbuddy:quote:"):
+        self.prefix = prefix
+        self.client = redis.Redis(host=host, port=port, db=db, password=password or None, socket_timeout=1.0)
+        self.client.ping()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        payload = json.loads(raw)
+        return payload['quote'], payload['fetched_at']
+
+    def set(self, key: str, quote: Dict[str, Any], fetched_at: float, max_age: float):
+        payload = json.dumps({'quote': quote, 'fetched_at': fetched_at})
+        self.client.set(self.prefix + key, payload, ex=max(1, int(max_age)))
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + '*'))
+
+
+class QuoteCache:
+    """
+    Quote cache with per-asset-type TTLs and stale-while-revalidate
+
+    - Fresh entries (age <= TTL) are returned directly
+    - Stale entries (TTL < age <= TTL + stale window) are returned immediately
+      while a single background refresh is scheduled for that key
+    - Anything older is a miss and is fetched inline
+    """
+
+    def __init__(self, backend, ttls: Dict[str, float], stale_ttl: float, refresh_workers: int = 4):
+        self.backend = backend
+        self.ttls = ttls
+        self.stale_ttl = stale_ttl
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="quote-refresh")
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'backend_errors': 0
+        }
+
+    @staticmethod
+    def _kind(asset_type: str) -> str:
+        return 'crypto' if (asset_type or '').lower() in CRYPTO_ASSET_TYPES else 'stock'
+
+    def _key(self, symbol: str, asset_type: str) -> str:
+        return f"{self._kind(asset_type)}:{symbol.upper()}"
+
+    def ttl_for(self, asset_type: str) -> float:
+        """Freshness window for an asset type (crypto moves faster than equities)"""
+        return self.ttls.get(self._kind(asset_type), self.ttls['stock'])
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def peek(self, symbol: str, asset_type: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return (quote, age_seconds) without fetching, or None if absent"""
+        try:
+            entry = self.backend.get(self._key(symbol, asset_type))
+        except Exception as e:
+            self._count('backend_errors')
+            logger.warning(f"⚠️ Quote cache read failed: {e}")
+            return None
+        if entry is None:
+            return None
+        quote, fetched_at = entry
+        return quote, time.time() - fetched_at
+
+    def put(self, symbol: str, asset_type: str, quote: Dict[str, Any]):
+        """Store a freshly fetched quote"""
+        try:
+            self.backend.set(
+                self._key(symbol, asset_type),
+                quote,
+                time.time(),
+                self.ttl_for(asset_type) + self.stale_ttl
+            )
+        except Exception as e:
+            self._count('backend_errors')
+            logger.warning(f"⚠️ Quote cache write failed: {e}")
+
+    def get_or_fetch(
+        self,
+        symbol: str,
+        asset_type: str,
+        fetcher: Callable[[], Optional[Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached quote, serving stale data while one refresh runs
+
+        Args:
+            symbol: Symbol being priced
+            asset_type: Asset type used to pick the TTL
+            fetcher: Zero-argument callable that performs the upstream fetch
+
+        Returns:
+            Quote dict or None if the upstream fetch failed on a miss
+        """
+        cached = self.peek(symbol, asset_type)
+        if cached is not None:
+            quote, age = cached
+            ttl = self.ttl_for(asset_type)
+            if age <= ttl:
+                self._count('hits')
+                return quote
+            if age <= ttl + self.stale_ttl:
+                self._count('stale_hits')
+                self._schedule_refresh(symbol, asset_type, fetcher)
+                return quote
+
+        self._count('misses')
+        quote = fetcher()
+        if quote is not None:
+            self.put(symbol, asset_type, quote)
+        return quote
+
+    def partition(
+        self,
+        symbols: List[str],
+        asset_type: str
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str], List[str]]:
+        """
+        Split symbols into cached quotes, stale symbols and misses
+
+        Returns:
+            (quotes served from cache, symbols needing a background refresh,
+             symbols that must be fetched inline)
+        """
+        results = {}
+        stale = []
+        misses = []
+        ttl = self.ttl_for(asset_type)
+
+        for symbol in symbols:
+            cached = self.peek(symbol, asset_type)
+            if cached is not None:
+                quote, age = cached
+                if age <= ttl:
+                    self._count('hits')
+                    results[symbol] = quote
+                    continue
+                if age <= ttl + self.stale_ttl:
+                    self._count('stale_hits')
+                    results[symbol] = quote
+                    stale.append(symbol)
+                    continue
+            self._count('misses')
+            misses.append(symbol)
+
+        return results, stale, misses
+
+    def claim_refresh(self, symbols: List[str], asset_type: str) -> List[str]:
+        """Mark symbols as refreshing; returns only those no other refresh owns"""
+        claimed = []
+        with self._lock:
+            for symbol in symbols:
+                key = self._key(symbol, asset_type)
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    claimed.append(symbol)
+        return claimed
+
+    def finish_refresh(self, symbols: List[str], asset_type: str, fetched: Optional[Dict[str, Dict[str, Any]]]):
+        """Store refreshed quotes and release the claim taken by claim_refresh"""
+        try:
+            for symbol in symbols:
+                quote = (fetched or {}).get(symbol)
+                if quote is not None:
+                    self.put(symbol, asset_type, quote)
+                    self._count('refreshes')
+                else:
+                    self._count('refresh_errors')
+        finally:
+            with self._lock:
+                for symbol in symbols:
+                    self._refreshing.discard(self._key(symbol, asset_type))
+
+    def get_many(
+        self,
+        symbols: List[str],
+        asset_type: str,
+        batch_fetcher: Callable[[List[str]], Dict[str, Dict[str, Any]]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Bulk variant of get_or_fetch for providers that accept many symbols per call
+
+        Misses are fetched inline with one batch_fetcher call; stale keys are
+        served immediately and refreshed together in one background batch.
+
+        Args:
+            symbols: Upper-cased symbols of a single asset type
+            asset_type: Asset type used to pick the TTL
+            batch_fetcher: Callable taking a symbol list, returning {symbol: quote}
+
+        Returns:
+            Dict of symbol -> quote for every symbol that could be priced
+        """
+        results, stale, misses = self.partition(symbols, asset_type)
+
+        claimed = self.claim_refresh(stale, asset_type)
+        if claimed:
+            self._refresh_pool.submit(self._refresh_batch, claimed, asset_type, batch_fetcher)
+
+        if misses:
+            fetched = batch_fetcher(misses)
+            for symbol, quote in fetched.items():
+                if quote is not None:
+                    self.put(symbol, asset_type, quote)
+                    results[symbol] = quote
+
+        return results
+
+    def _refresh_batch(
+        self,
+        symbols: List[str],
+        asset_type: str,
+        batch_fetcher: Callable[[List[str]], Dict[str, Dict[str, Any]]]
+    ):
+        fetched = None
+        try:
+            fetched = batch_fetcher(symbols)
+        except Exception as e:
+            logger.warning(f"⚠️ Background batch refresh failed: {e}")
+        finally:
+            self.finish_refresh(symbols, asset_type, fetched)
+
+    def _schedule_refresh(self, symbol: str, asset_type: str, fetcher: Callable[[], Optional[Dict[str, Any]]]):
+        key = self._key(symbol, asset_type)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresh_pool.submit(self._refresh, key, symbol, asset_type, fetcher)
+
+    def _refresh(self, key: str, symbol: str, asset_type: str, fetcher: Callable[[], Optional[Dict[str, Any]]]):
+        try:
+            quote = fetcher()
+            if quote is not None:
+                self.put(symbol, asset_type, quote)
+                self._count('refreshes')
+            else:
+                self._count('refresh_errors')
+        except Exception as e:
+            self._count('refresh_errors')
+            logger.warning(f"⚠️ Background refresh failed for {symbol}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/staleness counters for monitoring"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['refreshing'] = len(self._refreshing)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['stale_hits']) / lookups, 3) if lookups else 0.0
+        stats['evictions'] = self.backend.evictions
+        stats['backend'] = type(self.backend).__name__
+        try:
+            stats['size'] = len(self.backend)
+        except Exception:
+            stats['size'] = None
+        return stats
+
+
+def create_quote_cache() -> QuoteCache:
+    """Build the quote cache from settings, falling back to memory if Redis is unavailable"""
+    backend = None
+    if settings.QUOTE_CACHE_BACKEND.lower() == 'redis':
+        if redis is None:
+            logger.warning("⚠️ QUOTE_CACHE_BACKEND=redis but the redis package is not installed, using memory")
+        else:
+            try:
+                backend = RedisQuoteBackend(
+                    host=settings.REDIS_HOST,
+                    port=settings.REDIS_PORT,
+                    db=settings.REDIS_DB,
+                    password=settings.REDIS_PASSWORD
+                )
+                logger.info(f"✅ Quote cache using Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+            except Exception as e:
+                logger.warning(f"⚠️ Redis unavailable ({e}), using in-memory quote cache")
+                backend = None
+
+    if backend is None:
+        backend = MemoryQuoteBackend(settings.QUOTE_CACHE_MAX_ENTRIES)
+
+    return QuoteCache(
+        backend,
+        ttls={
+            'stock': settings.QUOTE_TTL_STOCK,
+            'crypto': settings.QUOTE_TTL_CRYPTO
+        },
+        stale_ttl=settings.QUOTE_STALE_TTL
+    )
+
+
+# Global instance
+quote_cache = create_quote_cache()
@@ -2,10 +2,36 @@
 AI/ML Risk Prediction Engine
 """
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 from datetime import datetime, timedelta
 import random
 
+# Asset type codes for the batch API (index into ASSET_TYPES)
+ASSET_TYPES = ("stock", "crypto", "mutual_fund", "bond", "etf")
+ASSET_TYPE_RISK = {
+    "stock": 0.5,
+    "crypto": 0.8,
+    "mutual_fund": 0.3,
+    "bond": 0.2,
+    "etf": 0.4
+}
+DEFAULT_ASSET_RISK = 0.5
+
+RISK_LEVELS = np.array(["low", "medium", "high"])
+RISK_INDICATORS = np.array(["🟢", "🟡", "🔴"])
+TRENDS = np.array(["➡️ Stable", "📈 Upward trend", "📉 Downward trend"])
+
+
+def encode_asset_types(asset_types: Sequence[str]) -> np.ndarray:
+    """Map asset type names to integer codes (-1 for unknown types)"""
+    codes = {name: i for i, name in enumerate(ASSET_TYPES)}
+    return np.fromiter(
+        (codes.get((t or '').lower(), -1) for t in asset_types),
+        dtype=np.int8,
+        count=len(asset_types)
+    )
+
+
 class RiskPredictionEngine:
     """
     Risk prediction engine using simple heuristics and ML concepts
@@ -32,33 +58,44 @@ class RiskPredictionEngine:
         
         return min(volatility, 1.0)
     
+    def calculate_annualized_volatility(self, prices: List[float], periods_per_year: int = 252) -> float:
+        """Annualized volatility of log returns (0.25 = 25% per year)"""
+        prices_array = np.asarray(prices, dtype=float)
+        prices_array = prices_array[prices_array > 0]
+        if len(prices_array) < 3:
+            return 0.0
+        
+        returns = np.diff(np.log(prices_array))
+        return float(np.std(returns, ddof=1) * np.sqrt(periods_per_year))
+    
     def predict_risk_score(self, investment_data: Dict) -> Dict:
         """
         Predict risk score for an investment
         Returns a risk score between 0 (low risk) and 1 (high risk)
+        
+        Pass historical closes as investment_data['prices'] to score real
+        annualized volatility; otherwise it is estimated from the price change.
         """
-        # Simulate price history if not available
         current_price = investment_data.get('current_price', 100)
         purchase_price = investment_data.get('purchase_price', 100)
         
         # Calculate price change percentage
         price_change_pct = abs((current_price - purchase_price) / purchase_price)
         
-        # Simulate volatility (in production, use historical data)
-        volatility = min(price_change_pct * 2, 1.0)
-        
-        # Asset type risk factors
-        asset_type_risk = {
-            "stock": 0.5,
-            "crypto": 0.8,
-            "mutual_fund": 0.3,
-            "bond": 0.2,
-            "etf": 0.4
-        }
+        prices = investment_data.get('prices')
+        if prices is not None and len(prices) >= 20:
+            # Real volatility from price history (100%+ annualized = max)
+            periods = 365 if investment_data.get('asset_type', '').lower() == 'crypto' else 252
+            volatility = min(self.calculate_annualized_volatility(prices, periods), 1.0)
+            volatility_source = "historical"
+        else:
+            # Simulate volatility when no history is available
+            volatility = min(price_change_pct * 2, 1.0)
+            volatility_source = "estimated"
         
-        base_risk = asset_type_risk.get(
+        base_risk = ASSET_TYPE_RISK.get(
             investment_data.get('asset_type', 'stock').lower(), 
-            0.5
+            DEFAULT_ASSET_RISK
         )
         
         # Calculate weighted risk score
@@ -90,10 +127,82 @@ class RiskPredictionEngine:
             "risk_level": risk_level,
             "risk_indicator": color,
             "volatility": round(volatility, 3),
+            "volatility_source": volatility_source,
             "recommendations": recommendations,
             "predicted_trend": self._predict_trend(investment_data)
         }
     
+    def predict_risk_scores_batch(
+        self,
+        current_prices: np.ndarray,
+        purchase_prices: np.ndarray,
+        asset_type_codes: np.ndarray,
+        volatilities: Optional[np.ndarray] = None,
+        with_recommendations: bool = False
+    ) -> Dict:
+        """
+        Vectorized predict_risk_score over many holdings at once
+        
+        Args:
+            current_prices: Current price per holding
+            purchase_prices: Purchase price per holding
+            asset_type_codes: Codes from encode_asset_types
+            volatilities: Optional historical volatility per holding (NaN = estimate)
+            with_recommendations: Also build recommendation text (slow path)
+        
+        Returns:
+            Dict of arrays: risk_score, risk_level, risk_indicator, volatility,
+            predicted_trend (plus recommendations as a list when requested)
+        """
+        current = np.asarray(current_prices, dtype=float)
+        purchase = np.asarray(purchase_prices, dtype=float)
+        codes = np.asarray(asset_type_codes, dtype=np.int64)
+        
+        change = np.divide(current - purchase, purchase, out=np.zeros_like(current), where=purchase != 0)
+        price_change_pct = np.abs(change)
+        
+        volatility = np.minimum(price_change_pct * 2, 1.0)
+        if volatilities is not None:
+            historical = np.asarray(volatilities, dtype=float)
+            volatility = np.where(np.isnan(historical), volatility, np.minimum(historical, 1.0))
+        
+        risk_table = np.array([ASSET_TYPE_RISK[name] for name in ASSET_TYPES] + [DEFAULT_ASSET_RISK])
+        base_risk = risk_table[np.where(codes >= 0, codes, len(ASSET_TYPES))]
+        
+        risk_score = np.clip(
+            base_risk * 0.4 + volatility * 0.3 + (price_change_pct > 0.2) * 0.3,
+            0.0, 1.0
+        )
+        
+        level_codes = (risk_score >= 0.4).astype(np.int8) + (risk_score >= 0.7)
+        trend_codes = np.select([change * 100 > 5, change * 100 < -5], [1, 2], default=0)
+        
+        result = {
+            "risk_score": np.round(risk_score, 3),
+            "risk_level": RISK_LEVELS[level_codes],
+            "risk_indicator": RISK_INDICATORS[level_codes],
+            "volatility": np.round(volatility, 3),
+            "predicted_trend": TRENDS[trend_codes]
+        }
+        
+        if with_recommendations:
+            result["recommendations"] = [
+                self._generate_recommendations(score, {"asset_type": ASSET_TYPES[code] if code >= 0 else ""})
+                for score, code in zip(risk_score.tolist(), codes.tolist())
+            ]
+        
+        return result
+    
+    def historical_volatilities(self, price_series: Sequence, asset_type_codes: np.ndarray, min_points: int = 20) -> np.ndarray:
+        """Annualized volatility per holding (NaN where history is too short)"""
+        volatilities = np.full(len(price_series), np.nan)
+        crypto_code = ASSET_TYPES.index("crypto")
+        for i, (prices, code) in enumerate(zip(price_series, asset_type_codes)):
+            if prices is not None and len(prices) >= min_points:
+                periods = 365 if code == crypto_code else 252
+                volatilities[i] = self.calculate_annualized_volatility(prices, periods)
+        return volatilities
+    
     def _generate_recommendations(self, risk_score: float, investment_data: Dict) -> List[str]:
         """Generate risk-based recommendations"""
         recommendations = []
@@ -0,0 +1,256 @@
+"""
+Risk Report Snapshots - Persisted per-user risk reports with background refresh
+A worker rebuilds a user's report only when its fingerprint (holdings,
+quantized live prices, latest news) changes or the snapshot gets too old, so
+page loads read the stored report instead of recomputing it. One worker (the
+holder of the risk_report_refresher lease) sweeps every user; the others only
+rebuild users whose holdings they changed.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.config import settings
+from shared.models import Investment, RiskReportSnapshot
+from shared.utils.database import get_session_maker
+from legacy_modules.leader_lease import LeaderLease
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "risk_report_refresher"
+
+ReportBuilder = Callable[[int, AsyncSession], Awaitable[Dict[str, Any]]]
+FingerprintFn = Callable[[int, AsyncSession], Awaitable[str]]
+
+
+def price_bucket(price: Optional[float], step_pct: float) -> int:
+    """Log-spaced price bucket: moves smaller than step_pct usually keep the bucket"""
+    if not price or price <= 0:
+        return 0
+    return int(math.floor(math.log(price) / math.log1p(step_pct / 100)))
+
+
+def report_fingerprint(
+    investments: Iterable[Investment],
+    prices: Mapping[str, Optional[float]],
+    news_marker: Any,
+    step_pct: Optional[float] = None
+) -> str:
+    """
+    Hash of everything the risk report depends on
+
+    Args:
+        investments: User's Investment rows
+        prices: Symbol -> live price (None = unknown)
+        news_marker: Anything that changes when new articles arrive (e.g. latest id)
+        step_pct: Price move that counts as a change (defaults to settings)
+
+    Returns:
+        Hex digest
+    """
+    step_pct = step_pct or settings.RISK_REPORT_PRICE_STEP_PCT
+    holdings = sorted(
+        (inv.symbol.upper(), inv.asset_type or "", inv.quantity, inv.purchase_price, price_bucket(prices.get(inv.symbol), step_pct))
+        for inv in investments
+    )
+    payload = json.dumps([holdings, news_marker], default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+async def load_snapshot(session: AsyncSession, user_id: int) -> Optional[RiskReportSnapshot]:
+    result = await session.execute(select(RiskReportSnapshot).where(RiskReportSnapshot.user_id == user_id))
+    return result.scalars().first()
+
+
+async def save_snapshot(
+    session: AsyncSession,
+    user_id: int,
+    report: Dict[str, Any],
+    fingerprint: str,
+    build_ms: float
+) -> RiskReportSnapshot:
+    """Insert or replace the user's snapshot"""
+    snapshot = await load_snapshot(session, user_id)
+    if snapshot is None:
+        snapshot = RiskReportSnapshot(user_id=user_id)
+        session.add(snapshot)
+    snapshot.fingerprint = fingerprint
+    snapshot.report = json.dumps(report, default=str)
+    snapshot.build_ms = build_ms
+    snapshot.computed_at = datetime.utcnow()
+    await session.commit()
+    return snapshot
+
+
+def snapshot_payload(snapshot: RiskReportSnapshot, refreshed: bool = False) -> Dict[str, Any]:
+    """Stored report plus snapshot metadata (age in seconds)"""
+    report = json.loads(snapshot.report)
+    report["snapshot"] = {
+        "computed_at": snapshot.computed_at.isoformat(),
+        "age_seconds": round((datetime.utcnow() - snapshot.computed_at).total_seconds(), 1),
+        "build_ms": snapshot.build_ms,
+        "refreshed": refreshed
+    }
+    return report
+
+
+class RiskReportRefresher:
+    """
+    Background worker that keeps RiskReportSnapshot rows current
+
+    The report builder and fingerprint function live with the API handlers and
+    are attached with configure(). Builds for one user never overlap, whether
+    they come from the worker or from an explicit ?refresh=true.
+    """
+
+    def __init__(self, interval_seconds: float = 300, max_age_seconds: float = 3600, concurrency: int = 2):
+        self.interval_seconds = interval_seconds
+        self.max_age_seconds = max_age_seconds
+        self.concurrency = max(1, concurrency)
+        # Outlives the wait between sweeps; renewed during long sweeps
+        self.lease = LeaderLease(LEASE_NAME, lease_seconds=2 * interval_seconds)
+
+        self._build: Optional[ReportBuilder] = None
+        self._fingerprint: Optional[FingerprintFn] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._dirty: set = set()
+        self._user_locks: Dict[int, List] = {}  # user id -> [lock, holders + waiters]
+        self._stats = {'cycles': 0, 'checks': 0, 'rebuilds': 0, 'unchanged': 0, 'errors': 0, 'last_cycle_ms': 0.0}
+
+    def configure(self, build: ReportBuilder, fingerprint: FingerprintFn):
+        self._build = build
+        self._fingerprint = fingerprint
+
+    def start(self):
+        """Start the refresh loop on the running event loop"""
+        if self._task is None and self._build is not None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"✅ Risk report refresher started (every {self.interval_seconds:.0f}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.lease.release()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not release risk report refresher lease: {e}")
+
+    def mark_dirty(self, user_id: int):
+        """Rebuild this user's snapshot on the next pass (e.g. holdings changed)"""
+        self._dirty.add(user_id)
+        if self._wake is not None:
+            self._wake.set()
+
+    @asynccontextmanager
+    async def _user_lock(self, user_id: int):
+        """Per-user build lock, dropped once nobody holds or waits for it"""
+        entry = self._user_locks.setdefault(user_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._user_locks[user_id]
+
+    async def refresh(self, user_id: int, force: bool = False) -> Optional[RiskReportSnapshot]:
+        """
+        Rebuild the user's snapshot if its inputs changed (always when force=True)
+
+        Returns:
+            Current snapshot (new or unchanged)
+        """
+        async with self._user_lock(user_id), get_session_maker()() as session:
+            snapshot = await load_snapshot(session, user_id)
+            fingerprint = await self._fingerprint(user_id, session)
+            self._stats['checks'] += 1
+
+            if not force and snapshot is not None and snapshot.fingerprint == fingerprint:
+                age = (datetime.utcnow() - snapshot.computed_at).total_seconds()
+                if age < self.max_age_seconds:
+                    self._stats['unchanged'] += 1
+                    return snapshot
+
+            started = time.perf_counter()
+            report = await self._build(user_id, session)
+            build_ms = round((time.perf_counter() - started) * 1000, 1)
+            self._stats['rebuilds'] += 1
+            logger.info(f"📸 Risk report snapshot rebuilt for user {user_id} ({build_ms}ms)")
+            return await save_snapshot(session, user_id, report, fingerprint, build_ms)
+
+    async def _refresh_quietly(self, user_id: int, semaphore: asyncio.Semaphore, force: bool = False):
+        async with semaphore:
+            try:
+                await self.refresh(user_id, force=force)
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"❌ Risk report refresh failed for user {user_id}: {str(e)}")
+
+    async def run_once(self):
+        """One pass over dirty users first, then (on the leader) every user with holdings"""
+        started = time.perf_counter()
+        dirty, self._dirty = self._dirty, set()
+        user_ids = list(dirty)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        if await self.lease.acquire():
+            async with self.lease.keep_alive():
+                async with get_session_maker()() as session:
+                    result = await session.execute(select(Investment.user_id).distinct())
+                    user_ids = list(dict.fromkeys([*dirty, *result.scalars().all()]))
+                await asyncio.gather(*(self._refresh_quietly(user_id, semaphore, user_id in dirty) for user_id in user_ids))
+        else:
+            await asyncio.gather(*(self._refresh_quietly(user_id, semaphore, True) for user_id in user_ids))
+        self._stats['cycles'] += 1
+        self._stats['last_cycle_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def _run(self):
+        while True:
+            # Cleared before the pass, so a mark_dirty during it wakes the next one
+            self._wake.clear()
+            try:
+                await self.run_once()
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"❌ Risk report refresh cycle failed: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['running'] = self._task is not None and not self._task.done()
+        stats['pending_dirty'] = len(self._dirty)
+        stats['leader'] = self.lease.is_leader
+        stats['user_locks'] = len(self._user_locks)
+        return stats
+
+
+# Global instance
+risk_report_refresher = RiskReportRefresher(
+    interval_seconds=settings.RISK_REPORT_REFRESH_SECONDS,
+    max_age_seconds=settings.RISK_REPORT_MAX_AGE_MINUTES * 60,
+    concurrency=settings.RISK_REPORT_WORKER_CONCURRENCY
+)
@@ -0,0 +1,152 @@
+"""
+Single-Flight - Collapse concurrent identical upstream calls into one
+Threads and asyncio tasks share one registry, so a request handler and a
+background refresh asking for the same key still trigger a single fetch
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    In-flight request coalescing keyed by any hashable (e.g. (asset_type, symbol))
+
+    The first caller for a key becomes the leader and performs the call;
+    callers arriving while it runs wait for and share the leader's result.
+    Nothing is retained once the call finishes - this is not a cache. A leader
+    that is cancelled (or interrupted) hands its waiters a miss (None), never
+    its own cancellation.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'executions': 0, 'collapsed': 0, 'errors': 0, 'abandoned': 0}
+
+    def _claim(self, keys: List[Hashable]) -> Tuple[List[Hashable], Dict[Hashable, Future], Dict[Hashable, Future]]:
+        """Split keys into ones this caller leads and ones already in flight"""
+        owned, owned_futures, waiting = [], {}, {}
+        with self._lock:
+            for key in keys:
+                self._stats['calls'] += 1
+                future = self._inflight.get(key)
+                if future is not None:
+                    self._stats['collapsed'] += 1
+                    waiting[key] = future
+                else:
+                    future = Future()
+                    self._inflight[key] = future
+                    self._stats['executions'] += 1
+                    owned.append(key)
+                    owned_futures[key] = future
+        return owned, owned_futures, waiting
+
+    def _settle(self, owned_futures: Dict[Hashable, Future], results: Dict[Hashable, Any] = None, error: BaseException = None):
+        # Cancellation / interrupts belong to the leader's caller, not to the waiters
+        abandoned = error is not None and not isinstance(error, Exception)
+        with self._lock:
+            for key in owned_futures:
+                self._inflight.pop(key, None)
+            if abandoned:
+                self._stats['abandoned'] += 1
+            elif error is not None:
+                self._stats['errors'] += 1
+        for key, future in owned_futures.items():
+            if future.done():
+                continue
+            if error is not None and not abandoned:
+                future.set_exception(error)
+            else:
+                future.set_result(None if abandoned else (results or {}).get(key))
+
+    @staticmethod
+    def _waited_result(future: Future) -> Any:
+        try:
+            return future.result()
+        except (Exception, asyncio.CancelledError):
+            return None
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all concurrent callers of key and return its result"""
+        owned, owned_futures, waiting = self._claim([key])
+        if not owned:
+            return waiting[key].result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._settle(owned_futures, error=e)
+            raise
+        self._settle(owned_futures, {key: result})
+        return result
+
+    def do_many(self, keys: List[Hashable], batch_fn: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """
+        Batch variant: batch_fn is called once with only the keys nobody else is fetching
+
+        Returns:
+            Dict of key -> result (None for keys whose fetch failed)
+        """
+        owned, owned_futures, waiting = self._claim(list(dict.fromkeys(keys)))
+        results = {}
+
+        if owned:
+            try:
+                results = batch_fn(owned) or {}
+            except Exception as e:
+                logger.error(f"❌ {self.name} batch call failed: {str(e)}")
+                self._settle(owned_futures, error=e)
+                results = {}
+            else:
+                self._settle(owned_futures, results)
+
+        for key, future in waiting.items():
+            results[key] = self._waited_result(future)
+        return results
+
+    async def do_many_async(
+        self,
+        keys: List[Hashable],
+        batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+    ) -> Dict[Hashable, Any]:
+        """Async batch variant; waits on in-flight calls from threads or other tasks"""
+        owned, owned_futures, waiting = self._claim(list(dict.fromkeys(keys)))
+        results = {}
+
+        if owned:
+            try:
+                results = await batch_fn(owned) or {}
+            except BaseException as e:
+                self._settle(owned_futures, error=e)
+                if not isinstance(e, Exception):
+                    raise
+                logger.error(f"❌ {self.name} batch call failed: {str(e)}")
+                results = {}
+            else:
+                self._settle(owned_futures, results)
+
+        for key, future in waiting.items():
+            try:
+                # Shielded: cancelling this caller must not cancel the shared future
+                results[key] = await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.done():
+                    raise  # this caller was cancelled while waiting
+                results[key] = None
+            except Exception:
+                results[key] = None
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters showing how many upstream calls were collapsed"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['inflight'] = len(self._inflight)
+        stats['collapse_rate'] = round(stats['collapsed'] / stats['calls'], 3) if stats['calls'] else 0.0
+        return stats
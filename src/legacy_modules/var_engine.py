@@ -0,0 +1,247 @@
+"""
+VaR Engine - Value-at-Risk and CVaR (Expected Shortfall) for portfolios
+Historical simulation over the portfolio's return matrix, or Monte Carlo with
+a seeded multivariate normal that can fan out over a process pool
+"""
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Add parent path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from legacy_modules.portfolio_analytics import build_return_matrix, ledoit_wolf_covariance, MIN_OBSERVATIONS
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIDENCE_LEVELS = (0.95, 0.99)
+DEFAULT_HORIZONS = (1, 10)
+
+# Fixed chunk size keeps results identical with or without the process pool
+MC_CHUNK_PATHS = 50_000
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _var_cvar(losses: np.ndarray, confidence_levels: Sequence[float]) -> List[Dict[str, float]]:
+    """VaR/CVaR of a loss sample (losses as positive fractions of portfolio value)"""
+    var_levels = np.quantile(losses, confidence_levels)
+    results = []
+    for confidence, var in zip(confidence_levels, var_levels):
+        tail = losses[losses >= var]
+        results.append({
+            "confidence": confidence,
+            "var": float(var),
+            "cvar": float(tail.mean()) if len(tail) else float(var)
+        })
+    return results
+
+
+def _horizon_log_returns(returns: np.ndarray, horizon: int) -> np.ndarray:
+    """Overlapping horizon-day log returns per asset (rolling sums)"""
+    cumulative = np.vstack([np.zeros(returns.shape[1]), np.cumsum(returns, axis=0)])
+    return cumulative[horizon:] - cumulative[:-horizon]
+
+
+def historical_losses(returns: np.ndarray, weights: np.ndarray, horizon: int) -> np.ndarray:
+    """Portfolio loss sample from historical (overlapping) horizon returns"""
+    window = returns if horizon == 1 else _horizon_log_returns(returns, horizon)
+    return -(np.expm1(window) @ weights)
+
+
+def _cholesky(covariance: np.ndarray) -> np.ndarray:
+    try:
+        return np.linalg.cholesky(covariance)
+    except np.linalg.LinAlgError:
+        # Not positive definite - use the clipped eigendecomposition instead
+        values, vectors = np.linalg.eigh(covariance)
+        return vectors * np.sqrt(np.clip(values, 0.0, None))
+
+
+def _simulate_chunk(
+    seed: np.random.SeedSequence,
+    n_paths: int,
+    mu: np.ndarray,
+    chol: np.ndarray,
+    weights: np.ndarray,
+    horizons: Sequence[int]
+) -> np.ndarray:
+    """Simulated portfolio losses, shape (len(horizons), n_paths); runs in worker processes"""
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((n_paths, len(mu))) @ chol.T
+    losses = np.empty((len(horizons), n_paths))
+    for i, horizon in enumerate(horizons):
+        # Sum of h iid normal daily log returns ~ N(h*mu, h*cov)
+        log_returns = horizon * mu + np.sqrt(horizon) * shocks
+        losses[i] = -(np.expm1(log_returns) @ weights)
+    return losses
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            max_workers = settings.VAR_MAX_WORKERS or os.cpu_count() or 1
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers)
+            logger.info(f"✅ VaR process pool started ({max_workers} workers)")
+        return _process_pool
+
+
+def shutdown_var_pool():
+    """Stop the Monte Carlo worker processes (call on shutdown)"""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(cancel_futures=True)
+            _process_pool = None
+
+
+def monte_carlo_losses(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    horizons: Sequence[int],
+    paths: int,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Simulated portfolio losses for each horizon
+
+    The same seed always gives the same paths; chunks use SeedSequence.spawn
+    so they are independent streams whether run inline or in the pool.
+
+    Returns:
+        Array of shape (len(horizons), paths)
+    """
+    mu = returns.mean(axis=0)
+    chol = _cholesky(ledoit_wolf_covariance(returns)['covariance'])
+
+    chunk_sizes = [MC_CHUNK_PATHS] * (paths // MC_CHUNK_PATHS)
+    if paths % MC_CHUNK_PATHS:
+        chunk_sizes.append(paths % MC_CHUNK_PATHS)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    args = [(s, n, mu, chol, weights, tuple(horizons)) for s, n in zip(seeds, chunk_sizes)]
+
+    if paths >= settings.VAR_PROCESS_POOL_MIN_PATHS and len(chunk_sizes) > 1:
+        pool = _get_process_pool()
+        chunks = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        chunks = [_simulate_chunk(*a) for a in args]
+    return np.hstack(chunks)
+
+
+def compute_var(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    portfolio_value: float,
+    method: str = "historical",
+    confidence_levels: Sequence[float] = DEFAULT_CONFIDENCE_LEVELS,
+    horizons: Sequence[int] = DEFAULT_HORIZONS,
+    paths: int = 10_000,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    VaR and CVaR for each horizon and confidence level
+
+    Args:
+        returns: Daily log returns (T, N) aligned with weights
+        weights: Portfolio weights (sum to 1)
+        portfolio_value: Current value used to express losses in currency
+        method: "historical" or "monte_carlo"
+        confidence_levels: e.g. (0.95, 0.99)
+        horizons: Holding periods in trading days
+        paths: Monte Carlo path count
+        seed: Monte Carlo seed (None = random, returned in the result)
+
+    Returns:
+        Dict with one entry per (horizon, confidence) plus sample info
+    """
+    if method not in ("historical", "monte_carlo"):
+        raise ValueError(f"Unknown VaR method: {method}")
+
+    results = []
+    if method == "monte_carlo":
+        if seed is None:
+            # Pick and report a seed so any run can be reproduced
+            seed = int(np.random.SeedSequence().entropy % 2**32)
+        losses_by_horizon = monte_carlo_losses(returns, weights, horizons, paths, seed)
+        samples = {h: losses_by_horizon[i] for i, h in enumerate(horizons)}
+        scaled = {h: False for h in horizons}
+    else:
+        samples, scaled = {}, {}
+        daily = historical_losses(returns, weights, 1)
+        for horizon in horizons:
+            # Need a reasonable number of overlapping windows; else sqrt-time scale
+            if returns.shape[0] - horizon + 1 >= 60:
+                samples[horizon] = historical_losses(returns, weights, horizon)
+                scaled[horizon] = False
+            else:
+                samples[horizon] = daily * np.sqrt(horizon)
+                scaled[horizon] = True
+
+    for horizon in horizons:
+        for entry in _var_cvar(samples[horizon], confidence_levels):
+            results.append({
+                "horizon_days": horizon,
+                "confidence": entry['confidence'],
+                "var": round(entry['var'] * portfolio_value, 2),
+                "cvar": round(entry['cvar'] * portfolio_value, 2),
+                "var_pct": round(entry['var'] * 100, 2),
+                "cvar_pct": round(entry['cvar'] * 100, 2),
+                "sqrt_time_scaled": scaled[horizon]
+            })
+
+    return {
+        "method": method,
+        "observations": int(returns.shape[0]),
+        "paths": paths if method == "monte_carlo" else None,
+        "seed": seed if method == "monte_carlo" else None,
+        "results": results
+    }
+
+
+def compute_portfolio_var(
+    holdings: List[Dict],
+    method: str = "historical",
+    lookback_days: int = 365,
+    **kwargs
+) -> Optional[Dict[str, Any]]:
+    """
+    VaR/CVaR for report-style holdings using stored price history
+
+    Args:
+        holdings: Dicts with 'symbol' and 'current_value'
+        method: "historical" or "monte_carlo"
+        lookback_days: History window for the return matrix
+        **kwargs: Passed through to compute_var
+
+    Returns:
+        compute_var result plus coverage info, or None without enough history
+    """
+    matrix = build_return_matrix([h['symbol'] for h in holdings], lookback_days)
+    if not matrix['symbols'] or matrix['returns'].shape[0] < MIN_OBSERVATIONS:
+        return None
+
+    index = {symbol: i for i, symbol in enumerate(matrix['symbols'])}
+    values = np.zeros(len(index))
+    for h in holdings:
+        i = index.get(h['symbol'].upper())
+        if i is not None:
+            values[i] += h['current_value']
+
+    covered = float(values.sum())
+    total_value = float(sum(h['current_value'] for h in holdings))
+    if covered <= 0:
+        return None
+
+    result = compute_var(matrix['returns'], values / covered, covered, method=method, **kwargs)
+    result["portfolio_value"] = round(total_value, 2)
+    result["covered_value"] = round(covered, 2)
+    result["missing_history"] = matrix['missing']
+    return result
@@ -2,21 +2,24 @@
 News Service - Multi-source financial news with sentiment analysis
 Port: 8003
 """
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
+from datetime import datetime
 import sys, os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from shared.config import settings
 from shared.utils.logger import setup_logger
-from shared.utils.database import init_db, get_session
+from shared.utils.database import init_db, get_session, get_session_maker
 from shared.models import NewsArticle
-from legacy_modules.news_fetcher import get_news_fetcher
+from legacy_modules.news_fetcher import get_news_fetcher, shutdown_parse_pool
+from legacy_modules.news_pipeline import ingest_news
+from legacy_modules.news_search import ensure_search_index, search_news
 
 logger = setup_logger('news_service')
 
@@ -24,7 +27,10 @@ logger = setup_logger('news_service')
 async def lifespan(app: FastAPI):
     logger.info("🚀 News Service starting on port 8003...")
     await init_db()
+    async with get_session_maker()() as session:
+        await ensure_search_index(session)
     yield
+    shutdown_parse_pool()
 
 app = FastAPI(title="News Service", version="2.0.0", description="Financial news aggregation", lifespan=lifespan)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
@@ -41,19 +47,8 @@ async def health():
 async def fetch_news(sources: Optional[List[str]] = None, db: AsyncSession = Depends(get_session)):
     logger.info(f"📰 Fetching news from: {sources or 'all'}")
     try:
-        fetcher = get_news_fetcher()
-        articles = await fetcher.fetch_all(sources=sources)
-        saved_count = 0
-        duplicate_count = 0
-        for article_data in articles:
-            result = await db.execute(select(NewsArticle).where(NewsArticle.url == article_data['url']))
-            if result.scalar_one_or_none():
-                duplicate_count += 1
-                continue
-            db.add(NewsArticle(**article_data))
-            saved_count += 1
-        await db.commit()
-        return {"message": "News fetch completed", "articles_fetched": len(articles), "new_saved": saved_count, "duplicates": duplicate_count}
+        ingested = await ingest_news(db, get_news_fetcher(), sources=sources)
+        return {"message": "News fetch completed", "articles_fetched": ingested["fetched"], "new_saved": ingested["inserted"], "duplicates": ingested["duplicates"], "near_duplicates": ingested["near_duplicates"], "symbol_mentions": ingested["symbol_mentions"], "stages": ingested["stages"]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -81,6 +76,16 @@ async def get_latest_news(limit: int = 50, source: Optional[str] = None, sentime
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/search")
+async def search(q: str = Query(..., min_length=1), symbol: Optional[str] = None, date_from: Optional[datetime] = Query(None, alias="from"), date_to: Optional[datetime] = Query(None, alias="to"), limit: int = 20, cursor: Optional[str] = None, db: AsyncSession = Depends(get_session)):
+    try:
+        page = await search_news(db, q, symbol=symbol, date_from=date_from, date_to=date_to, limit=limit, cursor=cursor)
+        return {"query": q, "total": len(page["results"]), **page}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/sources")
 async def get_sources(db: AsyncSession = Depends(get_session)):
     try:
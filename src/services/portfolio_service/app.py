@@ -16,7 +16,7 @@ from shared.config import settings
 from shared.utils.logger import setup_logger
 from shared.utils.database import init_db, get_session
 from shared.models import Investment
-from legacy_modules.price_service import get_live_price
+from legacy_modules.price_providers import get_live_prices_async, close_http_client
 
 logger = setup_logger('portfolio_service')
 
@@ -31,6 +31,7 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Portfolio Service starting on port 8002...")
     await init_db()
     yield
+    await close_http_client()
 
 app = FastAPI(title="Portfolio Service", version="2.0.0", description="Investment Tracking & Live Prices", lifespan=lifespan)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
@@ -92,7 +93,8 @@ async def get_portfolio(user_id: int, db: AsyncSession = Depends(get_session)):
 async def get_price(symbol: str, asset_type: str = "stock"):
     logger.info(f"💵 Fetching price for {symbol} ({asset_type})")
     try:
-        price_data = get_live_price(symbol, asset_type)
+        quotes = await get_live_prices_async([symbol], asset_type)
+        price_data = quotes.get(symbol)
         if not price_data:
             raise HTTPException(status_code=404, detail=f"Price not found for {symbol}")
         return price_data
@@ -107,9 +109,10 @@ async def update_prices(user_id: int, db: AsyncSession = Depends(get_session)):
     try:
         result = await db.execute(select(Investment).where(Investment.user_id == user_id))
         investments = result.scalars().all()
+        quotes = await get_live_prices_async([inv.symbol for inv in investments], [inv.asset_type for inv in investments])
         updated_count = 0
         for inv in investments:
-            price_data = get_live_price(inv.symbol, inv.asset_type)
+            price_data = quotes.get(inv.symbol)
             if price_data:
                 inv.current_price = price_data['price']
                 updated_count += 1
@@ -9,6 +9,7 @@ from contextlib import asynccontextmanager
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 import sys, os
+import numpy as np
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
@@ -16,7 +17,7 @@ from shared.config import settings
 from shared.utils.logger import setup_logger
 from shared.utils.database import init_db, get_session
 from shared.models import Investment, RiskAlert, FraudAlert
-from legacy_modules.risk_engine import risk_engine
+from legacy_modules.risk_engine import risk_engine, encode_asset_types
 from legacy_modules.fraud_detection import fraud_detector
 from legacy_modules.gemini_service import gemini_companion
 
@@ -54,17 +55,16 @@ async def analyze_portfolio(user_id: int, db: AsyncSession = Depends(get_session
         investments = result.scalars().all()
         if not investments:
             return {"user_id": user_id, "overall_risk": "low", "risk_score": 0.0, "message": "No investments"}
-        total_risk = 0
-        risk_details = []
-        for inv in investments:
-            risk_analysis = risk_engine.predict_risk_score({
-                "symbol": inv.symbol, "asset_type": inv.asset_type,
-                "purchase_price": inv.purchase_price, "current_price": inv.current_price or inv.purchase_price,
-                "quantity": inv.quantity
-            })
-            total_risk += risk_analysis['risk_score']
-            risk_details.append({"symbol": inv.symbol, "risk_level": risk_analysis['risk_level']})
-        avg_risk = total_risk / len(investments)
+        scores = risk_engine.predict_risk_scores_batch(
+            current_prices=np.array([inv.current_price or inv.purchase_price for inv in investments], dtype=float),
+            purchase_prices=np.array([inv.purchase_price for inv in investments], dtype=float),
+            asset_type_codes=encode_asset_types([inv.asset_type for inv in investments])
+        )
+        risk_details = [
+            {"symbol": inv.symbol, "risk_level": level}
+            for inv, level in zip(investments, scores['risk_level'].tolist())
+        ]
+        avg_risk = float(scores['risk_score'].mean())
         overall_risk = "high" if avg_risk >= 0.7 else "medium" if avg_risk >= 0.4 else "low"
         return {"user_id": user_id, "overall_risk": overall_risk, "risk_score": round(avg_risk, 3), 
                 "total_investments": len(investments), "risk_distribution": risk_details}
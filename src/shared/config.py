@@ -78,11 +78,97 @@ class Settings:
     FINNHUB_KEY = os.getenv("FINNHUB_KEY", "")
     GNEWS_KEY = os.getenv("GNEWS_KEY", "")
     
+    # Symbol -> article index (article_symbols) used for per-holding news lookups
+    NEWS_INDEX_WINDOW_DAYS = float(os.getenv("NEWS_INDEX_WINDOW_DAYS", "7"))
+    NEWS_INDEX_MAX_ARTICLES = int(os.getenv("NEWS_INDEX_MAX_ARTICLES", "200"))  # indexed articles per risk report
+    NEWS_INGEST_CHUNK_SIZE = int(os.getenv("NEWS_INGEST_CHUNK_SIZE", "500"))  # rows per INSERT ... ON CONFLICT DO NOTHING
+    NEWS_PIPELINE_QUEUE_SIZE = int(os.getenv("NEWS_PIPELINE_QUEUE_SIZE", "4"))  # payloads buffered between ingest stages
+    NEWS_PIPELINE_PROCESS_WORKERS = int(os.getenv("NEWS_PIPELINE_PROCESS_WORKERS", "2"))  # payloads handed to the parse pool at once
+    NEWS_PARSE_PROCESSES = int(os.getenv("NEWS_PARSE_PROCESSES", "0"))  # parse + sentiment process pool size (0 = one per CPU)
+    
+    # Per-source fetch limits: one slow feed only costs its own timeout
+    NEWS_SOURCE_TIMEOUT = float(os.getenv("NEWS_SOURCE_TIMEOUT", "15"))  # seconds per source
+    NEWS_SOURCE_MAX_CONCURRENCY = int(os.getenv("NEWS_SOURCE_MAX_CONCURRENCY", "1"))  # in-flight requests per source
+    NEWS_RSS_MIN_INTERVAL = float(os.getenv("NEWS_RSS_MIN_INTERVAL", "0"))  # seconds between calls to one RSS feed
+    NEWS_API_MIN_INTERVAL = float(os.getenv("NEWS_API_MIN_INTERVAL", "60"))  # seconds between calls to one keyed API
+    NEWS_CURSOR_OVERLAP_MINUTES = float(os.getenv("NEWS_CURSOR_OVERLAP_MINUTES", "30"))  # re-read window behind each source cursor
+    NEWS_SOURCE_STATE_PATH = os.getenv("NEWS_SOURCE_STATE_PATH", str(PROJECT_ROOT / "data" / "news_source_state.json"))  # ETag / cursor per source
+    
+    # Near-duplicate story clustering (MinHash + LSH over title + summary)
+    NEWS_DEDUP_THRESHOLD = float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.5"))  # estimated Jaccard similarity for the same story
+    NEWS_DEDUP_NUM_PERM = int(os.getenv("NEWS_DEDUP_NUM_PERM", "64"))  # MinHash signature length
+    NEWS_DEDUP_BANDS = int(os.getenv("NEWS_DEDUP_BANDS", "16"))  # LSH bands (must divide NUM_PERM)
+    NEWS_DEDUP_WINDOW_DAYS = float(os.getenv("NEWS_DEDUP_WINDOW_DAYS", "30"))
+    NEWS_DEDUP_MAX_ENTRIES = int(os.getenv("NEWS_DEDUP_MAX_ENTRIES", "50000"))  # index cap within the window
+    
+    # Background news polling (one leader across workers via a DB lease)
+    NEWS_SCHEDULER_ENABLED = os.getenv("NEWS_SCHEDULER_ENABLED", "true").lower() == "true"
+    NEWS_SCHEDULER_MIN_INTERVAL_SECONDS = float(os.getenv("NEWS_SCHEDULER_MIN_INTERVAL_SECONDS", "120"))  # raised per source to fit its daily quota
+    NEWS_SCHEDULER_MAX_INTERVAL_SECONDS = float(os.getenv("NEWS_SCHEDULER_MAX_INTERVAL_SECONDS", "3600"))
+    NEWS_SCHEDULER_TARGET_ARTICLES = float(os.getenv("NEWS_SCHEDULER_TARGET_ARTICLES", "5"))  # new articles per poll the interval aims for
+    NEWS_SCHEDULER_LEASE_SECONDS = float(os.getenv("NEWS_SCHEDULER_LEASE_SECONDS", "60"))  # leader lease, renewed every third of this
+    
     # ========================================================================
     # PRICE SERVICE
     # ========================================================================
     COINGECKO_API_KEY = os.getenv("COINGECKO_API_KEY", "")  # Optional for higher limits
     
+    # Quote cache: "memory" (per process) or "redis" (shared, uses REDIS_* below)
+    QUOTE_CACHE_BACKEND = os.getenv("QUOTE_CACHE_BACKEND", "memory")
+    QUOTE_CACHE_MAX_ENTRIES = int(os.getenv("QUOTE_CACHE_MAX_ENTRIES", "2048"))
+    QUOTE_TTL_STOCK = float(os.getenv("QUOTE_TTL_STOCK", "60"))  # seconds
+    QUOTE_TTL_CRYPTO = float(os.getenv("QUOTE_TTL_CRYPTO", "15"))  # seconds
+    QUOTE_STALE_TTL = float(os.getenv("QUOTE_STALE_TTL", "300"))  # serve-stale window after TTL
+    
+    # Async price providers: "yahoo"/"coingecko" (httpx) or "yfinance"/"pycoingecko" (thread pool)
+    PRICE_PROVIDER_STOCK = os.getenv("PRICE_PROVIDER_STOCK", "yahoo")
+    PRICE_PROVIDER_CRYPTO = os.getenv("PRICE_PROVIDER_CRYPTO", "coingecko")
+    PRICE_PROVIDER_TIMEOUT = float(os.getenv("PRICE_PROVIDER_TIMEOUT", "5"))  # seconds per request
+    PRICE_HTTP_MAX_CONNECTIONS = int(os.getenv("PRICE_HTTP_MAX_CONNECTIONS", "20"))
+    YAHOO_MAX_CONCURRENCY = int(os.getenv("YAHOO_MAX_CONCURRENCY", "8"))
+    COINGECKO_MAX_CONCURRENCY = int(os.getenv("COINGECKO_MAX_CONCURRENCY", "2"))
+    
+    # Local CoinGecko coin list used to resolve crypto symbols without cg.search
+    CRYPTO_INDEX_PATH = os.getenv("CRYPTO_INDEX_PATH", str(PROJECT_ROOT / "data" / "coingecko_coins.json"))
+    CRYPTO_INDEX_REFRESH_HOURS = float(os.getenv("CRYPTO_INDEX_REFRESH_HOURS", "24"))
+    CRYPTO_NEGATIVE_TTL = float(os.getenv("CRYPTO_NEGATIVE_TTL", "3600"))  # seconds to remember unknown symbols
+    CRYPTO_NEGATIVE_MAX_ENTRIES = int(os.getenv("CRYPTO_NEGATIVE_MAX_ENTRIES", "4096"))  # unknown symbols remembered at most
+    CRYPTO_RANKED_COINS = int(os.getenv("CRYPTO_RANKED_COINS", "1000"))  # top coins by market cap used to break ticker ties
+    
+    # Local OHLCV history (one memory-mapped .npy per symbol/interval)
+    OHLCV_DATA_DIR = os.getenv("OHLCV_DATA_DIR", str(PROJECT_ROOT / "data" / "ohlcv"))
+    OHLCV_LOOKBACK_DAYS = int(os.getenv("OHLCV_LOOKBACK_DAYS", "730"))  # initial backfill depth
+    OHLCV_REFRESH_MINUTES = float(os.getenv("OHLCV_REFRESH_MINUTES", "60"))  # min gap between backfills per symbol
+    
+    # Value-at-Risk engine
+    VAR_DEFAULT_PATHS = int(os.getenv("VAR_DEFAULT_PATHS", "10000"))
+    VAR_MAX_PATHS = int(os.getenv("VAR_MAX_PATHS", "2000000"))
+    VAR_PROCESS_POOL_MIN_PATHS = int(os.getenv("VAR_PROCESS_POOL_MIN_PATHS", "200000"))  # smaller runs stay in-process
+    VAR_MAX_WORKERS = int(os.getenv("VAR_MAX_WORKERS", "0"))  # 0 = one per CPU
+    
+    # Monte Carlo portfolio projection (simulator)
+    PROJECTION_MAX_PATHS = int(os.getenv("PROJECTION_MAX_PATHS", "100000"))
+    PROJECTION_MAX_YEARS = int(os.getenv("PROJECTION_MAX_YEARS", "30"))
+    PROJECTION_MEMORY_MB = float(os.getenv("PROJECTION_MEMORY_MB", "64"))  # per-chunk working set
+    
+    # Batch portfolio simulation
+    SIMULATION_BATCH_MAX_CANDIDATES = int(os.getenv("SIMULATION_BATCH_MAX_CANDIDATES", "500"))
+    SIMULATION_BATCH_MAX_AI = int(os.getenv("SIMULATION_BATCH_MAX_AI", "5"))  # AI reviews per batch
+    
+    # Rebalancing optimizer
+    OPTIMIZER_MAX_WEIGHT = float(os.getenv("OPTIMIZER_MAX_WEIGHT", "0.25"))  # beginner single-holding cap
+    OPTIMIZER_MAX_ITERATIONS = int(os.getenv("OPTIMIZER_MAX_ITERATIONS", "5000"))
+    
+    # Precomputed risk report snapshots
+    RISK_REPORT_WORKER_ENABLED = os.getenv("RISK_REPORT_WORKER_ENABLED", "true").lower() == "true"
+    RISK_REPORT_REFRESH_SECONDS = float(os.getenv("RISK_REPORT_REFRESH_SECONDS", "300"))  # how often the worker checks fingerprints
+    RISK_REPORT_MAX_AGE_MINUTES = float(os.getenv("RISK_REPORT_MAX_AGE_MINUTES", "60"))  # rebuild even when nothing changed
+    RISK_REPORT_PRICE_STEP_PCT = float(os.getenv("RISK_REPORT_PRICE_STEP_PCT", "1.0"))  # price move that counts as a change
+    RISK_REPORT_WORKER_CONCURRENCY = int(os.getenv("RISK_REPORT_WORKER_CONCURRENCY", "2"))
+    RISK_REPORT_STAGE_TIMEOUT_SECONDS = float(os.getenv("RISK_REPORT_STAGE_TIMEOUT_SECONDS", "10"))  # per stage (DB, history, analytics)
+    RISK_REPORT_PRICE_TIMEOUT_SECONDS = float(os.getenv("RISK_REPORT_PRICE_TIMEOUT_SECONDS", "5"))  # bulk quote lookup for all holdings
+    RISK_REPORT_AI_TIMEOUT_SECONDS = float(os.getenv("RISK_REPORT_AI_TIMEOUT_SECONDS", "20"))  # Gemini summary, rule-based after that
+    
     # ========================================================================
     # LOGGING
     # ========================================================================
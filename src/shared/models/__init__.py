@@ -1,7 +1,7 @@
 """
 Shared database models
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, Text, Index, UniqueConstraint
 from datetime import datetime
 import sys
 import os
@@ -82,6 +82,20 @@ class NewsArticle(Base):
     sentiment = Column(String)
     sentiment_score = Column(Integer, default=0)
     fetched_at = Column(DateTime, default=datetime.utcnow)
+    cluster_id = Column(Integer, nullable=True, index=True)  # id of the story's first article (NULL = its own story)
+
+class ArticleSymbol(Base):
+    """Symbol -> article inverted index, filled when news is ingested"""
+    __tablename__ = "article_symbols"
+    __table_args__ = (
+        UniqueConstraint("article_id", "symbol", name="uq_article_symbol"),
+        Index("ix_article_symbols_symbol_published", "symbol", "published_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    article_id = Column(Integer, index=True, nullable=False)
+    symbol = Column(String, nullable=False)  # uppercase ticker
+    published_at = Column(DateTime)  # copied from the article for range scans
 
 class RecommendationOutcome(Base):
     __tablename__ = "recommendation_outcomes"
@@ -97,3 +111,33 @@ class RecommendationOutcome(Base):
     recommendation_summary = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     evaluated_at = Column(DateTime, nullable=True)  # When outcome was determined
+
+class RiskReportSnapshot(Base):
+    __tablename__ = "risk_report_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, unique=True, index=True)
+    fingerprint = Column(String)  # holdings + quantized prices + latest news
+    report = Column(Text)  # JSON report payload
+    build_ms = Column(Float, nullable=True)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+class SchedulerLease(Base):
+    __tablename__ = "scheduler_leases"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True)  # e.g. 'news_scheduler'
+    holder = Column(String)  # host:pid:token of the worker holding the lease
+    expires_at = Column(DateTime)
+
+class NewsSourceUsage(Base):
+    """Requests made to a news source per UTC day, shared by every worker"""
+    __tablename__ = "news_source_usage"
+    __table_args__ = (
+        UniqueConstraint("source", "day", name="uq_news_source_usage_day"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=False)  # NewsFetcher source key
+    day = Column(Date, nullable=False)
+    requests = Column(Integer, default=0)
@@ -1,6 +1,7 @@
 """
 Shared database utilities
 """
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from typing import AsyncGenerator
@@ -17,6 +18,25 @@ logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+def add_missing_columns(connection):
+    """create_all() never alters existing tables: add new nullable model columns (and their indexes) to them"""
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        added = set()
+        for column in table.columns:
+            if column.name in existing or column.primary_key or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            added.add(column.name)
+            logger.info(f"🔧 Added column {table.name}.{column.name}")
+        for index in table.indexes:
+            if any(column.name in added for column in index.columns):
+                index.create(connection, checkfirst=True)
+
 class DatabaseManager:
     """Database connection manager"""
     def __init__(self, database_url: str):
@@ -36,6 +56,7 @@ class DatabaseManager:
         """Initialize database tables"""
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(add_missing_columns)
         logger.info("✅ Database initialized")
     
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
@@ -56,3 +77,7 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Get database session (convenience function)"""
     async for session in _db_manager.get_session():
         yield session
+
+def get_session_maker() -> async_sessionmaker:
+    """Session factory for work outside a request (background tasks)"""
+    return _db_manager.async_session_maker